@@ -0,0 +1,266 @@
+// bench_calculate.cpp - микро-бенчмарки BigNumber
+//
+// Запуск: bench_calculate [--multiply] [--divide] [--ln] [--suite] [--json FILE] [--max-precision N]
+//   --multiply  время умножения по алгоритмам и точки переключения
+//               schoolbook -> Karatsuba -> Toom-3 -> NTT (в лимбах по 9 цифр)
+//   --divide    деление: алгоритм D Кнута против обратного по Ньютону
+//   --ln        логарифм: ряд atanh против AGM на 100, 1000 и 10000 цифрах, и AGM с холодным
+//               кэшем констант (π и ln(2) считаются заново) на 10000 и 100000 цифрах
+//   --suite     add/mul/div/pi/exp/sin/factorial на точностях 10..100000 (до --max-precision);
+//               --json FILE сохраняет результаты в формате core.cpp_calculate.benchmark,
+//               сравнение с эталоном: python -m core.cpp_calculate.benchmark --compare FILE
+#include "calculate.h"
+#include <chrono>
+#include <climits>
+#include <cstdio>
+#include <cstdlib>
+#include <functional>
+#include <random>
+#include <string>
+#include <vector>
+
+static std::mt19937_64 rng(20240601);
+
+static BigNumber randomNumber(int limbCount) {
+    std::string s;
+    s.reserve((size_t)limbCount * BigNumber::LIMB_DIGITS);
+    s.push_back(char('1' + rng() % 9));
+    for (int i = 1; i < limbCount * BigNumber::LIMB_DIGITS; ++i) s.push_back(char('0' + rng() % 10));
+    return BigNumber(s);
+}
+
+// Среднее время одной операции (мкс): повторяем, пока не наберём ~minMs
+template <typename F>
+static double timeIt(F&& op, double minMs = 50.0) {
+    using clock = std::chrono::steady_clock;
+    long long iterations = 0;
+    auto start = clock::now();
+    double elapsedMs = 0.0;
+    do {
+        op();
+        ++iterations;
+        elapsedMs = std::chrono::duration<double, std::milli>(clock::now() - start).count();
+    } while (elapsedMs < minMs);
+    return elapsedMs * 1000.0 / (double)iterations;
+}
+
+static void benchMultiply() {
+    const int defaultKaratsuba = BigNumber::getKaratsubaThreshold();
+    const int defaultToom3 = BigNumber::getToom3Threshold();
+    const int defaultNTT = BigNumber::getNTTThreshold();
+
+    std::printf("== multiply: schoolbook vs Karatsuba (one level) ==\n");
+    std::printf("%8s %14s %14s\n", "limbs", "schoolbook,us", "karatsuba,us");
+    int karatsubaCrossover = -1;
+    for (int n = 8; n <= 256; n += (n < 64 ? 8 : 32)) {
+        BigNumber a = randomNumber(n), b = randomNumber(n);
+        BigNumber::setMultiplyThresholds(INT_MAX, INT_MAX, INT_MAX);
+        double school = timeIt([&] { (void)a.multiply(b); });
+        BigNumber::setMultiplyThresholds(n, INT_MAX, INT_MAX);  // одно деление, дальше schoolbook
+        double kara = timeIt([&] { (void)a.multiply(b); });
+        std::printf("%8d %14.2f %14.2f\n", n, school, kara);
+        if (karatsubaCrossover < 0 && kara < school) karatsubaCrossover = n;
+    }
+
+    std::printf("\n== multiply: Karatsuba vs Toom-3 (one level) ==\n");
+    std::printf("%8s %14s %14s\n", "limbs", "karatsuba,us", "toom3,us");
+    int toom3Crossover = -1;
+    for (int n = 64; n <= 1024; n += (n < 256 ? 32 : 128)) {
+        BigNumber a = randomNumber(n), b = randomNumber(n);
+        BigNumber::setMultiplyThresholds(defaultKaratsuba, INT_MAX, INT_MAX);
+        double kara = timeIt([&] { (void)a.multiply(b); });
+        BigNumber::setMultiplyThresholds(defaultKaratsuba, n, INT_MAX);
+        double toom = timeIt([&] { (void)a.multiply(b); });
+        std::printf("%8d %14.2f %14.2f\n", n, kara, toom);
+        if (toom3Crossover < 0 && toom < kara) toom3Crossover = n;
+    }
+
+    std::printf("\n== multiply: Toom-3 vs NTT ==\n");
+    std::printf("%8s %14s %14s\n", "limbs", "toom3,us", "ntt,us");
+    int nttCrossover = -1;
+    for (int n = 256; n <= 16384; n *= 2) {
+        for (int m : { n, n + n / 2 }) {
+            BigNumber a = randomNumber(m), b = randomNumber(m);
+            BigNumber::setMultiplyThresholds(defaultKaratsuba, defaultToom3, INT_MAX);
+            double toom = timeIt([&] { (void)a.multiply(b); });
+            BigNumber::setMultiplyThresholds(defaultKaratsuba, defaultToom3, m);
+            double ntt = timeIt([&] { (void)a.multiply(b); });
+            std::printf("%8d %14.2f %14.2f\n", m, toom, ntt);
+            if (nttCrossover < 0 && ntt < toom) nttCrossover = m;
+        }
+    }
+
+    BigNumber::setMultiplyThresholds(defaultKaratsuba, defaultToom3, defaultNTT);
+    std::printf("\nKaratsuba crossover: ~%d limbs (current threshold %d)\n", karatsubaCrossover, defaultKaratsuba);
+    std::printf("Toom-3 crossover:    ~%d limbs (current threshold %d)\n", toom3Crossover, defaultToom3);
+    std::printf("NTT crossover:       ~%d limbs (current threshold %d)\n", nttCrossover, defaultNTT);
+}
+
+static void benchDivide() {
+    const int defaultNewton = BigNumber::getNewtonDivisionThreshold();
+
+    // Делитель n лимбов, частное ~n лимбов (как при делении с precision ~ 9n)
+    std::printf("== divide: Knuth D vs Newton reciprocal ==\n");
+    std::printf("%8s %14s %14s\n", "limbs", "knuth,us", "newton,us");
+    int newtonCrossover = -1;
+    for (int n = 32; n <= 4096; n *= 2) {
+        for (int m : { n, n + n / 2 }) {
+            BigNumber a = randomNumber(m), b = randomNumber(m);
+            int precision = m * BigNumber::LIMB_DIGITS;
+            BigNumber::setNewtonDivisionThreshold(INT_MAX);
+            double knuth = timeIt([&] { (void)a.divide(b, precision); });
+            BigNumber::setNewtonDivisionThreshold(2);
+            double newton = timeIt([&] { (void)a.divide(b, precision); });
+            std::printf("%8d %14.2f %14.2f\n", m, knuth, newton);
+            if (newtonCrossover < 0 && newton < knuth) newtonCrossover = m;
+        }
+    }
+
+    BigNumber::setNewtonDivisionThreshold(defaultNewton);
+    std::printf("\nNewton crossover: ~%d limbs (current threshold %d)\n", newtonCrossover, defaultNewton);
+}
+
+static void benchLn() {
+    const int defaultAgm = BigNumber::getLnAgmThreshold();
+    BigNumber x("3.7");
+
+    // π и ln(2) прогреваются заранее: в рабочем режиме они берутся из кэша констант
+    std::printf("== ln: atanh series vs AGM (cached pi, ln2) ==\n");
+    std::printf("%8s %14s %14s\n", "digits", "series,us", "agm,us");
+    for (int digits : { 100, 1000, 10000 }) {
+        (void)BigNumber::pi(digits + 40);
+        (void)BigNumber::compute_ln2(digits + 40);
+        BigNumber::setLnAgmThreshold(INT_MAX);
+        double series = timeIt([&] { (void)x.ln(digits); });
+        BigNumber::setLnAgmThreshold(1);
+        double agm = timeIt([&] { (void)x.ln(digits); });
+        std::printf("%8d %14.2f %14.2f\n", digits, series, agm);
+    }
+
+    // Точка переключения: первая точность, на которой AGM быстрее ряда
+    int agmCrossover = -1;
+    for (int digits = 50; digits <= 2000 && agmCrossover < 0; digits += (digits < 400 ? 50 : 200)) {
+        (void)BigNumber::pi(digits + 40);
+        (void)BigNumber::compute_ln2(digits + 40);
+        BigNumber::setLnAgmThreshold(INT_MAX);
+        double series = timeIt([&] { (void)x.ln(digits); }, 20.0);
+        BigNumber::setLnAgmThreshold(1);
+        double agm = timeIt([&] { (void)x.ln(digits); }, 20.0);
+        if (agm < series) agmCrossover = digits;
+    }
+
+    BigNumber::setLnAgmThreshold(defaultAgm);
+    std::printf("\nAGM crossover: ~%d digits (current threshold %d)\n", agmCrossover, defaultAgm);
+
+    // Первый ln на новой точности: AGM ждёт π и ln(2), которые ещё не в кэше
+    std::printf("\n== ln: cold constants cache ==\n");
+    std::printf("%8s %14s %14s %14s\n", "digits", "ln2,us", "pi,us", "ln,us");
+    for (int digits : { 10000, 100000 }) {
+        double ln2 = timeIt([&] { BigNumber::clearConstantsCache(); (void)BigNumber::compute_ln2(digits); });
+        double pi = timeIt([&] { BigNumber::clearConstantsCache(); (void)BigNumber::pi(digits); });
+        double cold = timeIt([&] { BigNumber::clearConstantsCache(); (void)x.ln(digits); });
+        std::printf("%8d %14.2f %14.2f %14.2f\n", digits, ln2, pi, cold);
+    }
+}
+
+// Число с digits знаками после точки в [1, 2): операнд для операций на точности digits
+static BigNumber randomFraction(int digits) {
+    std::string s = "1.";
+    s.reserve((size_t)digits + 2);
+    for (int i = 0; i < digits; ++i) s.push_back(char('0' + rng() % 10));
+    return BigNumber(s);
+}
+
+struct SuiteResult {
+    std::string op;
+    int precision;
+    double seconds;
+    long long iterations;
+};
+
+// Набор операций на точностях 10..maxPrecision; константы (π, e, ln2) прогреты, кроме op = pi
+static std::vector<SuiteResult> runSuite(int maxPrecision) {
+    using clock = std::chrono::steady_clock;
+    std::vector<SuiteResult> results;
+    std::printf("== suite: seconds per operation ==\n");
+    std::printf("%-10s %10s %14s %10s\n", "op", "precision", "seconds", "iters");
+
+    for (int precision = 10; precision <= maxPrecision; precision *= 10) {
+        BigNumber a = randomFraction(precision), b = randomFraction(precision);
+        BigNumber x = randomFraction(precision).subtract(BigNumber("1"));  // аргумент exp/sin в [0, 1)
+        BigNumber n(std::to_string(precision));
+
+        const std::pair<const char*, std::function<void()>> ops[] = {
+            { "add", [&] { (void)a.add(b); } },
+            { "mul", [&] { (void)a.multiply(b); } },
+            { "div", [&] { (void)a.divide(b, precision); } },
+            { "pi", [&] { BigNumber::clearConstantsCache(); (void)BigNumber::pi(precision); } },
+            { "exp", [&] { (void)x.exp(precision); } },
+            { "sin", [&] { (void)x.sin(precision); } },
+            { "factorial", [&] { (void)n.factorial(); } },
+        };
+        for (const auto& op : ops) {
+            op.second();  // прогрев: константы в кэше, как в рабочем режиме
+            long long iterations = 0;
+            auto start = clock::now();
+            double elapsed = 0.0;
+            do {
+                op.second();
+                ++iterations;
+                elapsed = std::chrono::duration<double>(clock::now() - start).count();
+            } while (elapsed < 0.2);
+            SuiteResult r{ op.first, precision, elapsed / (double)iterations, iterations };
+            std::printf("%-10s %10d %14.9f %10lld\n", r.op.c_str(), r.precision, r.seconds, r.iterations);
+            std::fflush(stdout);
+            results.push_back(r);
+        }
+    }
+    return results;
+}
+
+static bool writeSuiteJson(const std::vector<SuiteResult>& results, const char* path) {
+    FILE* f = std::fopen(path, "w");
+    if (!f) return false;
+    std::fprintf(f, "{\n  \"engine\": \"native\",\n  \"results\": [\n");
+    for (size_t i = 0; i < results.size(); ++i) {
+        const SuiteResult& r = results[i];
+        std::fprintf(f, "    {\"op\": \"%s\", \"precision\": %d, \"seconds\": %.9g, \"iterations\": %lld}%s\n",
+                     r.op.c_str(), r.precision, r.seconds, r.iterations, i + 1 < results.size() ? "," : "");
+    }
+    std::fprintf(f, "  ]\n}\n");
+    return std::fclose(f) == 0;
+}
+
+int main(int argc, char** argv) {
+    bool multiply = argc < 2;
+    bool divide = argc < 2;
+    bool ln = argc < 2;
+    bool suite = false;
+    const char* jsonPath = nullptr;
+    int maxPrecision = 100000;
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--multiply") multiply = true;
+        else if (arg == "--divide") divide = true;
+        else if (arg == "--ln") ln = true;
+        else if (arg == "--suite") suite = true;
+        else if (arg == "--json" && i + 1 < argc) jsonPath = argv[++i];
+        else if (arg == "--max-precision" && i + 1 < argc) maxPrecision = std::atoi(argv[++i]);
+        else {
+            std::fprintf(stderr, "Unknown option: %s\nUsage: bench_calculate [--multiply] [--divide] [--ln] "
+                                 "[--suite] [--json FILE] [--max-precision N]\n", argv[i]);
+            return 2;
+        }
+    }
+    if (multiply) benchMultiply();
+    if (divide) benchDivide();
+    if (ln) benchLn();
+    if (suite || jsonPath) {
+        std::vector<SuiteResult> results = runSuite(maxPrecision);
+        if (jsonPath && !writeSuiteJson(results, jsonPath)) {
+            std::fprintf(stderr, "Cannot write %s\n", jsonPath);
+            return 1;
+        }
+    }
+    return 0;
+}
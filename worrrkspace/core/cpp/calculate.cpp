@@ -1,5 +1,6 @@
 // calculate.cpp
 #include "calculate.h"
+#include "thread_pool.h"
 #include <sstream>
 #include <stack>
 #include <algorithm>
@@ -7,48 +8,272 @@
 #include <iostream>
 #include <iomanip>
 #include <cstring>
+#include <cstdlib>
 #include <stdexcept>
 #include <cctype>
+#include <mutex>
+#include <limits>
+
+typedef BigNumber::Limb Limb;
+typedef BigNumber::LimbVector LimbVector;
+
+// ------------------ Профилирование ------------------
+
+static thread_local OperationProfile* t_profile = nullptr;
+
+void OperationProfile::merge(const OperationProfile& other) {
+    for (int i = 0; i < OPERATION_COUNT; ++i) {
+        calls[i] += other.calls[i];
+        nanoseconds[i] += other.nanoseconds[i];
+        limbs[i] += other.limbs[i];
+    }
+    peakLimbs = std::max(peakLimbs, other.peakLimbs);
+    peakHeapBytes = std::max(peakHeapBytes, other.peakHeapBytes);
+}
+
+ProfileScope::ProfileScope(OperationProfile& target_, std::mutex& targetMutex_)
+    : target(target_), targetMutex(targetMutex_), previousProfile(t_profile), previousHeap(SmallVectorHeapUsage::current()) {
+    t_profile = &profile;
+    SmallVectorHeapUsage::current() = &heap;
+}
+
+ProfileScope::~ProfileScope() {
+    if (heap.peak > 0 && (std::uint64_t)heap.peak > profile.peakHeapBytes) profile.peakHeapBytes = (std::uint64_t)heap.peak;
+    t_profile = previousProfile;
+    SmallVectorHeapUsage::current() = previousHeap;
+    if (previousHeap) {
+        // Пик вложенного вычисления - поверх того, что внешнее уже держало в куче
+        if (previousHeap->bytes + heap.peak > previousHeap->peak) previousHeap->peak = previousHeap->bytes + heap.peak;
+        previousHeap->bytes += heap.bytes;
+    }
+    std::lock_guard<std::mutex> lock(targetMutex);
+    target.merge(profile);
+}
+
+// Время операции в профиле потока (если он собирается и enabled)
+class OperationTimer {
+public:
+    explicit OperationTimer(OperationProfile::Operation op_, bool enabled = true)
+        : profile(enabled ? t_profile : nullptr), op(op_) {
+        if (profile) start = std::chrono::steady_clock::now();
+    }
+
+    ~OperationTimer() {
+        if (!profile) return;
+        profile->nanoseconds[op] += (std::uint64_t)std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now() - start).count();
+    }
+
+    OperationTimer(const OperationTimer&) = delete;
+    OperationTimer& operator=(const OperationTimer&) = delete;
+
+private:
+    OperationProfile* profile;
+    OperationProfile::Operation op;
+    std::chrono::steady_clock::time_point start;
+};
+
+// Вызов, длина операндов и время операции
+class ProfiledOperation {
+public:
+    ProfiledOperation(OperationProfile::Operation op, size_t limbs) : timer(op) {
+        if (!t_profile) return;
+        ++t_profile->calls[op];
+        t_profile->limbs[op] += limbs;
+    }
+
+private:
+    OperationTimer timer;
+};
+
+// Счётчик без замера времени (члены рядов, попадания в кэш)
+static void countOperation(OperationProfile::Operation op, std::uint64_t count = 1) {
+    if (t_profile) t_profile->calls[op] += count;
+}
+
+// Умножения и деления короче этого (в лимбах) не замеряются: чтение часов дороже
+// самой операции, а их время всё равно входит во время вызвавшей функции
+static const size_t PROFILE_TIMED_LIMBS = 16;
+
+// Учёт умножения или деления; true - операнды длинные и операцию стоит замерить
+static bool countArithmetic(OperationProfile::Operation op, size_t a, size_t b) {
+    OperationProfile* profile = t_profile;
+    if (!profile) return false;
+    ++profile->calls[op];
+    profile->limbs[op] += a + b;
+    size_t longest = std::max(a, b);
+    if (longest > profile->peakLimbs) profile->peakLimbs = longest;
+    return longest >= PROFILE_TIMED_LIMBS;
+}
+
+// ------------------ Лимбы: вспомогательные функции ------------------
+
+static const Limb POW10_LIMB[10] = {
+    1u, 10u, 100u, 1000u, 10000u, 100000u, 1000000u, 10000000u, 100000000u, 1000000000u
+};
+
+static bool isZeroLimbs(const LimbVector& a) {
+    return a.size() == 1 && a[0] == 0;
+}
+
+// a *= m, где 0 < m <= 10^9
+static void mulSmallLimbs(LimbVector& a, Limb m) {
+    if (m == 1 || isZeroLimbs(a)) return;
+    std::uint64_t carry = 0;
+    for (size_t i = 0; i < a.size(); ++i) {
+        std::uint64_t cur = (std::uint64_t)a[i] * m + carry;
+        a[i] = (Limb)(cur % BigNumber::LIMB_BASE);
+        carry = cur / BigNumber::LIMB_BASE;
+    }
+    while (carry) {
+        a.push_back((Limb)(carry % BigNumber::LIMB_BASE));
+        carry /= BigNumber::LIMB_BASE;
+    }
+}
+
+// a /= d (целочисленно), возвращает остаток; 0 < d <= 10^9
+static Limb divSmallLimbs(LimbVector& a, Limb d) {
+    std::uint64_t rem = 0;
+    for (size_t i = a.size(); i-- > 0;) {
+        std::uint64_t cur = (std::uint64_t)a[i] + rem * BigNumber::LIMB_BASE;
+        a[i] = (Limb)(cur / d);
+        rem = cur % d;
+    }
+    while (a.size() > 1 && a.back() == 0) a.pop_back();
+    return (Limb)rem;
+}
+
+// a *= 10^k
+static void shiftLeftDecimal(LimbVector& a, int k) {
+    if (k <= 0 || isZeroLimbs(a)) return;
+    mulSmallLimbs(a, POW10_LIMB[k % BigNumber::LIMB_DIGITS]);
+    a.insert(a.begin(), (size_t)(k / BigNumber::LIMB_DIGITS), 0);
+}
+
+// i-я десятичная цифра мантиссы (0 - младшая)
+static int decimalDigitAt(const LimbVector& a, size_t i) {
+    size_t li = i / BigNumber::LIMB_DIGITS;
+    if (li >= a.size()) return 0;
+    return (int)((a[li] / POW10_LIMB[i % BigNumber::LIMB_DIGITS]) % 10);
+}
+
+// a = floor(a / 10^k)
+static void shiftRightDecimal(LimbVector& a, int k) {
+    if (k <= 0) return;
+    size_t limbShift = (size_t)(k / BigNumber::LIMB_DIGITS);
+    if (limbShift >= a.size()) {
+        a.assign(1, 0);
+        return;
+    }
+    a.erase(a.begin(), a.begin() + limbShift);
+    divSmallLimbs(a, POW10_LIMB[k % BigNumber::LIMB_DIGITS]);
+}
+
+// количество десятичных цифр мантиссы (у нуля - одна)
+static int decimalDigitCount(const LimbVector& a) {
+    Limb top = a.back();
+    int n = 1;
+    while (n < BigNumber::LIMB_DIGITS && top >= POW10_LIMB[n]) ++n;
+    return (int)(a.size() - 1) * BigNumber::LIMB_DIGITS + n;
+}
+
+// количество нулей в младших десятичных разрядах
+static int trailingDecimalZeros(const LimbVector& a) {
+    if (isZeroLimbs(a)) return 0;
+    int zeros = 0;
+    size_t i = 0;
+    while (a[i] == 0) { zeros += BigNumber::LIMB_DIGITS; ++i; }
+    Limb v = a[i];
+    while (v % 10 == 0) { v /= 10; ++zeros; }
+    return zeros;
+}
+
+// Машинные слова: мантисса до двух лимбов (< 10^18) помещается в uint64_t,
+// и сложение/вычитание таких чисел обходится без циклов по лимбам.
+// Результат, не влезающий в слово, просто занимает следующий лимб.
+static bool fitsWord(const LimbVector& a) {
+    return a.size() <= 2;
+}
+
+static std::uint64_t toWord(const LimbVector& a) {
+    return a.size() == 1 ? a[0] : a[0] + (std::uint64_t)a[1] * BigNumber::LIMB_BASE;
+}
+
+static LimbVector fromWord(std::uint64_t v) {
+    LimbVector r;
+    do {
+        r.push_back((Limb)(v % BigNumber::LIMB_BASE));
+        v /= BigNumber::LIMB_BASE;
+    } while (v);
+    return r;
+}
+
+// MSB-first строка цифр -> лимбы
+static LimbVector limbsFromDecimal(const char* s, size_t len) {
+    LimbVector a;
+    a.reserve(len / BigNumber::LIMB_DIGITS + 1);
+    size_t end = len;
+    while (end > 0) {
+        size_t begin = end >= (size_t)BigNumber::LIMB_DIGITS ? end - BigNumber::LIMB_DIGITS : 0;
+        Limb v = 0;
+        for (size_t i = begin; i < end; ++i) v = v * 10 + (Limb)(s[i] - '0');
+        a.push_back(v);
+        end = begin;
+    }
+    if (a.empty()) a.push_back(0);
+    while (a.size() > 1 && a.back() == 0) a.pop_back();
+    return a;
+}
+
+// лимбы -> MSB-first строка цифр без ведущих нулей
+static std::string limbsToDecimal(const LimbVector& a) {
+    std::string s = std::to_string(a.back());
+    s.reserve(a.size() * BigNumber::LIMB_DIGITS);
+    char buf[BigNumber::LIMB_DIGITS];
+    for (size_t i = a.size() - 1; i-- > 0;) {
+        Limb v = a[i];
+        for (int j = BigNumber::LIMB_DIGITS - 1; j >= 0; --j) {
+            buf[j] = char('0' + v % 10);
+            v /= 10;
+        }
+        s.append(buf, BigNumber::LIMB_DIGITS);
+    }
+    return s;
+}
 
 // ------------------ Конструкторы и базовые методы ------------------
 
-BigNumber::BigNumber() : digits({ 0 }), negative(false), decimalPoint(0) {}
+BigNumber::BigNumber() : limbs({ 0 }), negative(false), decimalPoint(0) {}
 
 BigNumber::BigNumber(const std::string& str) : negative(false), decimalPoint(0) {
     std::string s = str;
     // trim spaces
     s.erase(std::remove_if(s.begin(), s.end(), ::isspace), s.end());
     if (s.empty()) {
-        digits = { 0 };
+        limbs = { 0 };
         negative = false;
         decimalPoint = 0;
         return;
     }
 
-    if (s[0] == '+') s = s.substr(1);
-    if (!s.empty() && s[0] == '-') {
+    size_t start = 0;
+    if (s[0] == '+') start = 1;
+    if (start < s.size() && s[start] == '-') {
         negative = true;
-        s = s.substr(1);
+        ++start;
     }
 
-    size_t dot = s.find('.');
+    size_t dot = s.find('.', start);
     if (dot != std::string::npos) {
         decimalPoint = (int)(s.size() - dot - 1);
         s.erase(dot, 1);
     }
 
-    // remove leading zeros in MSB side of the string
-    size_t pos = 0;
-    while (pos + 1 < s.size() && s[pos] == '0') ++pos;
-    if (pos > 0) s = s.substr(pos);
-
-    // digits vector is LSB-first: digits[0] is least significant
-    digits.clear();
-    for (int i = (int)s.size() - 1; i >= 0; --i) {
+    for (size_t i = start; i < s.size(); ++i) {
         if (!isdigit((unsigned char)s[i])) throw std::invalid_argument("Invalid character in number");
-        digits.push_back(s[i] - '0');
     }
-    if (digits.empty()) digits.push_back(0);
+
+    limbs = limbsFromDecimal(s.data() + start, s.size() - start);
     removeLeadingZeros();
 }
 
@@ -60,48 +285,94 @@ BigNumber::BigNumber(double value) {
 }
 
 BigNumber::BigNumber(const std::vector<int>& digits_, bool negative_, int decimalPoint_)
-    : digits(digits_), negative(negative_), decimalPoint(decimalPoint_) {
+    : negative(negative_), decimalPoint(decimalPoint_) {
+    limbs.assign(digits_.size() / LIMB_DIGITS + 1, 0);
+    for (size_t i = 0; i < digits_.size(); ++i) {
+        limbs[i / LIMB_DIGITS] += (Limb)digits_[i] * POW10_LIMB[i % LIMB_DIGITS];
+    }
     removeLeadingZeros();
 }
 
+BigNumber BigNumber::fromLimbs(LimbVector&& limbs_, bool negative_, int decimalPoint_) {
+    BigNumber r;
+    r.limbs = std::move(limbs_);
+    r.negative = negative_;
+    r.decimalPoint = decimalPoint_;
+    r.removeLeadingZeros();
+    return r;
+}
+
+// ------------------ Двоичная запись ------------------
+// [флаги: 1 байт, бит 0 - знак][decimalPoint: 4][число лимбов: 4][лимбы по 4 байта], little-endian
+
+static void appendU32(std::string& out, std::uint32_t v) {
+    char bytes[4] = { (char)(v & 0xFF), (char)((v >> 8) & 0xFF), (char)((v >> 16) & 0xFF), (char)(v >> 24) };
+    out.append(bytes, 4);
+}
+
+static std::uint32_t readU32(const char* p) {
+    const unsigned char* b = reinterpret_cast<const unsigned char*>(p);
+    return (std::uint32_t)b[0] | ((std::uint32_t)b[1] << 8) | ((std::uint32_t)b[2] << 16) | ((std::uint32_t)b[3] << 24);
+}
+
+void BigNumber::appendBinary(std::string& out) const {
+    out.reserve(out.size() + 9 + limbs.size() * 4);
+    out.push_back(negative ? 1 : 0);
+    appendU32(out, (std::uint32_t)decimalPoint);
+    appendU32(out, (std::uint32_t)limbs.size());
+    for (Limb limb : limbs) appendU32(out, limb);
+}
+
+bool BigNumber::fromBinary(const char* data, std::size_t size, BigNumber& out) {
+    if (size < 9 || (data[0] & ~1) != 0) return false;
+    int dp = (int)readU32(data + 1);
+    std::uint32_t count = readU32(data + 5);
+    if (dp < 0 || count == 0 || (size - 9) / 4 != count || (size - 9) % 4 != 0) return false;
+
+    LimbVector limbs_;
+    limbs_.resize(count);
+    for (std::uint32_t i = 0; i < count; ++i) {
+        limbs_[i] = readU32(data + 9 + 4 * (std::size_t)i);
+        if (limbs_[i] >= LIMB_BASE) return false;
+    }
+    out = fromLimbs(std::move(limbs_), data[0] == 1, dp);
+    return true;
+}
+
+std::vector<int> BigNumber::getDigits() const {
+    int n = decimalDigitCount(limbs);
+    std::vector<int> digits((size_t)n);
+    for (int i = 0; i < n; ++i) digits[i] = decimalDigitAt(limbs, (size_t)i);
+    return digits;
+}
+
 std::string BigNumber::toString() const {
     if (isZero()) return "0";
 
+    std::string mantissa = limbsToDecimal(limbs);
     std::string s;
     if (negative) s.push_back('-');
 
-    // Build MSB-first string from digits (digits LSB-first)
-    int n = (int)digits.size();
-    for (int i = n - 1; i >= 0; --i) s.push_back(char('0' + digits[i]));
-
-    // Insert decimal point if needed
-    if (decimalPoint > 0) {
-        int pos = (int)s.size() - decimalPoint;
-        if (s[0] == '-') pos -= 1; // adjust for sign
-        // If pos <= sign position, we need to add leading "0."
-        if (pos <= (negative ? 1 : 0)) {
-            // build: sign + "0." + leading zeros + digits
-            std::string digitsOnly = (negative ? s.substr(1) : s);
-            std::string res;
-            if (negative) res.push_back('-');
-            res += "0.";
-            int zeros = (decimalPoint - (int)digitsOnly.size());
-            if (zeros < 0) zeros = 0;
-            for (int i = 0; i < zeros; ++i) res.push_back('0');
-            res += digitsOnly;
-            return res;
-        }
-        else {
-            // insert '.' before character at position pos
-            if (negative) pos = pos - 1; // because s includes sign
-            s.insert(s.size() - decimalPoint, ".");
-        }
+    if (decimalPoint <= 0) {
+        s += mantissa;
+    }
+    else if ((int)mantissa.size() <= decimalPoint) {
+        // build: sign + "0." + leading zeros + digits
+        s += "0.";
+        s.append((size_t)(decimalPoint - (int)mantissa.size()), '0');
+        s += mantissa;
+    }
+    else {
+        // insert '.' before the last decimalPoint digits
+        s.append(mantissa, 0, mantissa.size() - decimalPoint);
+        s.push_back('.');
+        s.append(mantissa, mantissa.size() - decimalPoint, std::string::npos);
     }
     return s;
 }
 
 int BigNumber::getPrecision() const {
-    return (int)digits.size();
+    return decimalDigitCount(limbs);
 }
 
 void BigNumber::setPrecision(int precision) {
@@ -111,34 +382,17 @@ void BigNumber::setPrecision(int precision) {
         // Уменьшаем количество цифр после десятичной точки до precision
         int digitsToRemove = decimalPoint - precision;
 
-        // Проверяем необходимость округления
-        if (digitsToRemove > 0 && digits.size() > digitsToRemove) {
-            if (digits[digitsToRemove - 1] >= 5) {
-                // Округляем вверх
-                int carry = 1;
-                for (int i = digitsToRemove; i < digits.size() && carry; i++) {
-                    digits[i] += carry;
-                    if (digits[i] >= 10) {
-                        digits[i] -= 10;
-                        carry = 1;
-                    }
-                    else {
-                        carry = 0;
-                    }
-                }
-                if (carry) {
-                    digits.push_back(1);
-                }
-            }
-        }
+        // Округление по первой отбрасываемой цифре
+        bool roundUp = decimalDigitAt(limbs, (size_t)(digitsToRemove - 1)) >= 5;
 
         // Удаляем лишние цифры
-        digits.erase(digits.begin(), digits.begin() + digitsToRemove);
+        shiftRightDecimal(limbs, digitsToRemove);
+        if (roundUp) limbs = addArrays(limbs, LimbVector{ 1 });
         decimalPoint = precision;
     }
     else if (decimalPoint < precision) {
         // Добавляем нули для увеличения точности
-        digits.insert(digits.begin(), precision - decimalPoint, 0);
+        shiftLeftDecimal(limbs, precision - decimalPoint);
         decimalPoint = precision;
     }
 
@@ -146,7 +400,7 @@ void BigNumber::setPrecision(int precision) {
 }
 
 bool BigNumber::isZero() const {
-    return digits.size() == 1 && digits[0] == 0;
+    return isZeroLimbs(limbs);
 }
 
 BigNumber BigNumber::abs() const {
@@ -156,81 +410,383 @@ BigNumber BigNumber::abs() const {
 }
 
 void BigNumber::removeLeadingZeros() {
-    // digits LSB-first. Leading zeros are at the end (MSB side)
-    while (digits.size() > 1 && digits.back() == 0) digits.pop_back();
-    if (digits.empty()) {
-        digits = { 0 };
+    // limbs LSB-first. Leading zeros are at the end (MSB side)
+    while (limbs.size() > 1 && limbs.back() == 0) limbs.pop_back();
+    if (limbs.empty()) {
+        limbs = { 0 };
         negative = false;
         decimalPoint = 0;
     }
 }
 
 // Utility: trim leading zeros for LSB-first vector (i.e., pop_back zeroes)
-void BigNumber::trimLSBVector(std::vector<int>& a) {
+void BigNumber::trimLSBVector(LimbVector& a) {
     while (a.size() > 1 && a.back() == 0) a.pop_back();
+    if (a.empty()) a.push_back(0);
 }
 
-// Align decimals by padding LSB side (inserting zeros at begin)
+// Align decimals by scaling the mantissa with fewer fractional digits
 void BigNumber::alignDecimals(BigNumber& other, int& newDecimal) {
     int maxDecimal = std::max(decimalPoint, other.decimalPoint);
     newDecimal = maxDecimal;
     if (decimalPoint < maxDecimal) {
-        digits.insert(digits.begin(), maxDecimal - decimalPoint, 0);
+        shiftLeftDecimal(limbs, maxDecimal - decimalPoint);
         decimalPoint = maxDecimal;
     }
     if (other.decimalPoint < maxDecimal) {
-        other.digits.insert(other.digits.begin(), maxDecimal - other.decimalPoint, 0);
+        shiftLeftDecimal(other.limbs, maxDecimal - other.decimalPoint);
         other.decimalPoint = maxDecimal;
     }
-    // equalize overall length
-    size_t maxLen = std::max(digits.size(), other.digits.size());
-    if (digits.size() < maxLen) digits.resize(maxLen, 0);
-    if (other.digits.size() < maxLen) other.digits.resize(maxLen, 0);
 }
 
 // ------------------ Простые операции над массивами ------------------
 
-std::vector<int> BigNumber::addArrays(const std::vector<int>& a, const std::vector<int>& b) const {
-    std::vector<int> res;
-    int carry = 0;
-    size_t n = std::max(a.size(), b.size());
-    for (size_t i = 0; i < n || carry; ++i) {
-        int s = carry;
-        if (i < a.size()) s += a[i];
-        if (i < b.size()) s += b[i];
-        res.push_back(s % 10);
-        carry = s / 10;
-    }
+LimbVector BigNumber::addArrays(const LimbVector& a, const LimbVector& b) {
+    const LimbVector& longer = a.size() >= b.size() ? a : b;
+    const LimbVector& shorter = a.size() >= b.size() ? b : a;
+    LimbVector res;
+    res.reserve(longer.size() + 1);
+    Limb carry = 0;
+    for (size_t i = 0; i < longer.size(); ++i) {
+        Limb s = longer[i] + carry + (i < shorter.size() ? shorter[i] : 0);
+        carry = s >= LIMB_BASE ? 1 : 0;
+        res.push_back(carry ? s - LIMB_BASE : s);
+    }
+    if (carry) res.push_back(carry);
     trimLSBVector(res);
     return res;
 }
 
-std::vector<int> BigNumber::subtractArrays(const std::vector<int>& a, const std::vector<int>& b) const {
+LimbVector BigNumber::subtractArrays(const LimbVector& a, const LimbVector& b) {
     // assume a >= b
-    std::vector<int> res(a);
-    int borrow = 0;
+    LimbVector res(a);
+    Limb borrow = 0;
     for (size_t i = 0; i < res.size(); ++i) {
-        int sub = res[i] - borrow - (i < b.size() ? b[i] : 0);
-        if (sub < 0) {
-            sub += 10;
+        Limb sub = (i < b.size() ? b[i] : 0) + borrow;
+        if (sub == 0 && i >= b.size()) break;
+        if (res[i] < sub) {
+            res[i] = res[i] + LIMB_BASE - sub;
             borrow = 1;
         }
-        else borrow = 0;
-        res[i] = sub;
+        else {
+            res[i] -= sub;
+            borrow = 0;
+        }
     }
     trimLSBVector(res);
     return res;
 }
 
-std::vector<int> BigNumber::multiplyArrays(const std::vector<int>& a, const std::vector<int>& b) const {
-    std::vector<int> res(a.size() + b.size(), 0);
-    for (size_t i = 0; i < a.size(); ++i) {
-        int carry = 0;
-        for (size_t j = 0; j < b.size() || carry; ++j) {
-            long long cur = res[i + j] + (long long)a[i] * (j < b.size() ? b[j] : 0) + carry;
-            res[i + j] = (int)(cur % 10);
-            carry = (int)(cur / 10);
+// ------------------ Умножение мантисс ------------------
+
+// Пороги (в лимбах по меньшему операнду), начиная с которых включаются
+// Karatsuba, Toom-3 и NTT. Значения подобраны bench_calculate (--multiply).
+static int g_karatsubaThreshold = 64;
+static int g_toom3Threshold = 384;
+static int g_nttThreshold = 1024;
+
+void BigNumber::setMultiplyThresholds(int karatsuba, int toom3, int ntt) {
+    g_karatsubaThreshold = std::max(2, karatsuba);
+    g_toom3Threshold = std::max(3, toom3);
+    g_nttThreshold = std::max(1, ntt);
+}
+
+int BigNumber::getKaratsubaThreshold() { return g_karatsubaThreshold; }
+int BigNumber::getToom3Threshold() { return g_toom3Threshold; }
+int BigNumber::getNTTThreshold() { return g_nttThreshold; }
+
+// a[from, from + len) как отдельное число (без ведущих нулей)
+static LimbVector sliceLimbs(const LimbVector& a, size_t from, size_t len) {
+    if (from >= a.size()) return { 0 };
+    size_t to = std::min(a.size(), from + len);
+    LimbVector r(a.begin() + from, a.begin() + to);
+    while (r.size() > 1 && r.back() == 0) r.pop_back();
+    return r;
+}
+
+// acc += z * BASE^shift; acc должен вмещать результат
+static void addShiftedLimbs(LimbVector& acc, const LimbVector& z, size_t shift) {
+    Limb carry = 0;
+    size_t i = 0;
+    for (; i < z.size(); ++i) {
+        Limb s = acc[shift + i] + z[i] + carry;
+        carry = s >= BigNumber::LIMB_BASE ? 1 : 0;
+        acc[shift + i] = carry ? s - BigNumber::LIMB_BASE : s;
+    }
+    for (size_t k = shift + i; carry && k < acc.size(); ++k) {
+        Limb s = acc[k] + carry;
+        carry = s >= BigNumber::LIMB_BASE ? 1 : 0;
+        acc[k] = carry ? s - BigNumber::LIMB_BASE : s;
+    }
+}
+
+// Знаковое целое для интерполяции Toom-3
+struct SignedLimbs {
+    LimbVector mag;
+    bool negative;
+};
+
+LimbVector BigNumber::multiplyArrays(const LimbVector& a, const LimbVector& b) {
+    if (isZeroLimbs(a) || isZeroLimbs(b)) return { 0 };
+    const LimbVector& shorter = a.size() <= b.size() ? a : b;
+    const LimbVector& longer = a.size() <= b.size() ? b : a;
+    size_t n = shorter.size();
+
+    // Множитель в один лимб: один проход без промежуточного буфера
+    if (n == 1) {
+        if (longer.size() == 1) return fromWord((std::uint64_t)a[0] * b[0]);
+        LimbVector res = longer;
+        mulSmallLimbs(res, shorter[0]);
+        return res;
+    }
+
+    if ((int)n < g_karatsubaThreshold) return multiplySchoolbook(a, b);
+    if ((int)n >= g_nttThreshold) return multiplyNTT(a, b);
+
+    // Сильно несбалансированные операнды: режем длинный на куски длины короткого
+    if (longer.size() >= 2 * n) {
+        LimbVector res(longer.size() + n + 1, 0);
+        for (size_t from = 0; from < longer.size(); from += n) {
+            LimbVector part = multiplyArrays(sliceLimbs(longer, from, n), shorter);
+            addShiftedLimbs(res, part, from);
+        }
+        trimLSBVector(res);
+        return res;
+    }
+
+    if ((int)n < g_toom3Threshold) return multiplyKaratsuba(a, b);
+    return multiplyToom3(a, b);
+}
+
+LimbVector BigNumber::multiplySchoolbook(const LimbVector& a, const LimbVector& b) {
+    if (isZeroLimbs(a) || isZeroLimbs(b)) return { 0 };
+    // Накапливаем в 64-битных ячейках; перенос делаем раз в 18 шагов,
+    // чтобы сумма произведений (< 10^18 каждое) не переполнила uint64
+    std::vector<std::uint64_t> acc(a.size() + b.size(), 0);
+    const LimbVector& outer = a.size() <= b.size() ? a : b;
+    const LimbVector& inner = a.size() <= b.size() ? b : a;
+    for (size_t i = 0; i < outer.size(); ++i) {
+        std::uint64_t ai = outer[i];
+        if (ai != 0) {
+            for (size_t j = 0; j < inner.size(); ++j) acc[i + j] += ai * inner[j];
+        }
+        if ((i + 1) % 18 == 0 || i + 1 == outer.size()) {
+            std::uint64_t carry = 0;
+            for (size_t k = 0; k < acc.size(); ++k) {
+                std::uint64_t cur = acc[k] + carry;
+                acc[k] = cur % LIMB_BASE;
+                carry = cur / LIMB_BASE;
+            }
+        }
+    }
+    LimbVector res(acc.size());
+    for (size_t k = 0; k < acc.size(); ++k) res[k] = (Limb)acc[k];
+    trimLSBVector(res);
+    return res;
+}
+
+// Karatsuba: z1 = (a0 + a1)(b0 + b1) - z0 - z2, три умножения половинной длины
+LimbVector BigNumber::multiplyKaratsuba(const LimbVector& a, const LimbVector& b) {
+    size_t half = (std::max(a.size(), b.size()) + 1) / 2;
+
+    LimbVector a0 = sliceLimbs(a, 0, half), a1 = sliceLimbs(a, half, a.size());
+    LimbVector b0 = sliceLimbs(b, 0, half), b1 = sliceLimbs(b, half, b.size());
+
+    LimbVector z0 = multiplyArrays(a0, b0);
+    LimbVector z2 = multiplyArrays(a1, b1);
+    LimbVector z1 = multiplyArrays(addArrays(a0, a1), addArrays(b0, b1));
+    z1 = subtractArrays(subtractArrays(z1, z0), z2);
+
+    LimbVector res(a.size() + b.size() + 1, 0);
+    addShiftedLimbs(res, z0, 0);
+    addShiftedLimbs(res, z1, half);
+    addShiftedLimbs(res, z2, 2 * half);
+    trimLSBVector(res);
+    return res;
+}
+
+// Toom-3 (точки 0, 1, -1, -2, inf; интерполяция по Bodrato): пять умножений трети длины
+LimbVector BigNumber::multiplyToom3(const LimbVector& a, const LimbVector& b) {
+    size_t k = (std::max(a.size(), b.size()) + 2) / 3;
+
+    auto signedAdd = [](const SignedLimbs& x, const SignedLimbs& y, bool subtractY = false) -> SignedLimbs {
+        bool yNeg = subtractY ? !y.negative : y.negative;
+        if (x.negative == yNeg) return { addArrays(x.mag, y.mag), x.negative };
+        int cmp = compareArrays(x.mag, y.mag);
+        if (cmp == 0) return { { 0 }, false };
+        if (cmp > 0) return { subtractArrays(x.mag, y.mag), x.negative };
+        return { subtractArrays(y.mag, x.mag), yNeg };
+        };
+    // точное деление на малое число (остаток обязан быть нулевым)
+    auto signedDivExact = [](SignedLimbs x, Limb d) -> SignedLimbs {
+        divSmallLimbs(x.mag, d);
+        if (isZeroLimbs(x.mag)) x.negative = false;
+        return x;
+        };
+
+    SignedLimbs m0{ sliceLimbs(a, 0, k), false }, m1{ sliceLimbs(a, k, k), false }, m2{ sliceLimbs(a, 2 * k, a.size()), false };
+    SignedLimbs n0{ sliceLimbs(b, 0, k), false }, n1{ sliceLimbs(b, k, k), false }, n2{ sliceLimbs(b, 2 * k, b.size()), false };
+
+    // Значения многочленов в точках
+    auto evaluate = [&signedAdd](const SignedLimbs& c0, const SignedLimbs& c1, const SignedLimbs& c2,
+                       SignedLimbs& p1, SignedLimbs& pm1, SignedLimbs& pm2) {
+        SignedLimbs t = signedAdd(c0, c2);
+        p1 = signedAdd(t, c1);
+        pm1 = signedAdd(t, c1, true);
+        // p(-2) = (p(-1) + c2) * 2 - c0
+        SignedLimbs u = signedAdd(pm1, c2);
+        mulSmallLimbs(u.mag, 2);
+        pm2 = signedAdd(u, c0, true);
+        };
+
+    SignedLimbs p1, pm1, pm2, q1, qm1, qm2;
+    evaluate(m0, m1, m2, p1, pm1, pm2);
+    evaluate(n0, n1, n2, q1, qm1, qm2);
+
+    auto mul = [](const SignedLimbs& x, const SignedLimbs& y) -> SignedLimbs {
+        LimbVector mag = multiplyArrays(x.mag, y.mag);
+        bool neg = (x.negative != y.negative) && !isZeroLimbs(mag);
+        return { mag, neg };
+        };
+
+    SignedLimbs r0 = mul(m0, n0);
+    SignedLimbs r1 = mul(p1, q1);
+    SignedLimbs rm1 = mul(pm1, qm1);
+    SignedLimbs rm2 = mul(pm2, qm2);
+    SignedLimbs rinf = mul(m2, n2);
+
+    // Интерполяция
+    SignedLimbs c3 = signedDivExact(signedAdd(rm2, r1, true), 3);
+    SignedLimbs c1 = signedDivExact(signedAdd(r1, rm1, true), 2);
+    SignedLimbs c2 = signedAdd(rm1, r0, true);
+    c3 = signedDivExact(signedAdd(c2, c3, true), 2);
+    SignedLimbs twoInf = rinf;
+    mulSmallLimbs(twoInf.mag, 2);
+    c3 = signedAdd(c3, twoInf);
+    c2 = signedAdd(signedAdd(c2, c1), rinf, true);
+    c1 = signedAdd(c1, c3, true);
+
+    // Все коэффициенты произведения неотрицательны
+    LimbVector res(a.size() + b.size() + 2, 0);
+    addShiftedLimbs(res, r0.mag, 0);
+    addShiftedLimbs(res, c1.mag, k);
+    addShiftedLimbs(res, c2.mag, 2 * k);
+    addShiftedLimbs(res, c3.mag, 3 * k);
+    addShiftedLimbs(res, rinf.mag, 4 * k);
+    trimLSBVector(res);
+    return res;
+}
+
+// ------------------ NTT: умножение для очень больших операндов ------------------
+// Лимбы (основание 10^9) служат коэффициентами; свёртка считается по трём
+// NTT-простым и восстанавливается по CRT (Garner). Коэффициент свёртки
+// < 2^24 * (10^9)^2 < p1 * p2 * p3, поэтому результат точный.
+
+static const std::uint32_t NTT_MOD1 = 167772161u;  // 5 * 2^25 + 1, корень 3
+static const std::uint32_t NTT_MOD2 = 469762049u;  // 7 * 2^26 + 1, корень 3
+static const std::uint32_t NTT_MOD3 = 754974721u;  // 45 * 2^24 + 1, корень 11
+static const size_t NTT_MAX_SIZE = (size_t)1 << 24;
+
+static std::uint32_t powMod(std::uint64_t base, std::uint64_t e, std::uint32_t mod) {
+    std::uint64_t result = 1;
+    base %= mod;
+    while (e) {
+        if (e & 1) result = result * base % mod;
+        base = base * base % mod;
+        e >>= 1;
+    }
+    return (std::uint32_t)result;
+}
+
+// модуль - параметр шаблона, чтобы компилятор заменил деление умножением
+template <std::uint32_t mod, std::uint32_t root>
+static void nttTransform(std::vector<std::uint32_t>& a, bool invert) {
+    size_t n = a.size();
+    for (size_t i = 1, j = 0; i < n; ++i) {
+        size_t bit = n >> 1;
+        for (; j & bit; bit >>= 1) j ^= bit;
+        j ^= bit;
+        if (i < j) std::swap(a[i], a[j]);
+    }
+
+    // Корни с предвычисленным множителем Шоупа: x * w mod p без деления
+    std::vector<std::uint32_t> roots(n / 2 > 0 ? n / 2 : 1);
+    std::vector<std::uint32_t> rootsShoup(roots.size());
+    for (size_t len = 2; len <= n; len <<= 1) {
+        std::uint32_t w = powMod(root, (mod - 1) / len, mod);
+        if (invert) w = powMod(w, mod - 2, mod);
+        size_t half = len / 2;
+        roots[0] = 1;
+        for (size_t k = 1; k < half; ++k) roots[k] = (std::uint32_t)((std::uint64_t)roots[k - 1] * w % mod);
+        for (size_t k = 0; k < half; ++k) rootsShoup[k] = (std::uint32_t)(((std::uint64_t)roots[k] << 32) / mod);
+        for (size_t i = 0; i < n; i += len) {
+            std::uint32_t* lo = &a[i];
+            std::uint32_t* hi = &a[i + half];
+            for (size_t k = 0; k < half; ++k) {
+                std::uint32_t x = hi[k];
+                std::uint32_t q = (std::uint32_t)(((std::uint64_t)x * rootsShoup[k]) >> 32);
+                std::uint32_t v = x * roots[k] - q * mod;  // по модулю 2^32, результат в [0, 2p)
+                if (v >= mod) v -= mod;
+                std::uint32_t u = lo[k];
+                lo[k] = u + v >= mod ? u + v - mod : u + v;
+                hi[k] = u >= v ? u - v : u + mod - v;
+            }
+        }
+    }
+
+    if (invert) {
+        std::uint64_t nInv = powMod(n, mod - 2, mod);
+        for (auto& x : a) x = (std::uint32_t)(x * nInv % mod);
+    }
+}
+
+// свёртка лимбов по модулю mod
+template <std::uint32_t mod, std::uint32_t root>
+static std::vector<std::uint32_t> nttConvolve(const LimbVector& a, const LimbVector& b, size_t size) {
+    std::vector<std::uint32_t> fa(size, 0), fb(size, 0);
+    for (size_t i = 0; i < a.size(); ++i) fa[i] = a[i] % mod;
+    for (size_t i = 0; i < b.size(); ++i) fb[i] = b[i] % mod;
+    nttTransform<mod, root>(fa, false);
+    nttTransform<mod, root>(fb, false);
+    for (size_t i = 0; i < size; ++i) fa[i] = (std::uint32_t)((std::uint64_t)fa[i] * fb[i] % mod);
+    nttTransform<mod, root>(fa, true);
+    return fa;
+}
+
+LimbVector BigNumber::multiplyNTT(const LimbVector& a, const LimbVector& b) {
+    if (isZeroLimbs(a) || isZeroLimbs(b)) return { 0 };
+
+    size_t resultSize = a.size() + b.size() - 1;
+    size_t size = 1;
+    while (size < resultSize) size <<= 1;
+    if (size > NTT_MAX_SIZE) return multiplyToom3(a, b);
+
+    std::vector<std::uint32_t> r1 = nttConvolve<NTT_MOD1, 3>(a, b, size);
+    std::vector<std::uint32_t> r2 = nttConvolve<NTT_MOD2, 3>(a, b, size);
+    std::vector<std::uint32_t> r3 = nttConvolve<NTT_MOD3, 11>(a, b, size);
+
+    // Garner: x = x12 + p1*p2 * t3, где x12 = r1 + p1 * t2 < p1*p2 < 2^57.
+    // p1*p2 = hi * 10^9 + lo, поэтому слагаемое p1*p2*t3 раскладывается на
+    // lo*t3 в текущий разряд и hi*t3 в перенос - всё помещается в uint64.
+    const std::uint64_t p12 = (std::uint64_t)NTT_MOD1 * NTT_MOD2;
+    const std::uint64_t p12Lo = p12 % LIMB_BASE, p12Hi = p12 / LIMB_BASE;
+    const std::uint64_t p1InvModP2 = powMod(NTT_MOD1, NTT_MOD2 - 2, NTT_MOD2);
+    const std::uint64_t p12InvModP3 = powMod(p12 % NTT_MOD3, NTT_MOD3 - 2, NTT_MOD3);
+
+    LimbVector res(resultSize + 3, 0);
+    std::uint64_t carry = 0;
+    for (size_t i = 0; i < res.size(); ++i) {
+        std::uint64_t total = carry;
+        carry = 0;
+        if (i < resultSize) {
+            std::uint64_t t2 = (r2[i] + (std::uint64_t)NTT_MOD2 - r1[i] % NTT_MOD2) % NTT_MOD2 * p1InvModP2 % NTT_MOD2;
+            std::uint64_t x12 = r1[i] + (std::uint64_t)NTT_MOD1 * t2;
+            std::uint64_t t3 = (r3[i] + (std::uint64_t)NTT_MOD3 - x12 % NTT_MOD3) % NTT_MOD3 * p12InvModP3 % NTT_MOD3;
+            total += x12 + p12Lo * t3;
+            carry = p12Hi * t3;
         }
+        res[i] = (Limb)(total % LIMB_BASE);
+        carry += total / LIMB_BASE;
     }
     trimLSBVector(res);
     return res;
@@ -242,26 +798,17 @@ void BigNumber::divideByDigit(int digit) {
     if (digit == 1 || isZero()) return;
     if (digit == 0) throw std::runtime_error("Division by zero in divideByDigit");
 
-    std::vector<int> res(digits.size(), 0);
-    int rem = 0;
-    for (int i = (int)digits.size() - 1; i >= 0; --i) {
-        int cur = rem * 10 + digits[i];
-        res[i] = cur / digit;
-        rem = cur % digit;
-    }
-    // remove leading zeros (MSB) -> pop_back for LSB-first
-    while (res.size() > 1 && res.back() == 0) res.pop_back();
-    digits.swap(res);
+    divSmallLimbs(limbs, (Limb)digit);
     removeLeadingZeros();
-    // note: remainder rem is lost; if needed, change signature to return it
+    // note: remainder is lost; if needed, change signature to return it
 }
 
 // ------------------ Сравнения ------------------
 
-int BigNumber::compareArrays(const std::vector<int>& a, const std::vector<int>& b) const {
+int BigNumber::compareArrays(const LimbVector& a, const LimbVector& b) {
     if (a.size() > b.size()) return 1;
     if (a.size() < b.size()) return -1;
-    for (int i = (int)a.size() - 1; i >= 0; --i) {
+    for (size_t i = a.size(); i-- > 0;) {
         if (a[i] > b[i]) return 1;
         if (a[i] < b[i]) return -1;
     }
@@ -272,11 +819,17 @@ int BigNumber::compare(const BigNumber& other) const {
     if (!negative && other.negative) return 1;
     if (negative && !other.negative) return -1;
 
-    BigNumber a = *this;
-    BigNumber b = other;
-    int newDec = 0;
-    a.alignDecimals(b, newDec);
-    int cmp = compareArrays(a.digits, b.digits);
+    int cmp;
+    if (decimalPoint == other.decimalPoint) {
+        cmp = compareArrays(limbs, other.limbs);
+    }
+    else {
+        BigNumber a = *this;
+        BigNumber b = other;
+        int newDec = 0;
+        a.alignDecimals(b, newDec);
+        cmp = compareArrays(a.limbs, b.limbs);
+    }
     if (negative && other.negative) return -cmp;
     return cmp;
 }
@@ -285,153 +838,227 @@ int BigNumber::compare(const BigNumber& other) const {
 
 void BigNumber::multiplyByDigit(int digit) {
     if (digit == 1 || isZero()) return;
-    if (digit == 0) { digits = { 0 }; negative = false; decimalPoint = 0; return; }
-    std::vector<int> res;
-    int carry = 0;
-    for (size_t i = 0; i < digits.size() || carry; ++i) {
-        long long cur = carry + (i < digits.size() ? (long long)digits[i] * digit : 0);
-        res.push_back((int)(cur % 10));
-        carry = (int)(cur / 10);
-    }
-    digits.swap(res);
+    if (digit == 0) { limbs = { 0 }; negative = false; decimalPoint = 0; return; }
+    mulSmallLimbs(limbs, (Limb)digit);
     removeLeadingZeros();
 }
 
 bool BigNumber::isNormalized() const {
     if (isZero()) return true;
-    return digits.back() >= 5;
+    return decimalDigitAt(limbs, (size_t)(decimalDigitCount(limbs) - 1)) >= 5;
 }
 
 void BigNumber::normalize() {
-    // noop: not used in string division approach
+    // noop: divModKnuth нормализует свою копию делителя
 }
 
 void BigNumber::denormalize(int divisor) {
     // noop
 }
 
-// ------------------ DIVISION: helper long division on decimal strings ------------------
-
-// Compare decimal strings (no leading zeros expected, but handle)
-static int cmpStrNum(const std::string& a, const std::string& b) {
-    std::string aa = a; std::string bb = b;
-    // trim leading zeros
-    size_t pa = aa.find_first_not_of('0');
-    if (pa == std::string::npos) aa = "0"; else aa = aa.substr(pa);
-    size_t pb = bb.find_first_not_of('0');
-    if (pb == std::string::npos) bb = "0"; else bb = bb.substr(pb);
-    if (aa.size() != bb.size()) return aa.size() < bb.size() ? -1 : 1;
-    if (aa == bb) return 0;
-    return aa < bb ? -1 : 1;
-}
-
-static std::string subtractStr(const std::string& a, const std::string& b) {
-    // assume a >= b, both non-negative decimal strings MSB-first
-    std::string A = a;
-    std::string B = std::string(a.size() - b.size(), '0') + b; // pad left
-    int n = (int)A.size();
-    std::string res(n, '0');
-    int carry = 0;
-    for (int i = n - 1; i >= 0; --i) {
-        int da = A[i] - '0';
-        int db = B[i] - '0';
-        int cur = da - db - carry;
-        if (cur < 0) { cur += 10; carry = 1; }
-        else carry = 0;
-        res[i] = char('0' + cur);
-    }
-    // trim leading zeros
-    size_t pos = res.find_first_not_of('0');
-    if (pos == std::string::npos) return "0";
-    return res.substr(pos);
-}
-
-static std::string mulStrDigit(const std::string& s, int d) {
-    if (d == 0) return "0";
-    if (d == 1) {
-        // trim leading zeros
-        size_t pos = s.find_first_not_of('0');
-        if (pos == std::string::npos) return "0";
-        return s.substr(pos);
-    }
-    int n = (int)s.size();
-    std::string res;
-    int carry = 0;
-    for (int i = n - 1; i >= 0; --i) {
-        int cur = (s[i] - '0') * d + carry;
-        res.push_back(char('0' + (cur % 10)));
-        carry = cur / 10;
+// ------------------ DIVISION: целочисленное деление мантисс ------------------
+// Малый делитель (один лимб) - один проход divSmallLimbs, средний - алгоритм D
+// Кнута по основанию 10^9, большой - умножение на обратное, найденное Ньютоном.
+
+static int g_newtonDivisionThreshold = 2048;  // в лимбах делителя, см. bench_calculate --divide
+
+void BigNumber::setNewtonDivisionThreshold(int limbs) {
+    g_newtonDivisionThreshold = std::max(2, limbs);
+}
+
+int BigNumber::getNewtonDivisionThreshold() { return g_newtonDivisionThreshold; }
+
+// a * BASE^k
+static LimbVector shiftLimbsLeft(const LimbVector& a, size_t k) {
+    if (k == 0 || isZeroLimbs(a)) return a;
+    LimbVector r(k, 0);
+    r.insert(r.end(), a.begin(), a.end());
+    return r;
+}
+
+// floor(a / BASE^k)
+static LimbVector shiftLimbsRight(const LimbVector& a, size_t k) {
+    if (k >= a.size()) return { 0 };
+    return LimbVector(a.begin() + k, a.end());
+}
+
+void BigNumber::divModArrays(const LimbVector& a, const LimbVector& b,
+                             LimbVector& q, LimbVector& r) {
+    if (isZeroLimbs(b)) throw std::runtime_error("Division by zero");
+    if (compareArrays(a, b) < 0) {
+        q = { 0 };
+        r = a;
+        return;
     }
-    while (carry) {
-        res.push_back(char('0' + (carry % 10)));
-        carry /= 10;
+    if (b.size() == 1) {
+        q = a;
+        r = { divSmallLimbs(q, b[0]) };
+        return;
+    }
+    if ((int)b.size() < g_newtonDivisionThreshold) divModKnuth(a, b, q, r);
+    else divModNewton(a, b, q, r);
+}
+
+// Алгоритм D (Knuth, TAOCP 4.3.1) по основанию 10^9
+void BigNumber::divModKnuth(const LimbVector& a, const LimbVector& b,
+                            LimbVector& q, LimbVector& r) {
+    const std::uint64_t B = LIMB_BASE;
+    size_t n = b.size(), m = a.size();
+
+    // Нормализация: старший лимб делителя >= BASE / 2
+    Limb f = (Limb)(B / ((std::uint64_t)b.back() + 1));
+    LimbVector u = a, v = b;
+    mulSmallLimbs(u, f);
+    mulSmallLimbs(v, f);
+    u.resize(m + 1, 0);
+
+    q.assign(m - n + 1, 0);
+    for (size_t j = m - n + 1; j-- > 0;) {
+        std::uint64_t num = (std::uint64_t)u[j + n] * B + u[j + n - 1];
+        std::uint64_t qhat = num / v[n - 1];
+        std::uint64_t rhat = num % v[n - 1];
+        while (qhat >= B || qhat * v[n - 2] > rhat * B + u[j + n - 2]) {
+            --qhat;
+            rhat += v[n - 1];
+            if (rhat >= B) break;
+        }
+
+        // u[j..j+n] -= qhat * v
+        std::uint64_t carry = 0;
+        std::int64_t borrow = 0;
+        for (size_t i = 0; i < n; ++i) {
+            std::uint64_t p = qhat * v[i] + carry;
+            carry = p / B;
+            std::int64_t t = (std::int64_t)u[i + j] - (std::int64_t)(p % B) - borrow;
+            borrow = t < 0 ? 1 : 0;
+            u[i + j] = (Limb)(t < 0 ? t + (std::int64_t)B : t);
+        }
+        std::int64_t t = (std::int64_t)u[j + n] - (std::int64_t)carry - borrow;
+        if (t < 0) {
+            // qhat оказался на единицу больше: добавляем делитель обратно
+            u[j + n] = (Limb)(t + (std::int64_t)B);
+            --qhat;
+            Limb c = 0;
+            for (size_t i = 0; i < n; ++i) {
+                Limb s = u[i + j] + v[i] + c;
+                c = s >= LIMB_BASE ? 1 : 0;
+                u[i + j] = c ? s - LIMB_BASE : s;
+            }
+            u[j + n] = (Limb)((u[j + n] + c) % LIMB_BASE);
+        }
+        else {
+            u[j + n] = (Limb)t;
+        }
+        q[j] = (Limb)qhat;
     }
-    std::reverse(res.begin(), res.end());
-    size_t pos = res.find_first_not_of('0');
-    if (pos == std::string::npos) return "0";
-    return res.substr(pos);
+    trimLSBVector(q);
+
+    u.resize(n);
+    trimLSBVector(u);
+    divSmallLimbs(u, f);
+    r = u;
 }
 
-std::string BigNumber::longDivStrings(const std::string& dividend, const std::string& divisor) {
-    if (divisor == "0") throw std::runtime_error("Division by zero in string division");
-    std::string A = dividend;
-    std::string B = divisor;
-    // trim leading zeros
-    size_t pa = A.find_first_not_of('0'); if (pa == std::string::npos) A = "0"; else A = A.substr(pa);
-    size_t pb = B.find_first_not_of('0'); if (pb == std::string::npos) B = "0"; else B = B.substr(pb);
+// floor(BASE^(2n) / d), n = d.size(); Ньютон с удвоением точности
+LimbVector BigNumber::reciprocalArrays(const LimbVector& d) {
+    size_t n = d.size();
+    LimbVector power(2 * n, 0);
+    power.push_back(1);  // BASE^(2n)
 
-    if (cmpStrNum(A, B) < 0) return "0";
+    if (n <= 16) {
+        LimbVector q, r;
+        divModKnuth(power, d, q, r);
+        return q;
+    }
 
-    std::string result;
-    std::string cur; // current remainder string
-    for (size_t i = 0; i < A.size(); ++i) {
-        cur.push_back(A[i]);
-        // remove leading zeros
-        size_t p = cur.find_first_not_of('0'); if (p == std::string::npos) cur = "0"; else if (p > 0) cur = cur.substr(p);
-        // find digit q such that B*q <= cur < B*(q+1)
-        int q = 0;
-        // binary search 0..9 or simple loop 0..9 is fine
-        int low = 0, high = 9;
-        while (low <= high) {
-            int mid = (low + high) / 2;
-            std::string prod = mulStrDigit(B, mid);
-            int c = cmpStrNum(prod, cur);
-            if (c <= 0) {
-                q = mid;
-                low = mid + 1;
-            }
-            else {
-                high = mid - 1;
-            }
+    // Обратное к старшим h лимбам, затем один шаг V = V0 + V0 * (BASE^2n - d*V0) / BASE^2n.
+    // Ошибка шага ~ BASE^(n+3-2h), поэтому 2h >= n + 3: остаются единицы, их снимает коррекция
+    size_t h = (n + 4) / 2;
+    LimbVector vh = reciprocalArrays(shiftLimbsRight(d, n - h));
+    LimbVector v = shiftLimbsLeft(vh, n - h);
+
+    LimbVector p = multiplyArrays(d, v);
+    if (compareArrays(p, power) <= 0) {
+        LimbVector e = subtractArrays(power, p);
+        v = addArrays(v, shiftLimbsRight(multiplyArrays(v, e), 2 * n));
+    }
+    else {
+        LimbVector e = subtractArrays(p, power);
+        LimbVector delta = addArrays(shiftLimbsRight(multiplyArrays(v, e), 2 * n), LimbVector{ 1 });
+        v = compareArrays(v, delta) > 0 ? subtractArrays(v, delta) : LimbVector{ 0 };
+    }
+
+    // Точная коррекция до floor: d*v <= BASE^2n < d*(v+1)
+    p = multiplyArrays(d, v);
+    while (compareArrays(p, power) > 0) {
+        v = subtractArrays(v, LimbVector{ 1 });
+        p = subtractArrays(p, d);
+    }
+    LimbVector rest = subtractArrays(power, p);
+    while (compareArrays(rest, d) >= 0) {
+        v = addArrays(v, LimbVector{ 1 });
+        rest = subtractArrays(rest, d);
+    }
+    return v;
+}
+
+void BigNumber::divModNewton(const LimbVector& a, const LimbVector& b,
+                             LimbVector& q, LimbVector& r) {
+    size_t n = b.size(), m = a.size();
+    size_t qlen = m - n + 1;
+
+    // Частное короче делителя: хватает старших qlen + 2 лимбов обоих операндов,
+    // ошибка оценки - несколько единиц, её снимает точная коррекция по остатку
+    if (n > qlen + 2) {
+        size_t s = n - qlen - 2;
+        LimbVector rt;
+        divModArrays(shiftLimbsRight(a, s), shiftLimbsRight(b, s), q, rt);
+        LimbVector p = multiplyArrays(q, b);
+        while (compareArrays(p, a) > 0) {
+            q = subtractArrays(q, LimbVector{ 1 });
+            p = subtractArrays(p, b);
+        }
+        r = subtractArrays(a, p);
+        while (compareArrays(r, b) >= 0) {
+            q = addArrays(q, LimbVector{ 1 });
+            r = subtractArrays(r, b);
         }
-        result.push_back(char('0' + q));
-        if (q != 0) {
-            std::string prod = mulStrDigit(B, q);
-            cur = subtractStr(cur, prod);
+        return;
+    }
+
+    // Деление "цифрами" по n лимбов: x < b * BASE^n, частное блока < BASE^n.
+    // floor(x * V / BASE^2n) не больше точного частного и отстаёт не более чем на 2.
+    LimbVector v = reciprocalArrays(b);
+    size_t blocks = (m + n - 1) / n;
+    q.assign(blocks * n + 1, 0);
+    LimbVector rem = { 0 };
+    for (size_t blk = blocks; blk-- > 0;) {
+        LimbVector x = shiftLimbsLeft(rem, n);
+        LimbVector chunk = sliceLimbs(a, blk * n, n);
+        x = addArrays(x, chunk);
+
+        LimbVector qb = shiftLimbsRight(multiplyArrays(x, v), 2 * n);
+        rem = subtractArrays(x, multiplyArrays(qb, b));
+        while (compareArrays(rem, b) >= 0) {
+            qb = addArrays(qb, LimbVector{ 1 });
+            rem = subtractArrays(rem, b);
         }
+        if (!isZeroLimbs(qb)) addShiftedLimbs(q, qb, blk * n);
     }
-    // trim leading zeros of result
-    size_t pr = result.find_first_not_of('0');
-    if (pr == std::string::npos) return "0";
-    return result.substr(pr);
+    trimLSBVector(q);
+    r = rem;
 }
 
 // ------------------ Основной метод деления ------------------
 
-// Удаляет нули в дробной части (digits LSB-first, decimalPoint = число цифр после запятой)
-static void trimFractionalZeros(std::vector<int>& digits, int& decimalPoint) {
-    // fractional digits are digits[0..decimalPoint-1]
-    while (decimalPoint > 0 && !digits.empty() && digits[0] == 0) {
-        // удалить младший разряд (он же край дробной части)
-        digits.erase(digits.begin());
-        decimalPoint--;
-    }
-    // если после удаления дробной части вектор пуст — оставить один ноль
-    if (digits.empty()) {
-        digits.push_back(0);
-        decimalPoint = 0;
+// Удаляет нули в дробной части (limbs LSB-first, decimalPoint = число цифр после запятой)
+static void trimFractionalZeros(LimbVector& limbs, int& decimalPoint) {
+    int zeros = std::min(trailingDecimalZeros(limbs), decimalPoint);
+    if (zeros > 0) {
+        shiftRightDecimal(limbs, zeros);
+        decimalPoint -= zeros;
     }
-    // если decimalPoint == 0, оставляем целую часть как есть
+    if (isZeroLimbs(limbs)) decimalPoint = 0;
 }
 
 BigNumber BigNumber::divide(const BigNumber& other, int precision) const {
@@ -439,13 +1066,14 @@ BigNumber BigNumber::divide(const BigNumber& other, int precision) const {
     if (isZero()) return BigNumber("0");
 
     // Быстрые пути
-    if (other.digits.size() == 1 && other.digits[0] == 1 && other.decimalPoint == 0) {
+    if (other.limbs.size() == 1 && other.limbs[0] == 1 && other.decimalPoint == 0) {
         BigNumber r = *this;
         r.negative = (negative != other.negative);
         return r;
     }
 
     // Вызов устойчивой реализации (divideKnuth)
+    OperationTimer timer(OperationProfile::DIVIDE, countArithmetic(OperationProfile::DIVIDE, limbs.size(), other.limbs.size()));
     BigNumber result = divideKnuth(other, precision);
     result.negative = (negative != other.negative);
     return result;
@@ -456,68 +1084,29 @@ BigNumber BigNumber::divideKnuth(const BigNumber& other, int precision) const {
     if (other.isZero()) throw std::runtime_error("Division by zero");
     if (isZero()) return BigNumber("0");
 
-    // Helper: convert LSB-first vector to MSB-first string
-    auto vecToStringMSB = [](const std::vector<int>& v)->std::string {
-        std::string s;
-        for (int i = (int)v.size() - 1; i >= 0; --i) s.push_back(char('0' + v[i]));
-        if (s.empty()) s = "0";
-        // trim leading zeros
-        size_t p = s.find_first_not_of('0');
-        if (p == std::string::npos) return "0";
-        return s.substr(p);
-        };
-
-    std::string sA = vecToStringMSB(this->digits);   // A_int as string (no decimal point)
-    std::string sB = vecToStringMSB(other.digits);  // B_int as string
-
     // compute scale = precision + db - da
     long long scale = (long long)precision + (long long)other.decimalPoint - (long long)this->decimalPoint;
 
-    if (sA == "0") {
-        // Zero divided by anything
-        return BigNumber("0");
-    }
-
+    LimbVector a = limbs;  // A_int (no decimal point)
     if (scale >= 0) {
-        // multiply A_int by 10^scale -> append 'scale' zeros to right
-        sA.append((size_t)scale, '0');
+        // multiply A_int by 10^scale
+        shiftLeftDecimal(a, (int)scale);
     }
     else {
         // scale < 0: we need to divide A_int by 10^{-scale} (truncate LSB digits)
-        size_t cut = (size_t)(-scale);
-        if (cut >= sA.size()) {
-            sA = "0";
-        }
-        else {
-            // remove rightmost 'cut' characters
-            sA.erase(sA.size() - cut);
-            // trim leading zeros
-            size_t p = sA.find_first_not_of('0');
-            if (p == std::string::npos) sA = "0"; else if (p > 0) sA = sA.substr(p);
-        }
-    }
-
-    // Now integer divide sA / sB using the existing string long-division helper
-    std::string qStr = longDivStrings(sA, sB); // returns "0" .. "..." no leading zeros
-
-    // Ensure qStr has at least precision+1 digits so we can place decimal point;
-    // but we already used scale to incorporate decimalPoint differences, so decimalPoint=resultPrecision
-    if ((int)qStr.size() <= precision) {
-        qStr = std::string(precision + 1 - qStr.size(), '0') + qStr;
+        shiftRightDecimal(a, (int)(-scale));
     }
 
-    // Convert qStr (MSB-first) into LSB-first digits vector
-    std::vector<int> resDigits;
-    for (int i = (int)qStr.size() - 1; i >= 0; --i) resDigits.push_back(qStr[i] - '0');
+    // Now integer divide A_int / B_int
+    LimbVector q, r;
+    divModArrays(a, other.limbs, q, r);
 
     int resDecimalPoint = precision;
 
     // Trim redundant fractional zeros (user expects "0.1" not "0.100000...")
-    trimFractionalZeros(resDigits, resDecimalPoint);
+    trimFractionalZeros(q, resDecimalPoint);
 
-    BigNumber res(resDigits, (negative != other.negative), resDecimalPoint);
-    res.removeLeadingZeros();
-    return res;
+    return fromLimbs(std::move(q), (negative != other.negative), resDecimalPoint);
 }
 
 // Fallback simple division via double (kept but not used in main code)
@@ -541,14 +1130,17 @@ BigNumber BigNumber::divideSimple(const BigNumber& other, int precision) const {
 BigNumber BigNumber::add(const BigNumber& other) const {
     // sign handling simplified
     if (negative == other.negative) {
+        if (decimalPoint == other.decimalPoint) {
+            if (fitsWord(limbs) && fitsWord(other.limbs)) {
+                return fromLimbs(fromWord(toWord(limbs) + toWord(other.limbs)), negative, decimalPoint);
+            }
+            return fromLimbs(addArrays(limbs, other.limbs), negative, decimalPoint);
+        }
         BigNumber a = *this;
         BigNumber b = other;
         int newDec = 0;
         a.alignDecimals(b, newDec);
-        std::vector<int> res = addArrays(a.digits, b.digits);
-        BigNumber r(res, negative, newDec);
-        r.removeLeadingZeros();
-        return r;
+        return fromLimbs(addArrays(a.limbs, b.limbs), negative, newDec);
     }
     else {
         // a + (-b) => a - b
@@ -571,32 +1163,61 @@ BigNumber BigNumber::subtract(const BigNumber& other) const {
         return this->add(tmp);
     }
     // both same sign: compute absolute comparison
+    if (decimalPoint == other.decimalPoint) {
+        if (fitsWord(limbs) && fitsWord(other.limbs)) {
+            std::uint64_t x = toWord(limbs), y = toWord(other.limbs);
+            return x >= y ? fromLimbs(fromWord(x - y), negative, decimalPoint)
+                          : fromLimbs(fromWord(y - x), !negative, decimalPoint);
+        }
+        if (compareArrays(limbs, other.limbs) >= 0) {
+            return fromLimbs(subtractArrays(limbs, other.limbs), negative, decimalPoint);
+        }
+        return fromLimbs(subtractArrays(other.limbs, limbs), !negative, decimalPoint);
+    }
     BigNumber a = *this;
     BigNumber b = other;
     int newDec = 0;
     a.alignDecimals(b, newDec);
-    int cmp = compareArrays(a.digits, b.digits);
-    std::vector<int> resDigits;
-    bool resNeg = false;
+    int cmp = compareArrays(a.limbs, b.limbs);
     if (cmp >= 0) {
-        resDigits = subtractArrays(a.digits, b.digits);
-        resNeg = negative;
-    }
-    else {
-        resDigits = subtractArrays(b.digits, a.digits);
-        resNeg = !negative;
+        return fromLimbs(subtractArrays(a.limbs, b.limbs), negative, newDec);
     }
-    BigNumber r(resDigits, resNeg, newDec);
-    r.removeLeadingZeros();
-    return r;
+    return fromLimbs(subtractArrays(b.limbs, a.limbs), !negative, newDec);
 }
 
 BigNumber BigNumber::multiply(const BigNumber& other) const {
+    OperationTimer timer(OperationProfile::MULTIPLY, countArithmetic(OperationProfile::MULTIPLY, limbs.size(), other.limbs.size()));
     int resDec = decimalPoint + other.decimalPoint;
-    std::vector<int> resDigits = multiplyArrays(digits, other.digits);
-    BigNumber r(resDigits, (negative != other.negative), resDec);
-    r.removeLeadingZeros();
-    return r;
+    return fromLimbs(multiplyArrays(limbs, other.limbs), (negative != other.negative), resDec);
+}
+
+// ------------------ Произведение отрезка и факториал ------------------
+
+// a * (a+1) * ... * b бинарным разбиением: листья перемножаются в машинных
+// словах, а узлы дерева - быстрым умножением операндов близкой длины
+LimbVector BigNumber::productRange(std::uint64_t a, std::uint64_t b) {
+    if (a > b) return { 1 };
+    if (b - a < 32) {
+        LimbVector r = { 1 };
+        std::uint64_t acc = 1;
+        for (std::uint64_t k = a; k <= b; ++k) {
+            if (k >= LIMB_BASE) {
+                // k < 10^18 (аргумент факториала не длиннее двух лимбов)
+                r = multiplyArrays(r, LimbVector{ (Limb)(k % LIMB_BASE), (Limb)(k / LIMB_BASE) });
+                continue;
+            }
+            if (acc * k >= LIMB_BASE) {
+                mulSmallLimbs(r, (Limb)acc);
+                acc = 1;
+            }
+            acc *= k;
+        }
+        mulSmallLimbs(r, (Limb)acc);
+        return r;
+    }
+    EvaluationScope::check();
+    std::uint64_t mid = a + (b - a) / 2;
+    return multiplyArrays(productRange(a, mid), productRange(mid + 1, b));
 }
 
 BigNumber BigNumber::factorial() const {
@@ -606,23 +1227,18 @@ BigNumber BigNumber::factorial() const {
     if (decimalPoint > 0) {
         throw std::runtime_error("Factorial of fractional number is undefined.");
     }
+    ProfiledOperation profiled(OperationProfile::FACTORIAL, limbs.size());
+    if (limbs.size() > 2) {
+        throw std::runtime_error("Factorial argument is too large.");
+    }
 
     // Handle 0! = 1 and 1! = 1
-    if (isZero() || compare(BigNumber("1")) == 0) {
+    std::uint64_t n = limbs[0] + (limbs.size() > 1 ? (std::uint64_t)limbs[1] * LIMB_BASE : 0);
+    if (n < 2) {
         return BigNumber("1");
     }
 
-    BigNumber result("1");
-    BigNumber counter("1");
-    BigNumber one("1");
-
-    // Iterate from 1 up to this number
-    while (counter.compare(*this) <= 0) {
-        result = result * counter;
-        counter = counter + one;
-    }
-
-    return result;
+    return fromLimbs(productRange(2, n), false, 0);
 }
 
 // helper: check if |a - b| < 10^{-precision}
@@ -649,87 +1265,321 @@ static int integerDigits(const BigNumber& x) {
 }
 
 
-// ------------------ Вычисление ln(2) с высокой точностью ------------------
+// ------------------ Прерывание вычислений ------------------
 
-BigNumber BigNumber::compute_ln2(int precision) {
-    // Используем ряд: ln(2) = 2 * [ (1/3) + (1/3)^3/3 + (1/3)^5/5 + ... ]
-    // Этот ряд сходится быстро и не требует рекурсии
-    BigNumber one("1");
-    BigNumber three("3");
-    BigNumber two("2");
+static thread_local EvaluationScope::Clock::time_point t_deadline = EvaluationScope::Clock::time_point::max();
+static thread_local const CancellationToken* t_token = nullptr;
 
-    BigNumber y = one.divide(three, precision + 10);
-    BigNumber y_sq = y * y;
-    BigNumber term = y;
-    BigNumber sum = term;
+EvaluationScope::EvaluationScope(Clock::time_point deadline, const CancellationToken* token)
+    : previousDeadline(t_deadline), previousToken(t_token) {
+    // Вложенный scope не может ослабить внешний срок
+    if (deadline < t_deadline) t_deadline = deadline;
+    if (token) t_token = token;
+}
 
-    int max_iterations = 100;
-    for (int n = 3; n <= max_iterations * 2; n += 2) {
-        term = term * y_sq;
-        BigNumber current_term = term.divide(BigNumber(std::to_string(n)), precision + 10);
+EvaluationScope::~EvaluationScope() {
+    t_deadline = previousDeadline;
+    t_token = previousToken;
+}
 
-        if (current_term.isZero()) {
-            break;
+void EvaluationScope::check() {
+    if (t_token && t_token->isCancelled()) throw EvaluationInterrupted(EvaluationInterrupted::CANCELLED);
+    if (t_deadline != Clock::time_point::max() && Clock::now() >= t_deadline) {
+        throw EvaluationInterrupted(EvaluationInterrupted::TIMEOUT);
+    }
+}
+
+// ------------------ Кэш констант (π, e, ln2, ln10) ------------------
+// Общий на процесс. Значение хранится с защитными цифрами той точности, для
+// которой его считали; запрос с меньшей точностью обслуживается отсечением
+// лишних цифр (с округлением последней), с большей - пересчётом и заменой.
+// Если задано постоянное хранилище, перед пересчётом константа ищется там,
+// а долго считавшаяся - записывается туда.
+
+enum ConstantId { CONSTANT_PI, CONSTANT_E, CONSTANT_LN2, CONSTANT_LN10, CONSTANT_COUNT };
+
+// Ключи в PersistentCache: '#' не проходит разбор выражения, с результатами не пересекаются
+static const char* const CONSTANT_KEYS[CONSTANT_COUNT] = { "#pi", "#e", "#ln2", "#ln10" };
+
+struct CachedConstant {
+    BigNumber value;
+    int precision = -1;  // точность, для которой посчитано value (-1 - ещё нет)
+};
+
+static const int CONSTANT_GUARD_DIGITS = 10;
+static std::mutex g_constantsMutex;
+static CachedConstant g_constants[CONSTANT_COUNT];
+static std::shared_ptr<PersistentCache> g_constantsStore;
+
+static BigNumber cachedConstant(ConstantId id, int precision, BigNumber(*compute)(int)) {
+    if (precision < 0) precision = 0;
+    {
+        std::lock_guard<std::mutex> lock(g_constantsMutex);
+        const CachedConstant& slot = g_constants[id];
+        if (slot.precision >= precision) {
+            BigNumber r = slot.value;
+            r.setPrecision(precision);
+            return r;
         }
+    }
 
-        sum = sum + current_term;
+    // Считаем без блокировки: другие константы (и меньшие точности) доступны
+    std::shared_ptr<PersistentCache> store = BigNumber::getConstantsStore();
+    BigNumber value;
+    int available = precision;  // точность value без защитных цифр
+    int stored = 0;
+    if (store && store->getAtLeast(CONSTANT_KEYS[id], precision + CONSTANT_GUARD_DIGITS, value, stored)) {
+        available = stored - CONSTANT_GUARD_DIGITS;
+    }
+    else {
+        ProfiledOperation profiled(OperationProfile::CONSTANT, 0);
+        auto started = std::chrono::steady_clock::now();
+        value = compute(precision + CONSTANT_GUARD_DIGITS);
+        value.setPrecision(precision + CONSTANT_GUARD_DIGITS);
+        if (store && std::chrono::steady_clock::now() - started >= std::chrono::milliseconds(PersistentCache::MIN_COMPUTE_MS)) {
+            store->put(CONSTANT_KEYS[id], precision + CONSTANT_GUARD_DIGITS, value);
+        }
+    }
+    {
+        std::lock_guard<std::mutex> lock(g_constantsMutex);
+        CachedConstant& slot = g_constants[id];
+        if (slot.precision < available) {
+            slot.value = value;
+            slot.precision = available;
+        }
+    }
+    value.setPrecision(precision);
+    return value;
+}
+
+void BigNumber::clearConstantsCache() {
+    std::lock_guard<std::mutex> lock(g_constantsMutex);
+    for (auto& slot : g_constants) slot = CachedConstant();
+}
+
+void BigNumber::setConstantsStore(std::shared_ptr<PersistentCache> store) {
+    std::lock_guard<std::mutex> lock(g_constantsMutex);
+    g_constantsStore = std::move(store);
+}
+
+std::shared_ptr<PersistentCache> BigNumber::getConstantsStore() {
+    std::lock_guard<std::mutex> lock(g_constantsMutex);
+    return g_constantsStore;
+}
+
+// ------------------ Целый квадратный корень ------------------
+
+// floor(sqrt(n)): корень из старшей половины, затем шаг Ньютона и точная коррекция
+LimbVector BigNumber::isqrtArrays(const LimbVector& n) {
+    LimbVector x;
+    if (n.size() <= 3) {
+        // До 27 цифр: double даёт корень с ошибкой в несколько единиц, дальше коррекция
+        double v = 0.0;
+        for (size_t i = n.size(); i-- > 0;) v = v * LIMB_BASE + n[i];
+        std::uint64_t root = (std::uint64_t)std::sqrt(v);
+        x = { (Limb)(root % LIMB_BASE), (Limb)(root / LIMB_BASE) };
+        trimLSBVector(x);
+    }
+    else {
+        // Отбрасываем 2t младших лимбов: ошибка после шага Ньютона ~ BASE^(2t - len/2)
+        size_t t = n.size() / 4;
+        x = shiftLimbsLeft(isqrtArrays(shiftLimbsRight(n, 2 * t)), t);
+        LimbVector q, r;
+        divModArrays(n, x, q, r);
+        x = addArrays(x, q);
+        divSmallLimbs(x, 2);
+    }
+
+    // x^2 <= n < (x+1)^2; (x+1)^2 = x^2 + 2x + 1
+    LimbVector sq = multiplyArrays(x, x);
+    while (compareArrays(sq, n) > 0) {
+        LimbVector step = addArrays(x, x);  // (x-1)^2 = x^2 - (2x - 1)
+        sq = subtractArrays(sq, subtractArrays(step, LimbVector{ 1 }));
+        x = subtractArrays(x, LimbVector{ 1 });
+    }
+    LimbVector rest = subtractArrays(n, sq);
+    LimbVector step = addArrays(addArrays(x, x), LimbVector{ 1 });
+    while (compareArrays(rest, step) >= 0) {
+        rest = subtractArrays(rest, step);
+        x = addArrays(x, LimbVector{ 1 });
+        step = addArrays(step, LimbVector{ 2 });
+    }
+    return x;
+}
+
+// sqrt(x) с precision знаками после точки (отсечение, без округления)
+BigNumber BigNumber::isqrt(const BigNumber& x, int precision) {
+    if (x.negative && !x.isZero()) throw std::runtime_error("Square root of negative number");
+    // x * 10^(2p) должно быть целым: сдвигаем мантиссу так, чтобы дробных цифр стало 2p
+    LimbVector scaled = x.limbs;
+    int shift = 2 * precision - x.decimalPoint;
+    if (shift >= 0) shiftLeftDecimal(scaled, shift);
+    else shiftRightDecimal(scaled, -shift);
+    return fromLimbs(isqrtArrays(scaled), false, precision);
+}
+
+// ------------------ Корни и целые степени мантисс ------------------
+
+// a^e бинарным возведением слева направо: на каждом шаге умножение на короткое a
+LimbVector BigNumber::powArrays(const LimbVector& a, std::uint64_t e) {
+    if (e == 0) return { 1 };
+    int bit = 63;
+    while (!((e >> bit) & 1)) --bit;
+    LimbVector r = a;
+    while (bit-- > 0) {
+        EvaluationScope::check();
+        r = multiplyArrays(r, r);
+        if ((e >> bit) & 1) r = multiplyArrays(r, a);
+    }
+    return r;
+}
+
+// floor(n^(1/degree)): корень из старших разрядов, затем шаги Ньютона сверху
+LimbVector BigNumber::irootArrays(const LimbVector& n, unsigned degree) {
+    if (degree == 1) return n;
+    if (degree == 2) return isqrtArrays(n);
+
+    LimbVector x;
+    if (fitsWord(n)) {
+        // n < 10^18: double даёт корень с ошибкой в несколько единиц, дальше коррекция
+        std::uint64_t root = (std::uint64_t)std::pow((double)toWord(n), 1.0 / degree);
+        x = fromWord(root);
+        while (!isZeroLimbs(x) && compareArrays(powArrays(x, degree), n) > 0) {
+            x = subtractArrays(x, LimbVector{ 1 });
+        }
+        for (;;) {
+            LimbVector next = addArrays(x, LimbVector{ 1 });
+            if (compareArrays(powArrays(next, degree), n) > 0) break;
+            x = next;
+        }
+        return x;
+    }
+
+    // Корень из n / 10^(degree*t) даёт старшую половину цифр; (r + 1) * 10^t >= floor(n^(1/degree)),
+    // а итерация Ньютона, начатая сверху, монотонно убывает до точного целого корня
+    int t = decimalDigitCount(n) / (2 * (int)degree);
+    LimbVector top = n;
+    shiftRightDecimal(top, (int)degree * t);
+    x = addArrays(irootArrays(top, degree), LimbVector{ 1 });
+    shiftLeftDecimal(x, t);
+
+    for (;;) {
+        EvaluationScope::check();
+        // y = ((degree - 1) * x + n / x^(degree - 1)) / degree
+        LimbVector q, r;
+        divModArrays(n, powArrays(x, degree - 1), q, r);
+        LimbVector y = x;
+        mulSmallLimbs(y, degree - 1);
+        y = addArrays(y, q);
+        divSmallLimbs(y, degree);
+        if (compareArrays(y, x) >= 0) return x;
+        x = std::move(y);
+    }
+}
+
+// x^(1/degree) с precision знаками после точки (отсечение, без округления)
+BigNumber BigNumber::iroot(const BigNumber& x, unsigned degree, int precision) {
+    if (degree == 0) throw std::runtime_error("Root of degree zero");
+    if (x.negative && !x.isZero()) {
+        if (degree % 2 == 0) throw std::runtime_error("Even root of negative number");
+        BigNumber r = iroot(x.abs(), degree, precision);
+        r.negative = !r.isZero();
+        return r;
     }
+    // x * 10^(degree*p) должно быть целым
+    LimbVector scaled = x.limbs;
+    long long shift = (long long)degree * precision - x.decimalPoint;
+    if (shift >= 0) shiftLeftDecimal(scaled, (int)shift);
+    else shiftRightDecimal(scaled, (int)-shift);
+    return fromLimbs(irootArrays(scaled, degree), false, precision);
+}
+
+// Приближённый log10|x| по старшим лимбам (x != 0) - для оценки порядка результата
+static double approxLog10(const BigNumber& x) {
+    const LimbVector& limbs = x.getLimbs();
+    size_t used = std::min<size_t>(2, limbs.size());
+    double lead = 0.0;
+    for (size_t i = 0; i < used; ++i) lead = lead * BigNumber::LIMB_BASE + limbs[limbs.size() - 1 - i];
+    return std::log10(lead) + (double)(limbs.size() - used) * BigNumber::LIMB_DIGITS - x.getDecimalPoint();
+}
 
-    return sum * two;
+// Округляет до precision дробных цифр, только если их больше (без дописывания нулей)
+static void limitFraction(BigNumber& x, int precision) {
+    if (x.getDecimalPoint() > precision) x.setPrecision(precision);
 }
 
 // ------------------ Вычисление ln(10) с высокой точностью ------------------
 
-BigNumber BigNumber::compute_ln10(int precision) {
+static BigNumber ln10_series(int precision) {
     // ln(10) = ln(2) + ln(5)
-    BigNumber ln2 = compute_ln2(precision + 5);
+    BigNumber ln2 = BigNumber::compute_ln2(precision + 5);
     BigNumber five("5");
     BigNumber ln5 = five.ln_direct(precision + 5);
 
     return ln2 + ln5;
 }
 
+BigNumber BigNumber::compute_ln10(int precision) {
+    return cachedConstant(CONSTANT_LN10, precision, ln10_series);
+}
+
 // ------------------ Прямое вычисление ln без рекурсии ------------------
+// Ряд atanh сходится за ~precision/1.5 членов, каждый - полное умножение; AGM сходится
+// за ~log2(precision) шагов (умножение + квадратный корень), но на каждом шаге вдвое
+// длиннее числа. Точку переключения подбирает bench_calculate --ln.
+
+static int g_lnAgmThreshold = 1200;
+
+void BigNumber::setLnAgmThreshold(int digits) {
+    g_lnAgmThreshold = std::max(1, digits);
+}
+
+int BigNumber::getLnAgmThreshold() { return g_lnAgmThreshold; }
+
+static const int LN_GUARD_DIGITS = 10;
 
 BigNumber BigNumber::ln_direct(int precision) const {
     if (negative || isZero()) {
         throw std::runtime_error("Natural log of non-positive number");
     }
 
-    BigNumber one("1");
-    BigNumber two("2");
-    BigNumber half("0.5");
-
-    if (this->compare(one) == 0) {
+    if (this->compare(BigNumber("1")) == 0) {
         return BigNumber("0");
     }
 
-    // Нормализуем число к диапазону [0.5, 2]
-    BigNumber x = *this;
-    int k = 0;
+    BigNumber result = precision >= g_lnAgmThreshold ? ln_agm(precision) : ln_series(precision);
+    result.setPrecision(precision);
+    return result;
+}
 
-    // Если число > 2, делим на 2
-    while (x.compare(two) > 0) {
-        x = x.divide(two, precision + 10);
-        k++;
-    }
+// x = 2^k * y, y в [0.7, 1.42]; ln(y) = 2 * atanh((y - 1) / (y + 1)) рядом Тейлора
+BigNumber BigNumber::ln_series(int precision) const {
+    int k = (int)std::lround(approxLog10(*this) * 3.3219280948873623);  // log2(x)
+    int working = precision + LN_GUARD_DIGITS + (int)std::to_string(std::abs(k)).size();
 
-    // Если число < 0.5, умножаем на 2
-    while (x.compare(half) < 0) {
-        x = x * two;
-        k--;
+    // Деление на 2^k точное: x * 5^k / 10^k
+    BigNumber x = *this;
+    if (k > 0) {
+        x.limbs = multiplyArrays(x.limbs, powArrays(LimbVector{ 5 }, (std::uint64_t)k));
+        x.decimalPoint += k;
+    }
+    else if (k < 0) {
+        x.limbs = multiplyArrays(x.limbs, powArrays(LimbVector{ 2 }, (std::uint64_t)-k));
     }
 
-    // Вычисляем ln(normalized_x) используя ряд Тейлора
-    BigNumber y = (x - one).divide(x + one, precision + 10);
+    BigNumber one("1");
+    BigNumber y = (x - one).divide(x + one, working);
     BigNumber y_sq = y * y;
+    limitFraction(y_sq, working);
     BigNumber term = y;
     BigNumber sum = term;
 
-    int max_iterations = 100;
-    for (int n = 3; n <= max_iterations * 2; n += 2) {
+    for (long long n = 3;; n += 2) {
+        EvaluationScope::check();
+        countOperation(OperationProfile::SERIES_TERM);
         term = term * y_sq;
-        BigNumber current_term = term.divide(BigNumber(std::to_string(n)), precision + 10);
+        limitFraction(term, working);
+        BigNumber current_term = term.divide(BigNumber(std::to_string(n)), working);
 
         if (current_term.isZero()) {
             break;
@@ -738,22 +1588,55 @@ BigNumber BigNumber::ln_direct(int precision) const {
         sum = sum + current_term;
     }
 
-    BigNumber ln_x = sum * two;
+    // ln(x) = k * ln(2) + ln(y)
+    BigNumber ln_y = sum * BigNumber("2");
+    if (k == 0) return ln_y;
+    BigNumber ln2 = compute_ln2(working);
+    return ln2 * BigNumber(std::to_string(k)) + ln_y;
+}
+
+// ln(s) = π / (2 * AGM(1, 4/s)) с ошибкой ~ln(s)/s^2: s = x * 2^m > 10^(working/2),
+// затем ln(x) = ln(s) - m * ln(2). π и ln(2) берутся из кэша констант.
+BigNumber BigNumber::ln_agm(int precision) const {
+    int working = precision + LN_GUARD_DIGITS;
+    double log10x = approxLog10(*this);
+    long long m = (long long)std::ceil((working / 2.0 + 2.0 - log10x) / 0.30102999566398120);
+    if (m < 0) m = 0;
+    working += (int)std::to_string(m).size();
 
-    // Используем предварительно вычисленный ln(2)
-    BigNumber ln2 = compute_ln2(precision + 5);
+    BigNumber s = *this;
+    s.limbs = multiplyArrays(s.limbs, powArrays(LimbVector{ 2 }, (std::uint64_t)m));
+    s.removeLeadingZeros();
 
-    // ln(original) = k * ln(2) + ln(normalized_x)
-    BigNumber k_ln2 = ln2 * BigNumber(std::to_string(k));
-    BigNumber result = k_ln2 + ln_x;
+    // b = 4/s порядка 10^(-working/2): дробных цифр с запасом, чтобы относительная
+    // точность b (а с ней и AGM) была не хуже working знаков
+    int fractional = working + (int)std::ceil(log10x + m * 0.30102999566398120) + 2;
+    BigNumber a("1");
+    BigNumber b = BigNumber("4").divide(s, fractional);
+    BigNumber half("0.5");
+    BigNumber epsilon = fromLimbs(LimbVector{ 1 }, false, working);  // 10^-working
 
-    result.setPrecision(precision);
-    return result;
+    for (;;) {
+        EvaluationScope::check();
+        BigNumber diff = (a - b).abs();
+        if (diff.compare(epsilon) <= 0) break;
+        BigNumber nextA = (a + b) * half;
+        limitFraction(nextA, fractional);
+        b = isqrt(a * b, fractional);
+        a = std::move(nextA);
+    }
+
+    BigNumber pi = BigNumber::pi(working);
+    BigNumber ln_s = pi.divide(a * BigNumber("2"), working);
+    if (m == 0) return ln_s;
+    BigNumber ln2 = compute_ln2(working);
+    return ln_s - ln2 * BigNumber(std::to_string(m));
 }
 
 // ------------------ Основная реализация ln ------------------
 
 BigNumber BigNumber::ln(int precision) const {
+    ProfiledOperation profiled(OperationProfile::LN, limbs.size());
     return ln_direct(precision);
 }
 
@@ -797,84 +1680,363 @@ BigNumber BigNumber::log10(int precision) const {
     return result;
 }
 
-// ------------------ Упрощенная реализация exp ------------------
+// ------------------ Возведение в степень ------------------
 
-BigNumber BigNumber::exp(int precision) const {
-    if (isZero()) {
-        return BigNumber("1");
-    }
+static const int POWER_GUARD_DIGITS = 10;
+static const unsigned MAX_ROOT_DEGREE = 9;  // показатели m/q распознаются при q <= 9
 
-    if (negative) {
-        BigNumber pos = this->abs();
-        BigNumber exp_pos = pos.exp(precision + 5);
-        return BigNumber("1").divide(exp_pos, precision);
-    }
+// Оставляет не больше digits значащих цифр, отбрасывая только дробные; true - если что-то отброшено
+static bool truncateSignificant(BigNumber& x, int digits) {
+    int excess = x.getPrecision() - digits;
+    if (excess <= 0 || x.getDecimalPoint() == 0) return false;
+    x.setPrecision(std::max(0, x.getDecimalPoint() - excess));
+    return true;
+}
 
-    // Упрощенный ряд Тейлора для exp(x)
-    BigNumber one("1");
-    BigNumber result("1");
-    BigNumber term("1");
-    BigNumber x = *this;
+// Распознаёт показатель, который в точности равен m/q (q <= MAX_ROOT_DEGREE): 2, 0.5, 2.25, 0.125.
+// Приближённые значения (1/3 = 0.333...3) не подходят: замена y на близкую дробь меняет
+// результат на ~|y - m/q| * ln(x) * x^y, что не ограничено точностью, - они идут через exp(y*ln(x))
+static bool rationalExponent(const BigNumber& y, long long& m, unsigned& q) {
+    int dp = y.getDecimalPoint();
+    if (y.getPrecision() - dp > 17) return false;  // q*|y| должен поместиться в машинное слово
 
-    int max_iterations = 50;
-    for (int i = 1; i < max_iterations; i++) {
-        term = term * x;
-        term = term.divide(BigNumber(std::to_string(i)), precision + 10);
+    for (unsigned d = 1; d <= MAX_ROOT_DEGREE; ++d) {
+        LimbVector scaled = y.getLimbs();
+        mulSmallLimbs(scaled, d);
 
-        if (term.isZero()) {
-            break;
-        }
+        // rest - дробная часть q*y в единицах 10^-dp (младшие dp цифр мантиссы)
+        size_t fullLimbs = (size_t)(dp / BigNumber::LIMB_DIGITS);
+        LimbVector rest(scaled.begin(), scaled.begin() + std::min(scaled.size(), fullLimbs + 1));
+        if (fullLimbs < rest.size()) rest[fullLimbs] %= POW10_LIMB[dp % BigNumber::LIMB_DIGITS];
+        while (rest.size() > 1 && rest.back() == 0) rest.pop_back();
+        if (!isZeroLimbs(rest)) continue;
+
+        shiftRightDecimal(scaled, dp);
+        m = (long long)toWord(scaled);
+        if (y.isNegative()) m = -m;
+        q = d;
+        return true;
+    }
+    return false;
+}
+
+// x^n для натурального n. Целое основание возводится точно; у дробного после каждого
+// умножения остаётся significantDigits значащих цифр (относительная ошибка растёт ~ n раз)
+BigNumber BigNumber::powerInteger(std::uint64_t n, int significantDigits, bool& truncated) const {
+    truncated = false;
+    if (decimalPoint == 0) {
+        return fromLimbs(powArrays(limbs, n), negative && (n & 1), 0);
+    }
+    if (n == 0) return BigNumber("1");
+    int bit = 63;
+    while (!((n >> bit) & 1)) --bit;
+    BigNumber r = *this;
+    while (bit-- > 0) {
+        EvaluationScope::check();
+        r = r * r;
+        if ((n >> bit) & 1) r = r * *this;
+        truncated |= truncateSignificant(r, significantDigits);
+    }
+    return r;
+}
 
-        result = result + term;
+BigNumber BigNumber::power(const BigNumber& exponent, int precision) const {
+    long long m = 0;
+    unsigned q = 1;
+    if (rationalExponent(exponent, m, q)) {
+        return powerRational(m, q, precision);
+    }
+    if (this->isZero()) {
+        if (exponent.negative) {
+            throw std::runtime_error("Division by zero");
+        }
+        return BigNumber("0");
     }
+    if (this->negative) {
+        throw std::runtime_error("Negative base with fractional exponent is undefined in real numbers");
+    }
+    ProfiledOperation profiled(OperationProfile::POWER, limbs.size() + exponent.limbs.size());
 
+    // Общий случай: x^y = exp(y * ln(x)); ошибка ln(x) умножается на y, а порядок результата
+    // определяет, сколько цифр держать в промежуточных значениях
+    double exponentValue = std::pow(10.0, approxLog10(exponent)) * (exponent.negative ? -1.0 : 1.0);
+    double magnitude = exponentValue * approxLog10(*this);
+    if (magnitude > 1e9) {
+        throw std::runtime_error("Power result is too large");
+    }
+    int resultDigits = magnitude > 0 ? (int)std::ceil(magnitude) : 0;
+    int exponentDigits = std::max(0, (int)std::ceil(std::log10(std::fabs(exponentValue) + 1.0)));
+    int working = precision + POWER_GUARD_DIGITS + resultDigits + exponentDigits;
+    BigNumber y_ln_x = exponent * this->ln_direct(working);
+    BigNumber result = y_ln_x.exp(precision + POWER_GUARD_DIGITS);
     result.setPrecision(precision);
+    trimFractionalZeros(result.limbs, result.decimalPoint);
     return result;
 }
 
-// ------------------ Упрощенная реализация power ------------------
-
-BigNumber BigNumber::power(const BigNumber& exponent, int precision) const {
+BigNumber BigNumber::powerRational(long long m, unsigned q, int precision) const {
+    if (q == 0 || q > MAX_ROOT_DEGREE) {
+        throw std::runtime_error("Unsupported root degree");
+    }
     if (this->isZero()) {
-        if (exponent.isZero()) {
+        if (m == 0) {
             throw std::runtime_error("0^0 is undefined");
         }
+        if (m < 0) {
+            throw std::runtime_error("Division by zero");
+        }
         return BigNumber("0");
     }
+    if (m == 0) {
+        return BigNumber("1");
+    }
+    if (this->negative && q % 2 == 0) {
+        throw std::runtime_error("Negative base with fractional exponent is undefined in real numbers");
+    }
+    ProfiledOperation profiled(OperationProfile::POWER, limbs.size() + 1);
 
-    // Целые показатели степени
-    if (exponent.decimalPoint == 0 && !exponent.negative) {
-        BigNumber result("1");
-        BigNumber base = *this;
-        BigNumber exp = exponent;
+    // Порядок результата: от него зависит, сколько значащих цифр держать в промежуточных значениях
+    double magnitude = (double)m / q * approxLog10(*this);
+    if (magnitude > 1e9) {
+        throw std::runtime_error("Power result is too large");
+    }
+    int resultDigits = magnitude > 0 ? (int)std::ceil(magnitude) : 0;
 
-        while (!exp.isZero()) {
-            if (exp.digits[0] % 2 == 1) {
-                result = result * base;
-            }
-            base = base * base;
-            exp = exp.divide(BigNumber("2"), 0);
+    // x^(m/q) = (x^|m|)^(1/q), при m < 0 - обратное. Значащих цифр хватает, чтобы ошибка
+    // результата (порядка 10^magnitude) осталась ниже 10^-(precision + guard)
+    std::uint64_t n = (std::uint64_t)(m < 0 ? -m : m);
+    int significant = precision + POWER_GUARD_DIGITS + resultDigits + (int)std::to_string(n).size();
+    bool truncated = false;
+    BigNumber result = this->abs().powerInteger(n, significant, truncated);
+
+    if (q > 1) {
+        // Корень из x^|m| порядка 10^(L/q): дробных цифр столько, чтобы значащих было significant
+        double rootMagnitude = (double)n * approxLog10(this->abs()) / q;
+        int fractional = significant - (int)std::floor(rootMagnitude);
+        result = iroot(result, q, std::max(fractional, precision + POWER_GUARD_DIGITS));
+        truncated = true;
+    }
+    if (m < 0) {
+        result = BigNumber("1").divide(result, precision + POWER_GUARD_DIGITS);
+        truncated = true;
+    }
+    result.negative = this->negative && (n & 1) && !result.isZero();
+
+    // Точный результат (целое основание или короткая дробь) возвращается целиком, как у умножения
+    if (truncated) {
+        result.setPrecision(precision);
+        trimFractionalZeros(result.limbs, result.decimalPoint);
+    }
+    return result;
+}
+
+// Показатель, записанный в выражении дробью неотрицательных целых (1/3, со знаком - -1/3): m/q после сокращения,
+// если q <= MAX_ROOT_DEGREE. Значение деления 0.333...3 уже приближённое, поэтому дробь
+// распознаётся по записи, а не по результату
+static bool fractionExponent(const BigNumber& numerator, const BigNumber& denominator, bool negative,
+    long long& m, unsigned& q) {
+    if (numerator.getDecimalPoint() != 0 || denominator.getDecimalPoint() != 0) return false;
+    if (!fitsWord(numerator.getLimbs()) || !fitsWord(denominator.getLimbs())) return false;
+    std::uint64_t a = toWord(numerator.getLimbs());
+    std::uint64_t b = toWord(denominator.getLimbs());
+    if (b == 0 || a > (std::uint64_t)std::numeric_limits<long long>::max()) return false;
+    std::uint64_t g = a, r = b;
+    while (r != 0) {
+        std::uint64_t t = g % r;
+        g = r;
+        r = t;
+    }
+    if (b / g > MAX_ROOT_DEGREE) return false;
+    m = (long long)(a / g);
+    if (negative) m = -m;
+    q = (unsigned)(b / g);
+    return true;
+}
+
+// Показатель вида (a/b) или (-a/b) в токенах, начиная с index (за ним не должно быть ^ или !,
+// иначе дробь - только часть показателя); end - позиция после закрывающей скобки
+static bool fractionExponentTokens(const std::vector<std::string>& tokens, size_t index, long long& m, unsigned& q,
+    size_t& end) {
+    auto isInteger = [](const std::string& token) {
+        return !token.empty() && std::all_of(token.begin(), token.end(), [](char c) { return c >= '0' && c <= '9'; });
+    };
+    if (index >= tokens.size() || tokens[index] != "(") return false;
+    size_t i = index + 1;
+    bool negative = i < tokens.size() && tokens[i] == "-";
+    if (negative) ++i;
+    if (i + 3 >= tokens.size() || !isInteger(tokens[i]) || tokens[i + 1] != "/" || !isInteger(tokens[i + 2]) ||
+        tokens[i + 3] != ")") {
+        return false;
+    }
+    end = i + 4;
+    if (end < tokens.size() && (tokens[end] == "^" || tokens[end] == "!")) return false;
+    return fractionExponent(BigNumber(tokens[i]), BigNumber(tokens[i + 2]), negative, m, q);
+}
+
+// То же для скомпилированного выражения: перед POW в позиции pos стоит PUSH_CONST a [NEG] PUSH_CONST b DIV,
+// то есть показатель - в точности (a/b) или (-a/b)
+static bool fractionExponentCode(const CompiledExpression& compiled, size_t pos, long long& m, unsigned& q) {
+    const auto& code = compiled.getCode();
+    if (pos < 3 || code[pos - 1].op != CompiledExpression::DIV || code[pos - 2].op != CompiledExpression::PUSH_CONST) {
+        return false;
+    }
+    bool negative = code[pos - 3].op == CompiledExpression::NEG;
+    size_t numerator = negative ? pos - 4 : pos - 3;
+    if ((negative && pos < 4) || code[numerator].op != CompiledExpression::PUSH_CONST) return false;
+    const auto& constants = compiled.getConstants();
+    return fractionExponent(constants[code[numerator].operand], constants[code[pos - 2].operand], negative, m, q);
+}
+
+// ------------------ Ряды бинарным разбиением ------------------
+// Частичная сумма Σ_{n=a}^{b-1} Π_{j=a}^{n} p / q(j) = T / Q, где P = p^(b-a), Q = Π q(j).
+// p - точное число с короткой мантиссой (кусок аргумента), q(j) - небольшое целое, поэтому
+// P, Q, T считаются точно, а деление T / Q одно - в конце. Основная стоимость - несколько
+// больших умножений в верхних узлах дерева вместо деления на каждом члене ряда.
+struct SeriesPQT {
+    BigNumber P, Q, T;
+};
+
+static const long long SERIES_LEAF_TERMS = 16;
+
+template <typename Denominator>
+static SeriesPQT seriesSplit(long long a, long long b, const BigNumber& p, Denominator q) {
+    if (b - a <= SERIES_LEAF_TERMS) {
+        countOperation(OperationProfile::SERIES_TERM, (std::uint64_t)(b - a));
+        // Короткий отрезок - подряд: T' = T * q(j) + P * p, Q' = Q * q(j), P' = P * p
+        SeriesPQT leaf;
+        leaf.P = p;
+        leaf.Q = BigNumber(std::to_string(q(a)));
+        leaf.T = p;
+        for (long long j = a + 1; j < b; ++j) {
+            BigNumber qj(std::to_string(q(j)));
+            leaf.P = leaf.P * p;
+            leaf.Q = leaf.Q * qj;
+            leaf.T = leaf.T * qj + leaf.P;
         }
-        return result;
+        return leaf;
+    }
+    EvaluationScope::check();
+    long long m = a + (b - a) / 2;
+    SeriesPQT left = seriesSplit(a, m, p, q);
+    SeriesPQT right = seriesSplit(m, b, p, q);
+    SeriesPQT node;
+    node.P = left.P * right.P;
+    node.Q = left.Q * right.Q;
+    node.T = left.T * right.Q + left.P * right.T;
+    return node;
+}
+
+// 1 + Σ_{n=1}^{terms-1} Π_{j=1}^{n} p / q(j) с precision знаками после точки
+template <typename Denominator>
+static BigNumber seriesSum(const BigNumber& p, long long terms, int precision, Denominator q) {
+    if (terms < 2 || p.isZero()) return BigNumber("1");
+    SeriesPQT s = seriesSplit(1, terms, p, q);
+    return BigNumber("1") + s.T.divide(s.Q, precision);
+}
+
+// Число членов ряда Σ x^(step*n) / (step*n)!, после которого члены меньше 10^-precision
+static long long seriesTermCount(double log10x, int precision, int step) {
+    double logTerm = 0.0;
+    long long n = 0;
+    while (logTerm > -(precision + 1.0)) {
+        ++n;
+        for (int k = 1; k <= step; ++k) logTerm += log10x - std::log10((double)(step * (n - 1) + k));
+    }
+    return n + 1;
+}
+
+static const int SERIES_GUARD_DIGITS = 10;
+// Перед рядом аргумент делится на 2^8 (x * 5^8 / 10^8 - точно), после - 8 возведений
+// в квадрат (exp) или удвоений угла (sin/cos); каждое удваивает ошибку, отсюда +8 цифр
+static const int ARGUMENT_HALVINGS = 8;
+static const Limb ARGUMENT_HALVING_SCALE = 390625;  // 5^8
+
+// Куски x по цифрам после точки: 1..18 (вместе с целой частью), 19..36, 37..72, ...
+// Мантисса куска вдвое длиннее предыдущего, но и сам он на столько же порядков меньше,
+// поэтому число членов ряда для каждого куска убывает так же быстро, как растёт длина
+std::vector<BigNumber> BigNumber::splitDigitChunks(const BigNumber& x) {
+    std::vector<BigNumber> chunks;
+    int dp = x.decimalPoint;
+    int lo = 0;
+    for (int hi = 2 * LIMB_DIGITS;; hi *= 2) {
+        int top = std::min(hi, dp);
+        LimbVector upper = x.limbs;
+        shiftRightDecimal(upper, dp - top);
+        if (lo > 0) {
+            LimbVector lower = x.limbs;
+            shiftRightDecimal(lower, dp - lo);
+            shiftLeftDecimal(lower, top - lo);
+            upper = subtractArrays(upper, lower);
+        }
+        BigNumber chunk = fromLimbs(std::move(upper), x.negative, top);
+        if (!chunk.isZero()) chunks.push_back(std::move(chunk));
+        if (top == dp) break;
+        lo = top;
+    }
+    return chunks;
+}
+
+// ------------------ exp ------------------
+
+// exp(f), 0 <= f < 1: exp(f / 2^h) как произведение рядов по кускам, затем h возведений в квадрат
+BigNumber BigNumber::expReduced(const BigNumber& f, int precision) {
+    int working = precision + ARGUMENT_HALVINGS;
+    BigNumber r = f;
+    mulSmallLimbs(r.limbs, ARGUMENT_HALVING_SCALE);
+    r.decimalPoint += ARGUMENT_HALVINGS;
+    r.removeLeadingZeros();
+    limitFraction(r, working);
+
+    BigNumber result("1");
+    for (const BigNumber& chunk : splitDigitChunks(r)) {
+        long long terms = seriesTermCount(approxLog10(chunk), working, 1);
+        result = result * seriesSum(chunk, terms, working, [](long long j) { return j; });
+        limitFraction(result, working);
+    }
+    for (int i = 0; i < ARGUMENT_HALVINGS; ++i) {
+        EvaluationScope::check();
+        result = result * result;
+        limitFraction(result, working);
     }
+    return result;
+}
 
-    // Отрицательные целые показатели
-    if (exponent.decimalPoint == 0 && exponent.negative) {
-        BigNumber positive_exp = exponent;
-        positive_exp.negative = false;
-        BigNumber result = this->power(positive_exp);
-        return BigNumber("1").divide(result, 30);
+BigNumber BigNumber::exp(int precision) const {
+    if (isZero()) {
+        return BigNumber("1");
     }
 
-    // Дробные показатели: x^y = exp(y * ln(x))
-    if (this->negative) {
-        throw std::runtime_error("Negative base with fractional exponent is undefined in real numbers");
+    // Порядок результата: x * log10(e) десятичных цифр
+    double magnitude = std::pow(10.0, approxLog10(*this)) * 0.43429448190325182;
+    if (negative) {
+        // e^x < 10^-(precision+1): на этой точности результат - ноль
+        if (magnitude > precision + 1.0) return BigNumber("0");
+        // divide отбрасывает лишние цифры, поэтому делим с запасом и округляем
+        BigNumber exp_pos = this->abs().exp(precision + SERIES_GUARD_DIGITS);
+        BigNumber result = BigNumber("1").divide(exp_pos, precision + SERIES_GUARD_DIGITS);
+        result.setPrecision(precision);
+        return result;
+    }
+    if (magnitude > 1e9) {
+        throw std::runtime_error("Exp result is too large");
     }
+    // Здесь x > 0: для отрицательного x в профиль попадает только вызов e^|x|
+    ProfiledOperation profiled(OperationProfile::EXP, limbs.size());
 
-    // Используем умеренную точность для избежания переполнения
-    BigNumber ln_x = this->ln_direct(30);
-    BigNumber y_ln_x = exponent * ln_x;
-    return y_ln_x.exp(30);
+    // x = n + f: e^x = e^n * e^f, e^n - степень кэшированной константы
+    LimbVector whole = limbs;
+    shiftRightDecimal(whole, decimalPoint);
+    std::uint64_t n = toWord(whole);
+    BigNumber f = *this - fromLimbs(std::move(whole), false, 0);
+
+    int working = precision + SERIES_GUARD_DIGITS + (int)std::ceil(magnitude) + (int)std::to_string(n).size();
+    BigNumber result = expReduced(f, working);
+    if (n > 0) {
+        bool truncated = false;
+        result = BigNumber::e(working).powerInteger(n, working, truncated) * result;
+    }
+    result.setPrecision(precision);
+    return result;
 }
 
 // ------------------ Вспомогательные методы ------------------
@@ -920,9 +2082,11 @@ BigNumber BigNumber::mod2Pi(int precision) const {
 
 // Убираем static из объявления и делаем обычной функцией
 void BigNumber::reduceToFirstQuadrant(const BigNumber& x, BigNumber& reducedX, int& quadrant, int precision) {
-    BigNumber pi = BigNumber::pi(precision + 20);
+    // Ошибка π умножается на x / 2π: на каждую целую цифру x - ещё одна цифра π
+    int wholeDigits = std::max(0, x.getPrecision() - x.getDecimalPoint());
+    BigNumber pi = BigNumber::pi(precision + 20 + wholeDigits);
     BigNumber twoPi = pi * BigNumber("2");
-    BigNumber piHalf = pi.divide(BigNumber("2"), precision + 20);
+    BigNumber piHalf = pi.divide(BigNumber("2"), precision + 20 + wholeDigits);
 
     // Вычисляем x mod 2π вручную (без вызова метода mod2Pi)
     BigNumber quotient = x.divide(twoPi, 0); // целочисленное деление
@@ -952,165 +2116,96 @@ void BigNumber::reduceToFirstQuadrant(const BigNumber& x, BigNumber& reducedX, i
     }
 }
 
-// helper: create BigNumber threshold 10^{-n} where n >= 0
-static BigNumber makePow10Neg(int n) {
-    if (n <= 0) return BigNumber("1");
-    std::string s = "0.";
-    for (int i = 1; i < n; ++i) s.push_back('0');
-    s.push_back('1');
-    return BigNumber(s);
-}
-
-// ------------------ Высокоточные ряды Тейлора для малых углов ------------------
+// ------------------ Ряды Тейлора для малых углов ------------------
+// sin и cos короткого куска x: p = -x^2, ряды суммируются бинарным разбиением
 
-BigNumber BigNumber::sin_taylor_small(const BigNumber& x, int precision) const {
-    // precision — желаемое количество дробных цифр результата (без guard)
+BigNumber BigNumber::sin_taylor_small(const BigNumber& x, int precision) {
     if (x.isZero()) return BigNumber("0");
-
-    // Если угол очень мал, использовать приближение x - x^3/6
-    BigNumber smallThreshold("0.01");
-    if (x.compare(smallThreshold) < 0) {
-        BigNumber x3 = x * x * x;
-        return x - x3.divide(BigNumber("6"), precision + 8);
-    }
-
-    int guard = std::max(16, precision + 40); // защитные цифры
-    BigNumber xSquared = x * x;
-    BigNumber term = x;            // x^(2n+1) / (2n+1) starts with x
-    BigNumber result = term;
-
-    BigNumber threshold = makePow10Neg(precision + 8);
-
-    // iterative series: term_{n+1} = term_n * x^2 / ((2n)*(2n+1))
-    for (int n = 1; n < 10000; ++n) {
-        term = term * xSquared;
-        BigNumber denom(std::to_string((2 * n) * (2 * n + 1)));
-        term = term.divide(denom, guard);
-
-        BigNumber termAbs = term.isNegative() ? term.abs() : term;
-        if (termAbs.compare(threshold) <= 0) break;
-
-        if (n % 2 == 0) result = result + term; else result = result - term;
-    }
-
-    // final rounding to requested precision
-    result.setPrecision(precision + 2);
+    long long terms = seriesTermCount(approxLog10(x), precision, 2);
+    BigNumber result = x * seriesSum(-(x * x), terms, precision,
+                                     [](long long j) { return (2 * j) * (2 * j + 1); });
+    limitFraction(result, precision);
     return result;
 }
 
-BigNumber BigNumber::cos_taylor_small(const BigNumber& x, int precision) const {
+BigNumber BigNumber::cos_taylor_small(const BigNumber& x, int precision) {
     if (x.isZero()) return BigNumber("1");
-
-    BigNumber smallThreshold("0.01");
-    if (x.compare(smallThreshold) < 0) {
-        BigNumber x2 = x * x;
-        return BigNumber("1") - x2.divide(BigNumber("2"), precision + 8);
+    long long terms = seriesTermCount(approxLog10(x), precision, 2);
+    return seriesSum(-(x * x), terms, precision,
+                     [](long long j) { return (2 * j - 1) * (2 * j); });
+}
+
+// sin и cos для 0 <= x <= π/2: угол x / 2^h собирается из кусков по формулам сложения,
+// затем h удвоений угла
+void BigNumber::sinCosReduced(const BigNumber& x, int precision, BigNumber& sinX, BigNumber& cosX) {
+    ProfiledOperation profiled(OperationProfile::SIN_COS, x.limbs.size());
+    int working = precision + ARGUMENT_HALVINGS;
+    BigNumber r = x;
+    mulSmallLimbs(r.limbs, ARGUMENT_HALVING_SCALE);
+    r.decimalPoint += ARGUMENT_HALVINGS;
+    r.removeLeadingZeros();
+    limitFraction(r, working);
+
+    sinX = BigNumber("0");
+    cosX = BigNumber("1");
+    for (const BigNumber& chunk : splitDigitChunks(r)) {
+        BigNumber s = sin_taylor_small(chunk, working);
+        BigNumber c = cos_taylor_small(chunk, working);
+        // sin(a + b) = sin a cos b + cos a sin b, cos(a + b) = cos a cos b - sin a sin b
+        BigNumber newSin = sinX * c + cosX * s;
+        BigNumber newCos = cosX * c - sinX * s;
+        sinX = std::move(newSin);
+        cosX = std::move(newCos);
+        limitFraction(sinX, working);
+        limitFraction(cosX, working);
     }
 
-    int guard = std::max(16, precision + 40);
-    BigNumber xSquared = x * x;
-    BigNumber term("1"); // starts as 1
-    BigNumber result = term;
-
-    BigNumber threshold = makePow10Neg(precision + 8);
-
-    // term_{n+1} = term_n * x^2 / ((2n-1)*(2n))
-    for (int n = 1; n < 10000; ++n) {
-        term = term * xSquared;
-        BigNumber denom(std::to_string((2 * n - 1) * (2 * n)));
-        term = term.divide(denom, guard);
-
-        BigNumber termAbs = term.isNegative() ? term.abs() : term;
-        if (termAbs.compare(threshold) <= 0) break;
-
-        if (n % 2 == 0) result = result + term; else result = result - term;
+    BigNumber one("1");
+    BigNumber two("2");
+    for (int i = 0; i < ARGUMENT_HALVINGS; i++) {
+        EvaluationScope::check();
+        // sin 2a = 2 sin a cos a, cos 2a = 1 - 2 sin^2 a
+        BigNumber newSin = (sinX * cosX) * two;
+        BigNumber newCos = one - (sinX * sinX) * two;
+        sinX = std::move(newSin);
+        cosX = std::move(newCos);
+        limitFraction(sinX, working);
+        limitFraction(cosX, working);
     }
-
-    result.setPrecision(precision + 2);
-    return result;
 }
 
 
 // ------------------ Основные реализации sin и cos ------------------
 
 BigNumber BigNumber::sin(int precision) const {
-
-
     // Специальные случаи
     if (this->isZero()) return BigNumber("0");
 
     // Редукция до первого квадранта
     BigNumber reducedX;
     int quadrant;
-    const_cast<BigNumber*>(this)->reduceToFirstQuadrant(*this, reducedX, quadrant, precision);
-
-    // Если угол уже мал, используем ряд Тейлора
-    BigNumber threshold("0.5");
-    if (reducedX.compare(threshold) <= 0) {
-        BigNumber result = sin_taylor_small(reducedX, precision);
-        return (quadrant == 3 || quadrant == 4) ? result.negate() : result;
-    }
-
-    // Редукция половинного угла
-    int reductions = 0;
-    BigNumber x = reducedX;
-    while (x.compare(threshold) > 0) {
-        x = x.divide(BigNumber("2"), precision + 20);
-        reductions++;
-    }
-
-    // Вычисляем sin и cos для малого угла
-    BigNumber sinX = sin_taylor_small(x, precision + 10);
-    BigNumber cosX = cos_taylor_small(x, precision + 10);
+    const_cast<BigNumber*>(this)->reduceToFirstQuadrant(*this, reducedX, quadrant, precision + SERIES_GUARD_DIGITS);
 
-    // Применяем формулы двойного угла
-    for (int i = 0; i < reductions; i++) {
-        BigNumber newSin = (sinX * cosX) * BigNumber("2");
-        BigNumber newCos = (cosX * cosX) * BigNumber("2") - BigNumber("1");
-        sinX = newSin;
-        cosX = newCos;
-    }
+    BigNumber sinX, cosX;
+    sinCosReduced(reducedX, precision + SERIES_GUARD_DIGITS, sinX, cosX);
+    sinX.setPrecision(precision);
 
     // Корректируем знак по квадранту
     return (quadrant == 3 || quadrant == 4) ? sinX.negate() : sinX;
 }
 
 BigNumber BigNumber::cos(int precision) const {
-
     // Специальные случаи
     if (this->isZero()) return BigNumber("1");
 
     // Редукция до первого квадранта
     BigNumber reducedX;
     int quadrant;
-    const_cast<BigNumber*>(this)->reduceToFirstQuadrant(*this, reducedX, quadrant, precision);
-
-    // Если угол уже мал, используем ряд Тейлора
-    BigNumber threshold("0.5");
-    if (reducedX.compare(threshold) <= 0) {
-        BigNumber result = cos_taylor_small(reducedX, precision);
-        return (quadrant == 2 || quadrant == 3) ? result.negate() : result;
-    }
-
-    // Редукция половинного угла
-    int reductions = 0;
-    BigNumber x = reducedX;
-    while (x.compare(threshold) > 0) {
-        x = x.divide(BigNumber("2"), precision + 20);
-        reductions++;
-    }
+    const_cast<BigNumber*>(this)->reduceToFirstQuadrant(*this, reducedX, quadrant, precision + SERIES_GUARD_DIGITS);
 
-    // Вычисляем sin и cos для малого угла
-    BigNumber sinX = sin_taylor_small(x, precision + 10);
-    BigNumber cosX = cos_taylor_small(x, precision + 10);
-
-    // Применяем формулы двойного угла
-    for (int i = 0; i < reductions; i++) {
-        BigNumber newSin = (sinX * cosX) * BigNumber("2");
-        BigNumber newCos = (cosX * cosX) * BigNumber("2") - BigNumber("1");
-        sinX = newSin;
-        cosX = newCos;
-    }
+    BigNumber sinX, cosX;
+    sinCosReduced(reducedX, precision + SERIES_GUARD_DIGITS, sinX, cosX);
+    cosX.setPrecision(precision);
 
     // Корректируем знак по квадранту
     return (quadrant == 2 || quadrant == 3) ? cosX.negate() : cosX;
@@ -1119,188 +2214,643 @@ BigNumber BigNumber::cos(int precision) const {
 // ------------------ Улучшенная реализация tan ------------------
 
 BigNumber BigNumber::tan(int precision) const {
-    BigNumber sinVal = this->sin();
-    BigNumber cosVal = this->cos();
+    BigNumber sinVal = this->sin(precision + SERIES_GUARD_DIGITS);
+    BigNumber cosVal = this->cos(precision + SERIES_GUARD_DIGITS);
 
     if (cosVal.isZero()) {
         throw std::runtime_error("Tangent undefined");
     }
 
-    return sinVal.divide(cosVal, precision);
+    BigNumber result = sinVal.divide(cosVal, precision + SERIES_GUARD_DIGITS);
+    result.setPrecision(precision);
+    return result;
 }
 
 // ------------------ Высокоточное вычисление π ------------------
 
-// ------------------ Helper: arctan series (MSB-friendly, stable) ------------------
-// Computes arctan(x) for 0 < x <= 1 using series: arctan(x) = sum_{n>=0} (-1)^n * x^(2n+1)/(2n+1)
-// x is passed as BigNumber (like 1/5). precision = number of fractional digits required.
-static BigNumber arctan_series(const BigNumber& x, int precision) {
-    // guard digits to reduce rounding accumulation
-    int guard = std::max(16, precision / 6 + 16);
-
-    BigNumber x_pow = x;              // x^(2n+1), starts with x^1
-    BigNumber x2 = x * x;             // x^2
-    BigNumber sum = x_pow;            // first term
-    BigNumber term = x_pow;
-    BigNumber one("1");
-
-    // threshold: 10^{-(precision+guard)}
-    std::string thr = "0.";
-    for (int i = 1; i < precision + guard; ++i) thr.push_back('0');
-    thr.push_back('1');
-    BigNumber threshold(thr);
-
-    for (int n = 1;; ++n) {
-        // prepare next power: multiply by x^2
-        term = term * x2; // now term = x^(2n+1)
-        // denom = 2n+1
-        BigNumber denom(std::to_string(2 * n + 1));
-        BigNumber add = term.divide(denom, precision + guard);
-
-        // alternating sign
-        if (n % 2 == 1) {
-            sum = sum - add;
+// ------------------ Chudnovsky: бинарное разбиение ------------------
+// π = 426880 * sqrt(10005) * Q(0,N) / T(0,N); каждый член даёт ~14.18 цифры.
+// P, Q, T - целые; знак T чередуется, поэтому храним их как BigNumber.
+struct ChudnovskyPQT {
+    BigNumber P, Q, T;
+};
+
+static ChudnovskyPQT chudnovskySplit(long long a, long long b) {
+    static const BigNumber C3_OVER_24("10939058860032000");  // 640320^3 / 24
+    if (b - a == 1) {
+        countOperation(OperationProfile::SERIES_TERM);
+        ChudnovskyPQT leaf;
+        if (a == 0) {
+            leaf.P = BigNumber("1");
+            leaf.Q = BigNumber("1");
         }
         else {
-            sum = sum + add;
+            leaf.P = BigNumber(std::to_string(6 * a - 5)) * BigNumber(std::to_string(2 * a - 1)) * BigNumber(std::to_string(6 * a - 1));
+            BigNumber aBig(std::to_string(a));
+            leaf.Q = aBig * aBig * aBig * C3_OVER_24;
         }
-
-        BigNumber addAbs = add;
-        if (addAbs.negative) addAbs = addAbs.abs();
-        if (addAbs.compare(threshold) <= 0) break;
-
-        // safety cap (should never hit for reasonable precision)
-        if (n > (precision + guard) * 50) break;
+        leaf.T = leaf.P * BigNumber(std::to_string(13591409 + 545140134LL * a));
+        if (a & 1) leaf.T = leaf.T.negate();
+        return leaf;
     }
+    EvaluationScope::check();
+    long long m = a + (b - a) / 2;
+    ChudnovskyPQT left = chudnovskySplit(a, m);
+    ChudnovskyPQT right = chudnovskySplit(m, b);
+    ChudnovskyPQT node;
+    node.P = left.P * right.P;
+    node.Q = left.Q * right.Q;
+    node.T = right.Q * left.T + left.P * right.T;
+    return node;
+}
+
+static BigNumber pi_chudnovsky(int precision) {
+    long long terms = (long long)(precision / 14.181647462725477) + 2;
+    ChudnovskyPQT pqt = chudnovskySplit(0, terms);
 
-    return sum;
+    // sqrt(10005) с precision знаками после точки
+    BigNumber sqrt10005 = BigNumber::isqrt(BigNumber("10005"), precision);
+    BigNumber numerator = pqt.Q * BigNumber("426880") * sqrt10005;
+    return numerator.divide(pqt.T, precision);
 }
 
-// ------------------ New implementation of pi using Machin formula ------------------
-// π = 16*arctan(1/5) - 4*arctan(1/239)
+// π = Chudnovsky, значение берётся из кэша констант
 BigNumber BigNumber::pi(int precision) {
     if (precision < 2) precision = 2;
-    // compute x1 = 1/5 and x2 = 1/239 with sufficient guard
-    int guard = std::max(20, precision / 4 + 20);
-    BigNumber one("1");
-    BigNumber five("5");
-    BigNumber twoThreeNine("239");
-
-    BigNumber x1 = one.divide(five, precision + guard);         // 1/5
-    BigNumber x2 = one.divide(twoThreeNine, precision + guard); // 1/239
-
-    BigNumber ar1 = arctan_series(x1, precision);
-    BigNumber ar2 = arctan_series(x2, precision);
-
-    BigNumber part1 = ar1 * BigNumber("16");
-    BigNumber part2 = ar2 * BigNumber("4");
-
-    BigNumber pi_val = part1 - part2;
-    pi_val.setPrecision(precision);
-    return pi_val;
+    return cachedConstant(CONSTANT_PI, precision, pi_chudnovsky);
 }
 
-
+static BigNumber e_series(int precision) {
+    // e = 1 + 1 + 1/2! + 1/3! + ... = exp(1), бинарное разбиение с p = 1
+    long long terms = seriesTermCount(0.0, precision + 10, 1);
+    return seriesSum(BigNumber("1"), terms, precision + 10, [](long long j) { return j; });
+}
 
 BigNumber BigNumber::e(int precision) {
-    // Ряд Тейлора для e = 1 + 1 + 1/2! + 1/3! + ...
-    BigNumber result("1");
-    BigNumber term("1");
+    return cachedConstant(CONSTANT_E, precision, e_series);
+}
 
-    int max_iterations = 50;
-    for (int i = 1; i < max_iterations; i++) {
-        term = term.divide(BigNumber(std::to_string(i)), precision + 10);
+// ------------------ Вычисление ln(2) с высокой точностью ------------------
 
-        if (term.isZero()) {
-            break;
+// ln(2) = 3/4 * Σ_{k>=0} (-1)^k (k!)^2 / (2^k (2k+1)!): отношение соседних членов
+// -k / (4(2k+1)), каждый член даёт ~0.9 цифры. Бинарное разбиение, как у π: P, Q, T
+// целые, одно деление в конце, поэтому время растёт как у умножения, а не квадратично.
+struct Ln2PQT {
+    BigNumber P, Q, T;
+};
+
+static Ln2PQT ln2Split(long long a, long long b) {
+    if (b - a <= SERIES_LEAF_TERMS) {
+        countOperation(OperationProfile::SERIES_TERM, (std::uint64_t)(b - a));
+        // Короткий отрезок - подряд: P' = P * p(j), Q' = Q * q(j), T' = T * q(j) + P'
+        Ln2PQT leaf;
+        leaf.P = BigNumber(std::to_string(-a));
+        leaf.Q = BigNumber(std::to_string(8 * a + 4));
+        leaf.T = leaf.P;
+        for (long long j = a + 1; j < b; ++j) {
+            BigNumber qj(std::to_string(8 * j + 4));
+            leaf.P = leaf.P * BigNumber(std::to_string(-j));
+            leaf.Q = leaf.Q * qj;
+            leaf.T = leaf.T * qj + leaf.P;
         }
-
-        result = result + term;
+        return leaf;
     }
+    EvaluationScope::check();
+    long long m = a + (b - a) / 2;
+    Ln2PQT left = ln2Split(a, m);
+    Ln2PQT right = ln2Split(m, b);
+    Ln2PQT node;
+    node.P = left.P * right.P;
+    node.Q = left.Q * right.Q;
+    node.T = left.T * right.Q + left.P * right.T;
+    return node;
+}
 
-    return result;
+static BigNumber ln2_series(int precision) {
+    // |член k| < 8^-k
+    long long terms = (long long)((precision + 10) / 0.90308998699194354) + 2;
+    Ln2PQT pqt = ln2Split(1, terms);
+    // ln(2) = 3/4 * (1 + T/Q) = 3 (Q + T) / (4 Q)
+    BigNumber numerator = (pqt.Q + pqt.T) * BigNumber("3");
+    return numerator.divide(pqt.Q * BigNumber("4"), precision + 10);
+}
+
+BigNumber BigNumber::compute_ln2(int precision) {
+    return cachedConstant(CONSTANT_LN2, precision, ln2_series);
 }
 
 std::string BigNumber::debugString() const {
     std::stringstream ss;
-    ss << "BigNumber{ value: '" << toString() << "', negative: " << negative << ", decimalPoint: " << decimalPoint << ", digits: [";
-    for (size_t i = 0; i < digits.size(); ++i) {
+    ss << "BigNumber{ value: '" << toString() << "', negative: " << negative << ", decimalPoint: " << decimalPoint << ", limbs: [";
+    for (size_t i = 0; i < limbs.size(); ++i) {
         if (i) ss << ",";
-        ss << digits[i];
+        ss << limbs[i];
     }
     ss << "] }";
     return ss.str();
 }
 
 
-// ------------------ Improved Calculator with caching and precision ------------------
+// ------------------ Кэш результатов (LRU по объёму) ------------------
 
-Calculator::Calculator(Logger* logger_, int precision_)
-    : logger(logger_), precision(precision_) {}
+std::size_t ResultCache::entryBytes(const Key& key, const BigNumber& value) {
+    return sizeof(Entry) + 2 * sizeof(void*)                 // узел списка
+        + sizeof(Key) + 3 * sizeof(void*)                     // узел индекса
+        + 2 * key.expression.capacity()                       // строка ключа в списке и в индексе
+        + value.byteSize() - sizeof(BigNumber);               // лимбы (сам объект уже в Entry)
+}
 
-void Calculator::setPrecision(int newPrecision) {
-    if (newPrecision != precision) {
-        precision = newPrecision;
-        // Очищаем кэш при изменении точности
-        cache.clear();
+bool ResultCache::get(const Key& key, BigNumber& result) {
+    Shard& shard = shardFor(key);
+    std::lock_guard<std::mutex> lock(shard.mutex);
+    auto it = shard.index.find(key);
+    if (it == shard.index.end()) {
+        ++shard.misses;
+        return false;
     }
+    shard.lru.splice(shard.lru.begin(), shard.lru, it->second);
+    result = it->second->value;
+    ++shard.hits;
+    return true;
 }
 
-void Calculator::log(const std::string& level, const std::string& message) {
-    if (logger) logger->log(level, message);
+void ResultCache::evictUntilFits(Shard& shard, std::size_t budget, std::size_t incoming) {
+    while (!shard.lru.empty() && shard.bytes + incoming > budget) {
+        const Entry& victim = shard.lru.back();
+        shard.bytes -= victim.bytes;
+        shard.index.erase(victim.key);
+        shard.lru.pop_back();
+        ++shard.evictions;
+    }
 }
 
-BigNumber Calculator::evaluate(const std::string& expression) {
-    log("INFO", "Evaluating: " + expression + " with precision: " + std::to_string(precision));
+void ResultCache::put(const Key& key, const BigNumber& value) {
+    std::size_t size = entryBytes(key, value);
+    std::size_t budget = shardBudget();
 
-    auto tokens = tokenize(expression);
-    size_t index = 0;
+    Shard& shard = shardFor(key);
+    std::lock_guard<std::mutex> lock(shard.mutex);
+    auto it = shard.index.find(key);
+    if (it != shard.index.end()) {
+        shard.bytes -= it->second->bytes;
+        shard.lru.erase(it->second);
+        shard.index.erase(it);
+    }
 
-    // Используем кэшированную версию вычисления
-    BigNumber result = evaluateWithCache(expression, tokens, 0, tokens.size());
+    if (size > budget) return;  // не помещается даже в пустой сегмент
 
-    log("INFO", "Result: " + result.toString());
-    return result;
+    evictUntilFits(shard, budget, size);
+    shard.lru.push_front(Entry{ key, value, size });
+    shard.index.emplace(key, shard.lru.begin());
+    shard.bytes += size;
 }
 
-BigNumber Calculator::evaluateWithCache(const std::string& expression, const std::vector<std::string>& tokens, size_t start, size_t end) {
-    // Создаем ключ для кэша
-    std::string subExpr = getSubExpression(tokens, start, end);
-    CacheKey key{subExpr, precision};
+void ResultCache::clear() {
+    for (auto& shard : shards) {
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        shard.lru.clear();
+        shard.index.clear();
+        shard.bytes = 0;
+    }
+}
 
-    // Проверяем кэш
-    auto cached = cache.find(key);
-    if (cached != cache.end()) {
-        log("DEBUG", "Cache hit for: " + key.expression);
-        return cached->second;
+void ResultCache::setMaxBytes(std::size_t newMaxBytes) {
+    maxBytes = newMaxBytes;
+    std::size_t budget = shardBudget();
+    for (auto& shard : shards) {
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        evictUntilFits(shard, budget, 0);
     }
+}
 
-    // Вычисляем выражение
-    size_t index = start;
-    BigNumber result = parseExpression(tokens, index);
+ResultCache::Stats ResultCache::getStats() const {
+    Stats stats;
+    for (const auto& shard : shards) {
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        stats.hits += shard.hits;
+        stats.misses += shard.misses;
+        stats.evictions += shard.evictions;
+        stats.bytes += shard.bytes;
+        stats.entries += shard.lru.size();
+    }
+    return stats;
+}
 
-    // Сохраняем в кэш
-    cache[key] = result;
-    log("DEBUG", "Cached result for: " + key.expression);
+// ------------------ Постоянный кэш на диске ------------------
+// Файл: заголовок [магия "WRKCACHE"][версия формата: 4][длина строки сборки: 4][строка сборки],
+// затем записи [длина ключа: 4][точность: 4][длина значения: 4][FNV-1a ключа и значения: 4]
+// [ключ][BigNumber::appendBinary]. Числа little-endian.
 
-    return result;
+// Сборка движка: другая сборка может считать иначе, поэтому её файл не используется.
+// По умолчанию - время компиляции; сборочный скрипт может задать, например, хэш коммита.
+#ifndef CALCULATOR_ENGINE_BUILD
+#define CALCULATOR_ENGINE_BUILD __DATE__ " " __TIME__
+#endif
+
+static const char PERSISTENT_MAGIC[8] = { 'W', 'R', 'K', 'C', 'A', 'C', 'H', 'E' };
+static const std::uint32_t PERSISTENT_FORMAT_VERSION = 1;
+static const std::size_t PERSISTENT_RECORD_HEADER = 16;
+
+static std::uint32_t fnv1a(const char* data, std::size_t size) {
+    std::uint32_t hash = 2166136261u;
+    for (std::size_t i = 0; i < size; ++i) {
+        hash ^= (unsigned char)data[i];
+        hash *= 16777619u;
+    }
+    return hash;
 }
 
-std::string Calculator::getSubExpression(const std::vector<std::string>& tokens, size_t start, size_t end) {
-    std::string result;
-    for (size_t i = start; i < end && i < tokens.size(); ++i) {
-        if (!result.empty()) result += " ";
-        result += tokens[i];
+static std::string persistentHeader() {
+    std::string header(PERSISTENT_MAGIC, sizeof(PERSISTENT_MAGIC));
+    std::string build = PersistentCache::engineBuild();
+    appendU32(header, PERSISTENT_FORMAT_VERSION);
+    appendU32(header, (std::uint32_t)build.size());
+    return header + build;
+}
+
+// Файл целиком, только для чтения. open/close зависят от платформы и определены в конце файла.
+struct PersistentCache::Mapping {
+    const char* data = nullptr;
+    std::size_t size = 0;
+
+    ~Mapping() { close(); }
+    bool open(const std::string& path);  // false - файла нет или он пустой
+    void close();
+};
+
+const char* PersistentCache::engineBuild() {
+    return CALCULATOR_ENGINE_BUILD;
+}
+
+std::shared_ptr<PersistentCache> PersistentCache::open(const std::string& path, std::size_t maxBytes) {
+    // Два объекта на один файл в процессе затирали бы записи друг друга при сжатии
+    static std::mutex registryMutex;
+    static std::unordered_map<std::string, std::weak_ptr<PersistentCache>> registry;
+
+    std::lock_guard<std::mutex> lock(registryMutex);
+    std::weak_ptr<PersistentCache>& entry = registry[path];
+    if (std::shared_ptr<PersistentCache> existing = entry.lock()) {
+        existing->setMaxBytes(maxBytes);
+        return existing;
     }
-    return result;
+    std::shared_ptr<PersistentCache> cache(new PersistentCache(path, maxBytes));
+    entry = cache;
+    return cache;
 }
 
-std::vector<std::string> Calculator::tokenize(const std::string& expression) {
-    std::vector<std::string> tokens;
-    std::string current;
-    for (char c : expression) {
-        if (isspace((unsigned char)c)) {
-            if (!current.empty()) { tokens.push_back(current); current.clear(); }
+PersistentCache::PersistentCache(const std::string& path_, std::size_t maxBytes_)
+    : path(path_), mapping(new Mapping()), maxBytes(maxBytes_) {
+    load();
+}
+
+PersistentCache::~PersistentCache() = default;
+
+void PersistentCache::load() {
+    std::string header = persistentHeader();
+    remap();
+    if (mapping->size < header.size() || std::memcmp(mapping->data, header.data(), header.size()) != 0) {
+        // Нет файла, другой формат или другая сборка движка
+        if (!reset()) throw std::runtime_error("Cannot create persistent cache: " + path);
+        return;
+    }
+
+    size_t pos = header.size();
+    while (mapping->size - pos >= PERSISTENT_RECORD_HEADER) {
+        const char* record = mapping->data + pos;
+        std::size_t keyLength = readU32(record);
+        int precision = (int)readU32(record + 4);
+        std::size_t valueLength = readU32(record + 8);
+        if (keyLength + valueLength > mapping->size - pos - PERSISTENT_RECORD_HEADER) break;
+        if (fnv1a(record + PERSISTENT_RECORD_HEADER, keyLength + valueLength) != readU32(record + 12)) break;
+
+        // Повторная запись того же ключа (другим процессом) заменяет прежнюю
+        std::size_t size = PERSISTENT_RECORD_HEADER + keyLength + valueLength;
+        index[std::string(record + PERSISTENT_RECORD_HEADER, keyLength)][precision] = Slot{ pos, size, ++tick };
+        pos += size;
+    }
+    fileBytes = pos;
+
+    // Оборванная запись в конце (процесс завершился во время записи) или превышен лимит
+    if (pos != mapping->size || fileBytes > maxBytes) rewrite(maxBytes / 4 * 3);
+}
+
+void PersistentCache::remap() {
+    mapping->close();
+    mapping->open(path);
+}
+
+bool PersistentCache::readSlot(const Slot& slot, BigNumber& value) const {
+    if (slot.offset + slot.size > mapping->size) return false;
+    const char* record = mapping->data + slot.offset;
+    std::size_t keyLength = readU32(record);
+    std::size_t valueLength = readU32(record + 8);
+    return BigNumber::fromBinary(record + PERSISTENT_RECORD_HEADER + keyLength, valueLength, value);
+}
+
+bool PersistentCache::get(const std::string& key, int precision, BigNumber& value) {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = index.find(key);
+    if (it != index.end()) {
+        auto slot = it->second.find(precision);
+        if (slot != it->second.end() && readSlot(slot->second, value)) {
+            slot->second.lastUse = ++tick;
+            ++hits;
+            return true;
+        }
+    }
+    ++misses;
+    return false;
+}
+
+bool PersistentCache::getAtLeast(const std::string& key, int minPrecision, BigNumber& value, int& precision) {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = index.find(key);
+    if (it != index.end()) {
+        auto slot = it->second.lower_bound(minPrecision);
+        if (slot != it->second.end() && readSlot(slot->second, value)) {
+            slot->second.lastUse = ++tick;
+            precision = slot->first;
+            ++hits;
+            return true;
+        }
+    }
+    ++misses;
+    return false;
+}
+
+void PersistentCache::put(const std::string& key, int precision, const BigNumber& value) {
+    std::string record(PERSISTENT_RECORD_HEADER, '\0');
+    record += key;
+    value.appendBinary(record);
+    std::string header;
+    appendU32(header, (std::uint32_t)key.size());
+    appendU32(header, (std::uint32_t)precision);
+    appendU32(header, (std::uint32_t)(record.size() - PERSISTENT_RECORD_HEADER - key.size()));
+    appendU32(header, fnv1a(record.data() + PERSISTENT_RECORD_HEADER, record.size() - PERSISTENT_RECORD_HEADER));
+    record.replace(0, PERSISTENT_RECORD_HEADER, header);
+
+    std::lock_guard<std::mutex> lock(mutex);
+    // Запись больше половины лимита вытеснила бы почти всё остальное
+    if (fileBytes == 0 || record.size() > maxBytes / 2) return;
+    auto it = index.find(key);
+    if (it != index.end() && it->second.count(precision)) return;
+    if (fileBytes + record.size() > maxBytes) rewrite(maxBytes / 4 * 3 - record.size());
+
+    // Ошибки записи не мешают вычислениям: кэш просто не пополняется
+    std::FILE* file = std::fopen(path.c_str(), "ab");
+    if (!file) return;
+    bool written = std::fwrite(record.data(), 1, record.size(), file) == record.size();
+    long end = std::ftell(file);  // в режиме дозаписи - конец файла, даже если писал другой процесс
+    written = std::fclose(file) == 0 && written && end >= (long)record.size();
+    if (!written) return;
+
+    fileBytes = (std::size_t)end;
+    index[key][precision] = Slot{ fileBytes - record.size(), record.size(), ++tick };
+    remap();
+}
+
+void PersistentCache::rewrite(std::size_t budget) {
+    struct Item {
+        const std::string* key;
+        int precision;
+        Slot slot;
+    };
+    std::vector<Item> items;
+    for (const auto& byKey : index) {
+        for (const auto& byPrecision : byKey.second) items.push_back({ &byKey.first, byPrecision.first, byPrecision.second });
+    }
+    std::sort(items.begin(), items.end(), [](const Item& a, const Item& b) { return a.slot.lastUse > b.slot.lastUse; });
+
+    std::string header = persistentHeader();
+    std::string tempPath = path + ".tmp";
+    std::FILE* file = std::fopen(tempPath.c_str(), "wb");
+    if (!file) return;
+    bool ok = std::fwrite(header.data(), 1, header.size(), file) == header.size();
+
+    std::unordered_map<std::string, std::map<int, Slot>> kept;
+    std::size_t total = header.size();
+    for (const Item& item : items) {
+        if (!ok) break;
+        if (total + item.slot.size > budget || item.slot.offset + item.slot.size > mapping->size) {
+            ++evictions;
+            continue;
+        }
+        ok = std::fwrite(mapping->data + item.slot.offset, 1, item.slot.size, file) == item.slot.size;
+        kept[*item.key][item.precision] = Slot{ total, item.slot.size, item.slot.lastUse };
+        total += item.slot.size;
+    }
+    ok = std::fclose(file) == 0 && ok;
+
+    // Отображение держит файл: на Windows его нельзя заменить, пока оно открыто
+    mapping->close();
+    if (ok && std::rename(tempPath.c_str(), path.c_str()) != 0) {
+        std::remove(path.c_str());
+        ok = std::rename(tempPath.c_str(), path.c_str()) == 0;
+    }
+    if (!ok) {
+        std::remove(tempPath.c_str());
+        remap();
+        if (!mapping->data) reset();
+        return;
+    }
+    index.swap(kept);
+    fileBytes = total;
+    remap();
+}
+
+bool PersistentCache::reset() {
+    std::string header = persistentHeader();
+    mapping->close();
+    index.clear();
+    fileBytes = 0;  // 0 - файла нет, put ничего не пишет
+    std::FILE* file = std::fopen(path.c_str(), "wb");
+    if (!file) return false;
+    bool ok = std::fwrite(header.data(), 1, header.size(), file) == header.size();
+    if (std::fclose(file) != 0 || !ok) return false;
+    fileBytes = header.size();
+    remap();
+    return true;
+}
+
+void PersistentCache::clear() {
+    std::lock_guard<std::mutex> lock(mutex);
+    reset();
+}
+
+void PersistentCache::setMaxBytes(std::size_t newMaxBytes) {
+    std::lock_guard<std::mutex> lock(mutex);
+    maxBytes = newMaxBytes;
+    if (fileBytes > maxBytes) rewrite(maxBytes / 4 * 3);
+}
+
+std::size_t PersistentCache::getMaxBytes() const {
+    std::lock_guard<std::mutex> lock(mutex);
+    return maxBytes;
+}
+
+PersistentCache::Stats PersistentCache::getStats() const {
+    std::lock_guard<std::mutex> lock(mutex);
+    Stats stats;
+    stats.hits = hits;
+    stats.misses = misses;
+    stats.evictions = evictions;
+    stats.bytes = fileBytes;
+    for (const auto& byKey : index) stats.entries += byKey.second.size();
+    return stats;
+}
+
+// ------------------ Таблица функций (общая для parse* и CompiledExpression) ------------------
+
+static bool isFunctionName(const std::string& name) {
+    return name == "sin" || name == "cos" || name == "tan" || name == "ln" || name == "log" ||
+        name == "exp" || name == "factorial" || name == "sqrt";
+}
+
+static CompiledExpression::OpCode functionOpCode(const std::string& name) {
+    if (name == "sin") return CompiledExpression::SIN;
+    if (name == "cos") return CompiledExpression::COS;
+    if (name == "tan") return CompiledExpression::TAN;
+    if (name == "ln") return CompiledExpression::LN;
+    if (name == "log") return CompiledExpression::LOG;
+    if (name == "exp") return CompiledExpression::EXP;
+    if (name == "factorial") return CompiledExpression::FACTORIAL;
+    if (name == "sqrt") return CompiledExpression::SQRT;
+    throw std::runtime_error("Unknown function: " + name);
+}
+
+static BigNumber applyFunction(CompiledExpression::OpCode op, const BigNumber& arg, int precision) {
+    switch (op) {
+    case CompiledExpression::SIN: return arg.sin(precision);
+    case CompiledExpression::COS: return arg.cos(precision);
+    case CompiledExpression::TAN: return arg.tan(precision);
+    case CompiledExpression::LN: return arg.ln(precision);
+    case CompiledExpression::LOG: return arg.log10(precision);
+    case CompiledExpression::EXP: return arg.exp(precision);
+    case CompiledExpression::FACTORIAL: return arg.factorial();
+    case CompiledExpression::SQRT: return arg.power(BigNumber("0.5"), precision);
+    default: throw std::runtime_error("Unknown function opcode");
+    }
+}
+
+// ------------------ Improved Calculator with caching and precision ------------------
+
+Calculator::Calculator(Logger* logger_, int precision_)
+    : logger(logger_), precision(precision_) {}
+
+OperationProfile Calculator::getStats() const {
+    std::lock_guard<std::mutex> lock(statsMutex);
+    return stats;
+}
+
+void Calculator::resetStats() {
+    std::lock_guard<std::mutex> lock(statsMutex);
+    stats = OperationProfile();
+}
+
+void Calculator::enablePersistentCache(const std::string& path, std::size_t maxBytes) {
+    std::shared_ptr<PersistentCache> store = PersistentCache::open(path, maxBytes);
+    {
+        std::lock_guard<std::mutex> lock(persistentMutex);
+        persistent = store;
+    }
+    BigNumber::setConstantsStore(store);
+}
+
+void Calculator::disablePersistentCache() {
+    std::shared_ptr<PersistentCache> store;
+    {
+        std::lock_guard<std::mutex> lock(persistentMutex);
+        store.swap(persistent);
+    }
+    // Хранилище констант общее на процесс: отключаем, только если оно наше
+    if (store && BigNumber::getConstantsStore() == store) BigNumber::setConstantsStore(nullptr);
+}
+
+std::shared_ptr<PersistentCache> Calculator::getPersistentCache() const {
+    std::lock_guard<std::mutex> lock(persistentMutex);
+    return persistent;
+}
+
+void Calculator::setPrecision(int newPrecision) {
+    // Кэш не сбрасываем: точность входит в ключ, а параллельные вызовы
+    // со старой точностью могут ещё пользоваться своими записями
+    precision = newPrecision;
+}
+
+void Calculator::log(const std::string& level, const std::string& message) {
+    if (logger) logger->log(level, message);
+}
+
+BigNumber Calculator::evaluate(const std::string& expression) {
+    return evaluate(expression, precision.load());
+}
+
+BigNumber Calculator::evaluate(const std::string& expression, int precision) {
+    ProfileScope profile(stats, statsMutex);
+    ProfiledOperation profiled(OperationProfile::EVALUATE, 0);
+
+    // Сообщения собираем, только если уровень включён: toString() результата не бесплатен
+    if (logEnabled(Logger::LEVEL_INFO)) log("INFO", "Evaluating: " + expression + " with precision: " + std::to_string(precision));
+
+    auto tokens = tokenize(expression);
+
+    // Используем кэшированную версию вычисления
+    BigNumber result = evaluateWithCache(tokens, 0, tokens.size(), precision);
+
+    if (logEnabled(Logger::LEVEL_INFO)) log("INFO", "Result: " + result.toString());
+    return result;
+}
+
+BigNumber Calculator::evaluateWithCache(const std::vector<std::string>& tokens, size_t start, size_t end, int precision) {
+    // Создаем ключ для кэша
+    std::string subExpr = getSubExpression(tokens, start, end);
+    CacheKey key{subExpr, precision};
+
+    // Проверяем кэш
+    BigNumber result;
+    if (cache.get(key, result)) {
+        countOperation(OperationProfile::CACHE_HIT);
+        if (logEnabled(Logger::LEVEL_DEBUG)) log("DEBUG", "Cache hit for: " + key.expression);
+        return result;
+    }
+
+    countOperation(OperationProfile::CACHE_MISS);
+    std::shared_ptr<PersistentCache> store = getPersistentCache();
+    if (store && store->get(key.expression, precision, result)) {
+        cache.put(key, result);
+        return result;
+    }
+
+    // Вычисляем выражение
+    auto started = std::chrono::steady_clock::now();
+    size_t index = start;
+    result = parseExpression(tokens, index, precision);
+
+    // Сохраняем в кэш; на диск - только то, что считать дольше, чем прочитать
+    cache.put(key, result);
+    if (store && std::chrono::steady_clock::now() - started >= std::chrono::milliseconds(PersistentCache::MIN_COMPUTE_MS)) {
+        store->put(key.expression, precision, result);
+    }
+    if (logEnabled(Logger::LEVEL_DEBUG)) log("DEBUG", "Cached result for: " + key.expression);
+
+    return result;
+}
+
+std::string Calculator::getSubExpression(const std::vector<std::string>& tokens, size_t start, size_t end) {
+    std::string result;
+    for (size_t i = start; i < end && i < tokens.size(); ++i) {
+        if (!result.empty()) result += " ";
+        result += tokens[i];
+    }
+    return result;
+}
+
+std::vector<std::string> Calculator::tokenize(const std::string& expression) {
+    std::vector<std::string> tokens;
+    std::string current;
+    for (char c : expression) {
+        if (isspace((unsigned char)c)) {
+            if (!current.empty()) { tokens.push_back(current); current.clear(); }
         }
         else if (c == '(' || c == ')' || c == '+' || c == '-' || c == '*' || c == '/' || c == '^' || c == '!' || c == ',') {
             if (!current.empty()) { tokens.push_back(current); current.clear(); }
@@ -1314,13 +2864,13 @@ std::vector<std::string> Calculator::tokenize(const std::string& expression) {
     return tokens;
 }
 
-BigNumber Calculator::parseExpression(const std::vector<std::string>& tokens, size_t& index) {
-    BigNumber res = parseTerm(tokens, index);
+BigNumber Calculator::parseExpression(const std::vector<std::string>& tokens, size_t& index, int precision) {
+    BigNumber res = parseTerm(tokens, index, precision);
     while (index < tokens.size()) {
         std::string op = tokens[index];
         if (op == "+" || op == "-") {
             index++;
-            BigNumber right = parseTerm(tokens, index);
+            BigNumber right = parseTerm(tokens, index, precision);
             if (op == "+") {
                 res = res + right;
             } else {
@@ -1332,13 +2882,13 @@ BigNumber Calculator::parseExpression(const std::vector<std::string>& tokens, si
     return res;
 }
 
-BigNumber Calculator::parseTerm(const std::vector<std::string>& tokens, size_t& index) {
-    BigNumber res = parseFactor(tokens, index);
+BigNumber Calculator::parseTerm(const std::vector<std::string>& tokens, size_t& index, int precision) {
+    BigNumber res = parseFactor(tokens, index, precision);
     while (index < tokens.size()) {
         std::string op = tokens[index];
         if (op == "*" || op == "/") {
             index++;
-            BigNumber right = parseFactor(tokens, index);
+            BigNumber right = parseFactor(tokens, index, precision);
             if (op == "*") {
                 res = res * right;
             } else {
@@ -1350,13 +2900,22 @@ BigNumber Calculator::parseTerm(const std::vector<std::string>& tokens, size_t&
     return res;
 }
 
-BigNumber Calculator::parseFactor(const std::vector<std::string>& tokens, size_t& index) {
-    BigNumber res = parseNumber(tokens, index);
+BigNumber Calculator::parseFactor(const std::vector<std::string>& tokens, size_t& index, int precision) {
+    BigNumber res = parseNumber(tokens, index, precision);
     while (index < tokens.size()) {
         std::string op = tokens[index];
         if (op == "^") {
             index++;
-            BigNumber exp = parseFactor(tokens, index);
+            long long m = 0;
+            unsigned q = 1;
+            size_t end = index;
+            if (fractionExponentTokens(tokens, index, m, q, end)) {
+                // 8^(1/3): корень по записи дроби, а не по приближённому 0.333...3
+                index = end;
+                res = res.powerRational(m, q, precision);
+                continue;
+            }
+            BigNumber exp = parseFactor(tokens, index, precision);
             res = res.power(exp, precision);
         }
         else if (op == "!") {
@@ -1368,40 +2927,29 @@ BigNumber Calculator::parseFactor(const std::vector<std::string>& tokens, size_t
     return res;
 }
 
-BigNumber Calculator::parseFunction(const std::string& funcName, const std::vector<std::string>& tokens, size_t& index) {
+BigNumber Calculator::parseFunction(const std::string& funcName, const std::vector<std::string>& tokens, size_t& index, int precision) {
     if (index >= tokens.size() || tokens[index] != "(") {
         throw std::runtime_error("Expected '(' after function: " + funcName);
     }
     index++; // пропускаем "("
 
-    BigNumber arg = parseExpression(tokens, index);
+    BigNumber arg = parseExpression(tokens, index, precision);
 
     if (index >= tokens.size() || tokens[index] != ")") {
         throw std::runtime_error("Expected ')' after function argument: " + funcName);
     }
     index++; // пропускаем ")"
 
-    if (funcName == "sin") return arg.sin(precision);
-    else if (funcName == "cos") return arg.cos(precision);
-    else if (funcName == "tan") return arg.tan(precision);
-    else if (funcName == "ln") return arg.ln(precision);
-    else if (funcName == "log") return arg.log10(precision);
-    else if (funcName == "exp") return arg.exp(precision);
-    else if (funcName == "factorial") return arg.factorial();
-    else if (funcName == "sqrt") return arg.power(BigNumber("0.5"), precision);
-    else throw std::runtime_error("Unknown function: " + funcName);
+    return applyFunction(functionOpCode(funcName), arg, precision);
 }
 
-BigNumber Calculator::parseNumber(const std::vector<std::string>& tokens, size_t& index) {
+BigNumber Calculator::parseNumber(const std::vector<std::string>& tokens, size_t& index, int precision) {
     if (index >= tokens.size()) throw std::runtime_error("Unexpected end of expression");
     std::string token = tokens[index++];
 
-    // Проверяем кэш для простых выражений
-    CacheKey simpleKey{token, precision};
-    auto cached = cache.find(simpleKey);
-    if (cached != cache.end()) {
-        return cached->second;
-    }
+    // Унарные знаки: -x^2 = -(x^2), как и в записи на бумаге
+    if (token == "-") return parseFactor(tokens, index, precision).negate();
+    if (token == "+") return parseFactor(tokens, index, precision);
 
     if (token == "(") {
         // Для выражений в скобках используем кэширование
@@ -1419,21 +2967,16 @@ BigNumber Calculator::parseNumber(const std::vector<std::string>& tokens, size_t
         if (bracketCount > 0) throw std::runtime_error("Missing closing parenthesis");
 
         // Вычисляем выражение в скобках с кэшированием
-        BigNumber result = evaluateWithCache("", tokens, start, end - 1);
+        BigNumber result = evaluateWithCache(tokens, start, end - 1, precision);
         index = end;
 
-        // Кэшируем результат выражения в скобках
-        std::string subExpr = "(" + getSubExpression(tokens, start, end - 1) + ")";
-        cache[CacheKey{subExpr, precision}] = result;
-
         return result;
     }
 
     BigNumber result;
 
     // Обрабатываем функции
-    if (token == "sin" || token == "cos" || token == "tan" || token == "ln" || token == "log" ||
-        token == "exp" || token == "factorial" || token == "sqrt" || token == "pi" || token == "e") {
+    if (isFunctionName(token) || token == "pi" || token == "e") {
 
         if (token == "pi") {
             result = BigNumber::pi(precision);
@@ -1442,7 +2985,7 @@ BigNumber Calculator::parseNumber(const std::vector<std::string>& tokens, size_t
             result = BigNumber::e(precision);
         }
         else {
-            result = parseFunction(token, tokens, index);
+            result = parseFunction(token, tokens, index, precision);
         }
     }
     else {
@@ -1455,10 +2998,270 @@ BigNumber Calculator::parseNumber(const std::vector<std::string>& tokens, size_t
         }
     }
 
-    // Кэшируем простой токен
-    cache[simpleKey] = result;
+    // Отдельные токены не кэшируем: число разбирается дешевле поиска в кэше,
+    // а у функций (ln, sin, ...) результат зависит от аргумента, а не от имени
     return result;
 }
+// ------------------ Компиляция выражений ------------------
+
+int CompiledExpression::variableIndex(const std::string& name) const {
+    for (size_t i = 0; i < variables.size(); ++i) {
+        if (variables[i] == name) return (int)i;
+    }
+    return -1;
+}
+
+static bool isIdentifier(const std::string& token) {
+    if (token.empty() || !(std::isalpha((unsigned char)token[0]) || token[0] == '_')) return false;
+    for (char c : token) {
+        if (!(std::isalnum((unsigned char)c) || c == '_')) return false;
+    }
+    return true;
+}
+
+CompiledExpression Calculator::compile(const std::string& expression) {
+    CompiledExpression out;
+    out.source = expression;
+
+    auto tokens = tokenize(expression);
+    size_t index = 0;
+    compileExpression(tokens, index, out);
+    if (index < tokens.size()) {
+        throw std::runtime_error("Unexpected token: " + tokens[index]);
+    }
+    return out;
+}
+
+void Calculator::compileExpression(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out) {
+    compileTerm(tokens, index, out);
+    while (index < tokens.size() && (tokens[index] == "+" || tokens[index] == "-")) {
+        CompiledExpression::OpCode op = tokens[index] == "+" ? CompiledExpression::ADD : CompiledExpression::SUB;
+        index++;
+        compileTerm(tokens, index, out);
+        out.code.push_back({ op, 0 });
+    }
+}
+
+void Calculator::compileTerm(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out) {
+    compileFactor(tokens, index, out);
+    while (index < tokens.size() && (tokens[index] == "*" || tokens[index] == "/")) {
+        CompiledExpression::OpCode op = tokens[index] == "*" ? CompiledExpression::MUL : CompiledExpression::DIV;
+        index++;
+        compileFactor(tokens, index, out);
+        out.code.push_back({ op, 0 });
+    }
+}
+
+void Calculator::compileFactor(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out) {
+    compilePrimary(tokens, index, out);
+    while (index < tokens.size()) {
+        if (tokens[index] == "^") {
+            index++;
+            compileFactor(tokens, index, out);  // правоассоциативно, как parseFactor
+            out.code.push_back({ CompiledExpression::POW, 0 });
+        }
+        else if (tokens[index] == "!") {
+            index++;
+            out.code.push_back({ CompiledExpression::FACTORIAL, 0 });
+        }
+        else break;
+    }
+}
+
+void Calculator::compilePrimary(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out) {
+    if (index >= tokens.size()) throw std::runtime_error("Unexpected end of expression");
+    std::string token = tokens[index++];
+
+    if (token == "-") {
+        compileFactor(tokens, index, out);
+        out.code.push_back({ CompiledExpression::NEG, 0 });
+        return;
+    }
+    if (token == "+") {
+        compileFactor(tokens, index, out);
+        return;
+    }
+
+    if (token == "(") {
+        compileExpression(tokens, index, out);
+        if (index >= tokens.size() || tokens[index] != ")") throw std::runtime_error("Missing closing parenthesis");
+        index++;
+        return;
+    }
+
+    if (token == "pi") {
+        out.code.push_back({ CompiledExpression::PUSH_PI, 0 });
+        return;
+    }
+    if (token == "e") {
+        out.code.push_back({ CompiledExpression::PUSH_E, 0 });
+        return;
+    }
+
+    if (isFunctionName(token)) {
+        if (index >= tokens.size() || tokens[index] != "(") {
+            throw std::runtime_error("Expected '(' after function: " + token);
+        }
+        index++;
+        compileExpression(tokens, index, out);
+        if (index >= tokens.size() || tokens[index] != ")") {
+            throw std::runtime_error("Expected ')' after function argument: " + token);
+        }
+        index++;
+        out.code.push_back({ functionOpCode(token), 0 });
+        return;
+    }
+
+    if (isIdentifier(token)) {
+        if (index < tokens.size() && tokens[index] == "(") throw std::runtime_error("Unknown function: " + token);
+        int var = out.variableIndex(token);
+        if (var < 0) {
+            var = (int)out.variables.size();
+            out.variables.push_back(token);
+        }
+        out.code.push_back({ CompiledExpression::PUSH_VAR, var });
+        return;
+    }
+
+    try {
+        out.constants.push_back(BigNumber(token));
+    }
+    catch (...) {
+        throw std::runtime_error("Invalid number or function: " + token);
+    }
+    out.code.push_back({ CompiledExpression::PUSH_CONST, (int)out.constants.size() - 1 });
+}
+
+BigNumber Calculator::evaluate(const CompiledExpression& compiled, const std::vector<BigNumber>& bindings) {
+    return evaluate(compiled, bindings, precision.load());
+}
+
+BigNumber Calculator::evaluate(const CompiledExpression& compiled, const std::vector<BigNumber>& bindings, int precision) {
+    ProfileScope profile(stats, statsMutex);
+    ProfiledOperation profiled(OperationProfile::EVALUATE, 0);
+
+    if (bindings.size() != compiled.variables.size()) {
+        throw std::runtime_error("Expected " + std::to_string(compiled.variables.size()) +
+            " variable values, got " + std::to_string(bindings.size()));
+    }
+
+    std::vector<BigNumber> stack;
+    stack.reserve(compiled.code.size());
+    const auto& code = compiled.code;
+    for (size_t i = 0; i < code.size(); ++i) {
+        const auto& ins = code[i];
+        switch (ins.op) {
+        case CompiledExpression::PUSH_CONST: stack.push_back(compiled.constants[ins.operand]); break;
+        case CompiledExpression::PUSH_VAR: stack.push_back(bindings[ins.operand]); break;
+        case CompiledExpression::PUSH_PI: stack.push_back(BigNumber::pi(precision)); break;
+        case CompiledExpression::PUSH_E: stack.push_back(BigNumber::e(precision)); break;
+        case CompiledExpression::NEG: stack.back() = stack.back().negate(); break;
+        case CompiledExpression::ADD:
+        case CompiledExpression::SUB:
+        case CompiledExpression::MUL:
+        case CompiledExpression::DIV:
+        case CompiledExpression::POW: {
+            BigNumber right = std::move(stack.back());
+            stack.pop_back();
+            BigNumber& left = stack.back();
+            if (ins.op == CompiledExpression::ADD) left = left + right;
+            else if (ins.op == CompiledExpression::SUB) left = left - right;
+            else if (ins.op == CompiledExpression::MUL) left = left * right;
+            else if (ins.op == CompiledExpression::DIV) left = left.divide(right, precision);
+            else {
+                long long m = 0;
+                unsigned q = 1;
+                if (fractionExponentCode(compiled, i, m, q)) left = left.powerRational(m, q, precision);
+                else left = left.power(right, precision);
+            }
+            break;
+        }
+        default:
+            stack.back() = applyFunction(ins.op, stack.back(), precision);
+            break;
+        }
+    }
+    return stack.back();
+}
+
+// Результат одного выражения для C API: текст числа или текст ошибки, код CalculationStatus.
+// precision < 0 - текущая точность калькулятора.
+static int evaluateToString(Calculator* calc, const char* expression, int precision, std::string& out) {
+    try {
+        BigNumber result = precision < 0 ? calc->evaluate(std::string(expression))
+            : calc->evaluate(std::string(expression), precision);
+        out = result.toString();
+        return CALC_OK;
+    }
+    catch (const EvaluationInterrupted& e) {
+        out = e.what();
+        return e.reason() == EvaluationInterrupted::TIMEOUT ? CALC_TIMEOUT : CALC_CANCELLED;
+    }
+    catch (const std::exception& e) {
+        out = e.what();
+    }
+    catch (...) {
+        out = "Unknown exception";
+    }
+    return CALC_ERROR;
+}
+
+static char* copyToMalloc(const std::string& text) {
+    char* buffer = (char*)std::malloc(text.size() + 1);
+    if (!buffer) return nullptr;
+    std::memcpy(buffer, text.data(), text.size());
+    buffer[text.size()] = '\0';
+    return buffer;
+}
+
+// Склеивает результаты пакета в один буфер формата calculate_batch
+static char* packBatchResults(const std::vector<std::string>& items, size_t* offsets) {
+    std::string buffer;
+    size_t total = 0;
+    for (const auto& item : items) total += item.size() + 1;
+    buffer.reserve(total);
+    for (size_t i = 0; i < items.size(); ++i) {
+        offsets[i] = buffer.size();
+        buffer += items[i];
+        buffer.push_back('\0');
+    }
+    offsets[items.size()] = buffer.size();
+    return copyToMalloc(buffer);
+}
+
+// Буфер результата для calculate_expression_view/_into: один на поток, так как
+// Calculator используется из нескольких потоков одновременно
+struct ResultArena {
+    const Calculator* calc = nullptr;
+    std::string expression;
+    int precision = 0;
+    int status = CALC_OK;
+    std::string text;
+};
+
+static thread_local ResultArena t_resultArena;
+
+// Вычисляет в t_resultArena; повтор того же запроса (после CALC_BUFFER_TOO_SMALL) не пересчитывает
+static const ResultArena& evaluateToArena(Calculator* calc, const char* expression, int precision) {
+    ResultArena& arena = t_resultArena;
+    int effective = precision < 0 ? calc->getPrecision() : precision;
+    if (arena.calc == calc && arena.precision == effective && arena.expression == expression) return arena;
+
+    arena.calc = nullptr;  // на случай исключения при присваивании
+    arena.status = evaluateToString(calc, expression, effective, arena.text);
+    arena.expression = expression;
+    arena.precision = effective;
+    arena.calc = calc;
+    return arena;
+}
+
+// Общий пул для calculate_batch_parallel. Не удаляется: при выгрузке DLL
+// ожидание рабочих потоков в деструкторе статика может зависнуть (Windows loader lock).
+static ThreadPool& sharedThreadPool() {
+    static ThreadPool* pool = new ThreadPool();
+    return *pool;
+}
+
 // C interface
 extern "C" {
     __declspec(dllexport) Calculator* create_calculator_with_precision(int precision) {
@@ -1522,6 +3325,228 @@ extern "C" {
         }
     }
 
+    __declspec(dllexport) char* calculate_expression_with_precision(Calculator* calc, const char* expression, int precision) {
+        if (!calc || !expression) return nullptr;
+        std::string text;
+        if (evaluateToString(calc, expression, precision < 0 ? 0 : precision, text) != CALC_OK) text = "Error: " + text;
+        return copyToMalloc(text);
+    }
+
+    __declspec(dllexport) int calculate_expression_ex(Calculator* calc, const char* expression, int precision,
+        int timeout_ms, CancellationToken* token, char** result) {
+        if (result) *result = nullptr;
+        if (!calc || !expression || !result) return CALC_ERROR;
+
+        EvaluationScope::Clock::time_point deadline = timeout_ms > 0
+            ? EvaluationScope::Clock::now() + std::chrono::milliseconds(timeout_ms)
+            : EvaluationScope::noDeadline();
+
+        std::string text;
+        int status;
+        {
+            EvaluationScope scope(deadline, token);
+            status = evaluateToString(calc, expression, precision, text);
+        }
+        *result = copyToMalloc(text);
+        return status;
+    }
+
+    __declspec(dllexport) int calculate_expression_into(Calculator* calc, const char* expression, int precision,
+        char* buffer, size_t capacity, size_t* length) {
+        if (!calc || !expression || !length) return CALC_ERROR;
+
+        const ResultArena& arena = evaluateToArena(calc, expression, precision);
+        *length = arena.text.size();
+        if (!buffer || capacity < arena.text.size() + 1) return CALC_BUFFER_TOO_SMALL;
+
+        std::memcpy(buffer, arena.text.data(), arena.text.size());
+        buffer[arena.text.size()] = '\0';
+        int status = arena.status;
+        t_resultArena = ResultArena();  // результат отдан - не держим память (важно для длинных чисел)
+        return status;
+    }
+
+    __declspec(dllexport) int calculate_expression_view(Calculator* calc, const char* expression, int precision,
+        const char** data, size_t* length) {
+        if (!calc || !expression || !data || !length) return CALC_ERROR;
+
+        const ResultArena& arena = evaluateToArena(calc, expression, precision);
+        *data = arena.text.c_str();
+        *length = arena.text.size();
+        return arena.status;
+    }
+
+    __declspec(dllexport) CancellationToken* create_cancellation_token() {
+        return new CancellationToken();
+    }
+
+    __declspec(dllexport) void cancel_cancellation_token(CancellationToken* token) {
+        if (token) token->cancel();
+    }
+
+    __declspec(dllexport) void reset_cancellation_token(CancellationToken* token) {
+        if (token) token->reset();
+    }
+
+    __declspec(dllexport) void delete_cancellation_token(CancellationToken* token) {
+        delete token;
+    }
+
+    __declspec(dllexport) char* calculate_batch(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets) {
+        if (!calc || (!expressions && count > 0) || !statuses || !offsets) return nullptr;
+
+        // Точность фиксируется один раз на весь пакет
+        int precision = calc->getPrecision();
+        std::vector<std::string> items(count);
+        for (size_t i = 0; i < count; ++i) {
+            if (!expressions[i]) {
+                statuses[i] = CALC_ERROR;
+                items[i] = "Null expression";
+            }
+            else {
+                statuses[i] = evaluateToString(calc, expressions[i], precision, items[i]);
+            }
+        }
+        return packBatchResults(items, offsets);
+    }
+
+    __declspec(dllexport) char* calculate_batch_parallel(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets, int threads) {
+        if (!calc || (!expressions && count > 0) || !statuses || !offsets) return nullptr;
+
+        int precision = calc->getPrecision();
+        std::vector<std::string> items(count);
+        sharedThreadPool().parallelFor(count, [&](size_t i) {
+            if (!expressions[i]) {
+                statuses[i] = CALC_ERROR;
+                items[i] = "Null expression";
+            }
+            else {
+                statuses[i] = evaluateToString(calc, expressions[i], precision, items[i]);
+            }
+        }, threads > 0 ? (size_t)threads : 0);
+        return packBatchResults(items, offsets);
+    }
+
+    __declspec(dllexport) char* calculate_batch_ex(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets, int threads, int timeout_ms, CancellationToken* token) {
+        if (!calc || (!expressions && count > 0) || !statuses || !offsets) return nullptr;
+
+        EvaluationScope::Clock::time_point deadline = timeout_ms > 0
+            ? EvaluationScope::Clock::now() + std::chrono::milliseconds(timeout_ms)
+            : EvaluationScope::noDeadline();
+        int precision = calc->getPrecision();
+        std::vector<std::string> items(count);
+        auto body = [&](size_t i) {
+            if (!expressions[i]) {
+                statuses[i] = CALC_ERROR;
+                items[i] = "Null expression";
+                return;
+            }
+            // Срок и токен - thread_local, поэтому scope открывается в каждом рабочем потоке
+            EvaluationScope scope(deadline, token);
+            try {
+                EvaluationScope::check();  // прерванный пакет не начинает новые выражения
+            }
+            catch (const EvaluationInterrupted& e) {
+                items[i] = e.what();
+                statuses[i] = e.reason() == EvaluationInterrupted::TIMEOUT ? CALC_TIMEOUT : CALC_CANCELLED;
+                return;
+            }
+            statuses[i] = evaluateToString(calc, expressions[i], precision, items[i]);
+        };
+
+        if (threads == 1) {
+            for (size_t i = 0; i < count; ++i) body(i);
+        }
+        else {
+            sharedThreadPool().parallelFor(count, body, threads > 0 ? (size_t)threads : 0);
+        }
+        return packBatchResults(items, offsets);
+    }
+
+    __declspec(dllexport) CompiledExpression* compile_expression(Calculator* calc, const char* expression, char** error) {
+        if (error) *error = nullptr;
+        if (!calc || !expression) return nullptr;
+
+        std::string message;
+        try {
+            return new CompiledExpression(calc->compile(std::string(expression)));
+        }
+        catch (const std::exception& e) {
+            message = e.what();
+        }
+        catch (...) {
+            message = "Unknown exception";
+        }
+
+        if (error) {
+            *error = (char*)std::malloc(message.size() + 1);
+            if (*error) std::strcpy(*error, message.c_str());
+        }
+        return nullptr;
+    }
+
+    __declspec(dllexport) int get_compiled_variable_count(CompiledExpression* compiled) {
+        return compiled ? (int)compiled->getVariables().size() : 0;
+    }
+
+    __declspec(dllexport) const char* get_compiled_variable_name(CompiledExpression* compiled, int index) {
+        if (!compiled || index < 0 || index >= (int)compiled->getVariables().size()) return nullptr;
+        return compiled->getVariables()[index].c_str();
+    }
+
+    __declspec(dllexport) char* eval_compiled(Calculator* calc, CompiledExpression* compiled, const char** values, size_t count) {
+        if (!calc || !compiled || (!values && count > 0)) return nullptr;
+
+        std::string text;
+        try {
+            std::vector<BigNumber> bindings;
+            bindings.reserve(count);
+            for (size_t i = 0; i < count; ++i) {
+                if (!values[i]) throw std::runtime_error("Null variable value at index " + std::to_string(i));
+                bindings.push_back(BigNumber(std::string(values[i])));
+            }
+            text = calc->evaluate(*compiled, bindings).toString();
+        }
+        catch (const std::exception& e) {
+            text = std::string("Error: ") + e.what();
+        }
+        catch (...) {
+            text = "Error: Unknown exception";
+        }
+
+        char* result_buffer = (char*)std::malloc(text.size() + 1);
+        if (!result_buffer) return nullptr;
+        std::strcpy(result_buffer, text.c_str());
+        return result_buffer;
+    }
+
+    __declspec(dllexport) int get_compiled_code(CompiledExpression* compiled, int* ops, int* operands, int capacity) {
+        if (!compiled) return 0;
+        const auto& code = compiled->getCode();
+        for (int i = 0; i < capacity && i < (int)code.size(); ++i) {
+            if (ops) ops[i] = (int)code[i].op;
+            if (operands) operands[i] = code[i].operand;
+        }
+        return (int)code.size();
+    }
+
+    __declspec(dllexport) int get_compiled_constants(CompiledExpression* compiled, double* values, int capacity) {
+        if (!compiled) return 0;
+        const auto& constants = compiled->getConstants();
+        for (int i = 0; i < capacity && i < (int)constants.size(); ++i) {
+            // strtod округляет десятичную запись корректно
+            if (values) values[i] = std::strtod(constants[i].toString().c_str(), nullptr);
+        }
+        return (int)constants.size();
+    }
+
+    __declspec(dllexport) void delete_compiled_expression(CompiledExpression* compiled) {
+        delete compiled;
+    }
+
     __declspec(dllexport) void set_calculator_precision(Calculator* calc, int precision) {
         if (calc) calc->setPrecision(precision);
     }
@@ -1530,6 +3555,104 @@ extern "C" {
         return calc ? calc->getPrecision() : -1;
     }
 
+    __declspec(dllexport) void set_calculator_cache_limit(Calculator* calc, size_t max_bytes) {
+        if (calc) calc->setCacheLimit(max_bytes);
+    }
+
+    __declspec(dllexport) size_t get_calculator_cache_limit(Calculator* calc) {
+        return calc ? calc->getCacheLimit() : 0;
+    }
+
+    __declspec(dllexport) void clear_calculator_cache(Calculator* calc) {
+        if (calc) calc->clearCache();
+    }
+
+    __declspec(dllexport) void clear_constants_cache() {
+        BigNumber::clearConstantsCache();
+    }
+
+    __declspec(dllexport) void get_calculator_cache_stats(Calculator* calc, unsigned long long* hits, unsigned long long* misses,
+        unsigned long long* evictions, unsigned long long* bytes, unsigned long long* entries) {
+        ResultCache::Stats stats;
+        if (calc) stats = calc->getCacheStats();
+        if (hits) *hits = stats.hits;
+        if (misses) *misses = stats.misses;
+        if (evictions) *evictions = stats.evictions;
+        if (bytes) *bytes = stats.bytes;
+        if (entries) *entries = stats.entries;
+    }
+
+    __declspec(dllexport) int get_calculator_stats(Calculator* calc, unsigned long long* buf, int capacity) {
+        OperationProfile stats;
+        if (calc) stats = calc->getStats();
+        std::vector<unsigned long long> values;
+        values.reserve(3 * OperationProfile::OPERATION_COUNT + 2);
+        for (int op = 0; op < OperationProfile::OPERATION_COUNT; ++op) {
+            values.push_back(stats.calls[op]);
+            values.push_back(stats.nanoseconds[op]);
+            values.push_back(stats.limbs[op]);
+        }
+        values.push_back(stats.peakLimbs);
+        values.push_back(stats.peakHeapBytes);
+        if (buf) {
+            for (int i = 0; i < capacity && i < (int)values.size(); ++i) buf[i] = values[i];
+        }
+        return (int)values.size();
+    }
+
+    __declspec(dllexport) void reset_calculator_stats(Calculator* calc) {
+        if (calc) calc->resetStats();
+    }
+
+    __declspec(dllexport) int enable_persistent_cache(Calculator* calc, const char* path, size_t max_bytes, char** error) {
+        if (error) *error = nullptr;
+        if (!calc || !path) return CALC_ERROR;
+
+        std::string message;
+        try {
+            calc->enablePersistentCache(path, max_bytes);
+            return CALC_OK;
+        }
+        catch (const std::exception& e) {
+            message = e.what();
+        }
+        catch (...) {
+            message = "Unknown exception";
+        }
+
+        if (error) {
+            *error = (char*)std::malloc(message.size() + 1);
+            if (*error) std::strcpy(*error, message.c_str());
+        }
+        return CALC_ERROR;
+    }
+
+    __declspec(dllexport) void disable_persistent_cache(Calculator* calc) {
+        if (calc) calc->disablePersistentCache();
+    }
+
+    __declspec(dllexport) void clear_persistent_cache(Calculator* calc) {
+        if (!calc) return;
+        std::shared_ptr<PersistentCache> store = calc->getPersistentCache();
+        if (store) store->clear();
+    }
+
+    __declspec(dllexport) void get_persistent_cache_stats(Calculator* calc, unsigned long long* hits, unsigned long long* misses,
+        unsigned long long* evictions, unsigned long long* bytes, unsigned long long* entries) {
+        PersistentCache::Stats stats;
+        std::shared_ptr<PersistentCache> store = calc ? calc->getPersistentCache() : nullptr;
+        if (store) stats = store->getStats();
+        if (hits) *hits = stats.hits;
+        if (misses) *misses = stats.misses;
+        if (evictions) *evictions = stats.evictions;
+        if (bytes) *bytes = stats.bytes;
+        if (entries) *entries = stats.entries;
+    }
+
+    __declspec(dllexport) void set_multiply_thresholds(int karatsuba, int toom3, int ntt) {
+        BigNumber::setMultiplyThresholds(karatsuba, toom3, ntt);
+    }
+
     __declspec(dllexport) void delete_calculator(Calculator* calc) {
         if (calc) {
             delete calc;
@@ -1542,3 +3665,66 @@ extern "C" {
         }
     }
 }
+
+// ------------------ Отображение файла в память ------------------
+// В конце файла: системные заголовки определяют макросы, которые не должны задевать код выше
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#ifndef WIN32_LEAN_AND_MEAN
+#define WIN32_LEAN_AND_MEAN
+#endif
+#include <windows.h>
+
+bool PersistentCache::Mapping::open(const std::string& path) {
+    HANDLE file = CreateFileA(path.c_str(), GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+        nullptr, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+    if (file == INVALID_HANDLE_VALUE) return false;
+    LARGE_INTEGER fileSize;
+    HANDLE view = nullptr;
+    if (GetFileSizeEx(file, &fileSize) && fileSize.QuadPart > 0) {
+        view = CreateFileMappingA(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+    }
+    CloseHandle(file);  // отображение держит файл открытым
+    if (!view) return false;
+    data = static_cast<const char*>(MapViewOfFile(view, FILE_MAP_READ, 0, 0, 0));
+    CloseHandle(view);
+    if (!data) return false;
+    size = (std::size_t)fileSize.QuadPart;
+    return true;
+}
+
+void PersistentCache::Mapping::close() {
+    if (data) UnmapViewOfFile(data);
+    data = nullptr;
+    size = 0;
+}
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+bool PersistentCache::Mapping::open(const std::string& path) {
+    int fd = ::open(path.c_str(), O_RDONLY);
+    if (fd < 0) return false;
+    struct stat info;
+    void* view = MAP_FAILED;
+    if (fstat(fd, &info) == 0 && info.st_size > 0) {
+        view = mmap(nullptr, (std::size_t)info.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    }
+    ::close(fd);  // отображение держит файл открытым
+    if (view == MAP_FAILED) return false;
+    data = static_cast<const char*>(view);
+    size = (std::size_t)info.st_size;
+    return true;
+}
+
+void PersistentCache::Mapping::close() {
+    if (data) munmap(const_cast<char*>(data), size);
+    data = nullptr;
+    size = 0;
+}
+#endif
@@ -5,16 +5,119 @@
 #include "msvc_config.h"
 
 #include "logger.h"
+#include "small_vector.h"
 #include <vector>
 #include <string>
 #include <cmath>
 #include <stdexcept>
 #include <unordered_map>
 #include <memory>
+#include <cstdint>
+#include <list>
+#include <map>
+#include <atomic>
+#include <mutex>
+#include <chrono>
+
+// ------------------ Прерывание вычислений ------------------
+
+// Флаг отмены; cancel() можно вызывать из любого потока
+class CancellationToken {
+public:
+    void cancel() { cancelled = true; }
+    void reset() { cancelled = false; }
+    bool isCancelled() const { return cancelled.load(); }
+
+private:
+    std::atomic<bool> cancelled{ false };
+};
+
+// Бросается из циклов рядов/факториала, когда истёк срок или вычисление отменено
+class EvaluationInterrupted : public std::runtime_error {
+public:
+    enum Reason { TIMEOUT, CANCELLED };
+
+    explicit EvaluationInterrupted(Reason reason)
+        : std::runtime_error(reason == TIMEOUT ? "Evaluation timed out" : "Evaluation cancelled"), why(reason) {}
+    Reason reason() const { return why; }
+
+private:
+    Reason why;
+};
+
+// Ограничения вычисления в текущем потоке на время жизни объекта (вложенные scope
+// восстанавливают предыдущие). Долгие циклы вызывают check() кооперативно.
+class EvaluationScope {
+public:
+    typedef std::chrono::steady_clock Clock;
+
+    EvaluationScope(Clock::time_point deadline, const CancellationToken* token);
+    ~EvaluationScope();
+    EvaluationScope(const EvaluationScope&) = delete;
+    EvaluationScope& operator=(const EvaluationScope&) = delete;
+
+    static Clock::time_point noDeadline() { return Clock::time_point::max(); }
+    static void check();  // EvaluationInterrupted при отмене или истёкшем сроке
+
+private:
+    Clock::time_point previousDeadline;
+    const CancellationToken* previousToken;
+};
+
+// ------------------ Профилирование ------------------
+
+// Счётчики операций одного или многих вычислений. Время включает вложенные операции
+// (exp вызывает multiply - время multiply входит и в exp); для SERIES_TERM и CACHE_*
+// считается только количество, для MULTIPLY и DIVIDE время замеряется только у длинных
+// операндов (от 16 лимбов) - короткие дешевле самого замера.
+struct OperationProfile {
+    // Порядок - часть C API (get_calculator_stats), новые операции только в конец перед OPERATION_COUNT
+    enum Operation {
+        EVALUATE, MULTIPLY, DIVIDE, POWER, FACTORIAL, EXP, LN, SIN_COS, CONSTANT,
+        SERIES_TERM, CACHE_HIT, CACHE_MISS, OPERATION_COUNT
+    };
+
+    std::uint64_t calls[OPERATION_COUNT] = {};
+    std::uint64_t nanoseconds[OPERATION_COUNT] = {};
+    std::uint64_t limbs[OPERATION_COUNT] = {};  // сумма длин операндов в лимбах
+    std::uint64_t peakLimbs = 0;                // самый длинный операнд multiply/divide
+    std::uint64_t peakHeapBytes = 0;            // пик памяти мантисс в куче за одно вычисление
+
+    void merge(const OperationProfile& other);
+};
+
+// Сбор профиля в текущем потоке на время жизни объекта: операции BigNumber пишут
+// в профиль потока без блокировок, при выходе (в том числе по исключению) он
+// сливается в target под targetMutex. Вложенный scope собирает свой профиль
+// отдельно. Без активного scope операции не профилируются.
+class ProfileScope {
+public:
+    ProfileScope(OperationProfile& target, std::mutex& targetMutex);
+    ~ProfileScope();
+    ProfileScope(const ProfileScope&) = delete;
+    ProfileScope& operator=(const ProfileScope&) = delete;
+
+private:
+    OperationProfile& target;
+    std::mutex& targetMutex;
+    OperationProfile profile;
+    OperationProfile* previousProfile;
+    SmallVectorHeapUsage heap;
+    SmallVectorHeapUsage* previousHeap;
+};
 
 class BigNumber {
+public:
+    // Мантисса хранится "лимбами" по 9 десятичных цифр (основание 10^9)
+    typedef std::uint32_t Limb;
+    static const Limb LIMB_BASE = 1000000000u;
+    static const int LIMB_DIGITS = 9;
+    // До INLINE_LIMBS лимбов (72 цифры) мантисса хранится внутри объекта, без кучи
+    static const std::size_t INLINE_LIMBS = 8;
+    typedef SmallVector<Limb, INLINE_LIMBS> LimbVector;
+
 private:
-    std::vector<int> digits;  // цифры (0-9), digits[0] - младший разряд (LSB first)
+    LimbVector limbs;  // мантисса, limbs[0] - младший лимб (LSB first)
     int decimalPoint;        // позиция десятичной точки (количество цифр после запятой)
     static const std::string LN_10;  // ln(10) с высокой точностью
 
@@ -51,6 +154,8 @@ public:
 
     // Математические функции
     BigNumber power(const BigNumber& exponent, int precision = 50) const;
+    // x^(m/q), q <= 9: степень с показателем-дробью, записанной в выражении (8^(1/3) = 2)
+    BigNumber powerRational(long long m, unsigned q, int precision = 50) const;
     BigNumber factorial() const;
     BigNumber sin(int precision = 60) const;
     BigNumber cos(int precision = 60) const;
@@ -59,9 +164,37 @@ public:
     BigNumber log10(int precision = 50) const;
     BigNumber exp(int precision = 50) const;
 
+    // Пороги переключения алгоритмов умножения (в лимбах меньшего операнда):
+    // schoolbook -> Karatsuba -> Toom-3 -> NTT
+    static void setMultiplyThresholds(int karatsuba, int toom3, int ntt);
+    static int getKaratsubaThreshold();
+    static int getToom3Threshold();
+    static int getNTTThreshold();
+
+    // Порог (в лимбах делителя), начиная с которого деление идёт через
+    // обратное по Ньютону вместо алгоритма D Кнута
+    static void setNewtonDivisionThreshold(int limbs);
+    static int getNewtonDivisionThreshold();
+
+    // Порог точности (в цифрах), начиная с которого ln считается через AGM вместо ряда
+    static void setLnAgmThreshold(int digits);
+    static int getLnAgmThreshold();
+
     // Вспомогательные методы
     static BigNumber pi(int precision = 100);
     static BigNumber e(int precision = 100);
+    static BigNumber isqrt(const BigNumber& x, int precision);  // floor(sqrt(x)) с precision знаками
+    static BigNumber iroot(const BigNumber& x, unsigned degree, int precision);  // корень степени degree
+    static void clearConstantsCache();  // сброс общего кэша π, e, ln2, ln10
+    // Постоянное хранилище для кэша констант (nullptr - отключить): посчитанные
+    // константы записываются туда, а после перезапуска читаются вместо пересчёта
+    static void setConstantsStore(std::shared_ptr<class PersistentCache> store);
+    static std::shared_ptr<class PersistentCache> getConstantsStore();
+
+    // Компактная двоичная запись: знак, позиция точки, число лимбов и лимбы (little-endian).
+    // fromBinary возвращает false, если данные обрезаны или повреждены.
+    void appendBinary(std::string& out) const;
+    static bool fromBinary(const char* data, std::size_t size, BigNumber& out);
     bool isZero() const;
     BigNumber abs() const;
     BigNumber negate() const;
@@ -74,12 +207,16 @@ public:
     void divideByDigit(int digit);
     bool isNormalized() const;
 
-    // Алгоритм деления (интерфейс; реализация использует надёжный long-division helper)
+    // Алгоритм деления (интерфейс; целочисленное деление мантисс через divModArrays)
     BigNumber divideKnuth(const BigNumber& other, int precision) const;
 
     // ОТЛАДОЧНЫЕ МЕТОДЫ
     int getDecimalPoint() const { return decimalPoint; }
-    std::vector<int> getDigits() const { return digits; }
+    std::vector<int> getDigits() const;  // десятичные цифры мантиссы, LSB first
+    const LimbVector& getLimbs() const { return limbs; }
+    // Занимаемая память (объект + буфер лимбов), для учёта в кэшах
+    // Встроенные лимбы уже входят в sizeof(BigNumber), в куче - только длинные мантиссы
+    std::size_t byteSize() const { return sizeof(BigNumber) + (limbs.isInline() ? 0 : limbs.capacity() * sizeof(Limb)); }
     bool isNegative() const { return negative; }
     std::string debugString() const;
 
@@ -91,50 +228,249 @@ public:
 
 private:
     void reduceToFirstQuadrant(const BigNumber& x, BigNumber& reducedX, int& quadrant, int precision);
-    BigNumber sin_taylor_small(const BigNumber& x, int precision) const;
-    BigNumber cos_taylor_small(const BigNumber& x, int precision) const;
+    static BigNumber sin_taylor_small(const BigNumber& x, int precision);
+    static BigNumber cos_taylor_small(const BigNumber& x, int precision);
+    // Редуцированные аргументы: exp(f) при 0 <= f < 1, sin/cos при 0 <= x <= π/2
+    static BigNumber expReduced(const BigNumber& f, int precision);
+    BigNumber ln_series(int precision) const;
+    BigNumber ln_agm(int precision) const;
+    static void sinCosReduced(const BigNumber& x, int precision, BigNumber& sinX, BigNumber& cosX);
+    // x = сумма кусков с короткими мантиссами (цифры после точки 1..18, 19..36, 37..72, ...)
+    static std::vector<BigNumber> splitDigitChunks(const BigNumber& x);
     BigNumber sin_high_precision(int precision) const;
     BigNumber cos_high_precision(int precision) const;
     BigNumber divideSimple(const BigNumber& other, int precision) const;
+    BigNumber powerInteger(std::uint64_t n, int significantDigits, bool& truncated) const;
     void removeLeadingZeros();
     void alignDecimals(BigNumber& other, int& newDecimal);
-    std::vector<int> addArrays(const std::vector<int>& a, const std::vector<int>& b) const;
-    std::vector<int> subtractArrays(const std::vector<int>& a, const std::vector<int>& b) const;
-    std::vector<int> multiplyArrays(const std::vector<int>& a, const std::vector<int>& b) const;
+    static BigNumber fromLimbs(LimbVector&& limbs, bool negative, int decimalPoint);
 
-    int compareArrays(const std::vector<int>& a, const std::vector<int>& b) const;
+    // Операции над мантиссами (LSB-first, основание 10^9)
+    static LimbVector addArrays(const LimbVector& a, const LimbVector& b);
+    static LimbVector subtractArrays(const LimbVector& a, const LimbVector& b);
+    static LimbVector multiplyArrays(const LimbVector& a, const LimbVector& b);
+    static LimbVector multiplySchoolbook(const LimbVector& a, const LimbVector& b);
+    static LimbVector multiplyKaratsuba(const LimbVector& a, const LimbVector& b);
+    static LimbVector multiplyToom3(const LimbVector& a, const LimbVector& b);
+    static LimbVector multiplyNTT(const LimbVector& a, const LimbVector& b);
+    static int compareArrays(const LimbVector& a, const LimbVector& b);
 
-    // helper: long division on decimal strings (MSB-first)
-    static std::string longDivStrings(const std::string& dividend, const std::string& divisor);
+    // Целочисленное деление мантисс: q = a / b, r = a % b
+    static void divModArrays(const LimbVector& a, const LimbVector& b,
+                             LimbVector& q, LimbVector& r);
+    static void divModKnuth(const LimbVector& a, const LimbVector& b,
+                            LimbVector& q, LimbVector& r);
+    static void divModNewton(const LimbVector& a, const LimbVector& b,
+                             LimbVector& q, LimbVector& r);
+    static LimbVector reciprocalArrays(const LimbVector& d);
+
+    // floor(sqrt(n)) для целой мантиссы
+    static LimbVector isqrtArrays(const LimbVector& n);
+    // floor(n^(1/degree)) и n^e для целых мантисс
+    static LimbVector irootArrays(const LimbVector& n, unsigned degree);
+    static LimbVector powArrays(const LimbVector& a, std::uint64_t e);
+
+    // Произведение целых a * (a+1) * ... * b (product tree)
+    static LimbVector productRange(std::uint64_t a, std::uint64_t b);
 
     // utility trim for LSB-first vectors
-    static void trimLSBVector(std::vector<int>& a);
+    static void trimLSBVector(LimbVector& a);
 };
 
 // Добавляем в класс Calculator поддержку factorial и улучшаем парсинг
-class Calculator {
-private:
-    class Logger* logger;
-    int precision;
-
-    // Кэш для хранения результатов вычислений
-    struct CacheKey {
+// Кэш результатов Calculator: LRU с ограничением по объёму памяти.
+// Объём entry = ключ + BigNumber (лимбы) + накладные расходы списка и индекса.
+// Потокобезопасен: ключи распределены по SHARD_COUNT сегментам со своими мьютексами,
+// лимит памяти делится между сегментами поровну.
+class ResultCache {
+public:
+    struct Key {
         std::string expression;
         int precision;
 
-        bool operator==(const CacheKey& other) const {
+        bool operator==(const Key& other) const {
             return expression == other.expression && precision == other.precision;
         }
     };
 
-    struct CacheKeyHash {
-        std::size_t operator()(const CacheKey& key) const {
+    struct Stats {
+        std::uint64_t hits = 0;
+        std::uint64_t misses = 0;
+        std::uint64_t evictions = 0;
+        std::size_t bytes = 0;
+        std::size_t entries = 0;
+    };
+
+    static const std::size_t DEFAULT_MAX_BYTES = 16u * 1024u * 1024u;
+    static const std::size_t SHARD_COUNT = 16;
+
+    explicit ResultCache(std::size_t maxBytes = DEFAULT_MAX_BYTES) : maxBytes(maxBytes) {}
+
+    // true и result - если найдено (элемент становится самым свежим)
+    bool get(const Key& key, BigNumber& result);
+    void put(const Key& key, const BigNumber& value);
+    void clear();
+
+    void setMaxBytes(std::size_t newMaxBytes);  // 0 - кэш отключён
+    std::size_t getMaxBytes() const { return maxBytes.load(); }
+    Stats getStats() const;
+
+private:
+    struct KeyHash {
+        std::size_t operator()(const Key& key) const {
             return std::hash<std::string>{}(key.expression) ^
                 (std::hash<int>{}(key.precision) << 1);
         }
     };
 
-    std::unordered_map<CacheKey, BigNumber, CacheKeyHash> cache;
+    struct Entry {
+        Key key;
+        BigNumber value;
+        std::size_t bytes;
+    };
+
+    struct Shard {
+        mutable std::mutex mutex;
+        std::list<Entry> lru;  // front - самый свежий
+        std::unordered_map<Key, std::list<Entry>::iterator, KeyHash> index;
+        std::size_t bytes = 0;
+        std::uint64_t hits = 0;
+        std::uint64_t misses = 0;
+        std::uint64_t evictions = 0;
+    };
+
+    static std::size_t entryBytes(const Key& key, const BigNumber& value);
+    Shard& shardFor(const Key& key) { return shards[KeyHash{}(key) % SHARD_COUNT]; }
+    std::size_t shardBudget() const { return maxBytes.load() / SHARD_COUNT; }
+    static void evictUntilFits(Shard& shard, std::size_t budget, std::size_t incoming);
+
+    Shard shards[SHARD_COUNT];
+    std::atomic<std::size_t> maxBytes;
+};
+
+// Постоянный кэш результатов на диске: файл с заголовком (формат и сборка движка) и
+// записями "ключ, точность, BigNumber в двоичном виде". Файл отображается в память
+// для чтения, новые записи дописываются в конец. Когда файл больше maxBytes, он
+// переписывается без давно не использованных записей. Файл другой сборки движка
+// или другого формата сбрасывается, повреждённый хвост отбрасывается.
+// Потокобезопасен; один путь в процессе - один объект (open). Рассчитан на одного
+// пишущего: записи других процессов в тот же файл могут теряться при сжатии.
+class PersistentCache {
+public:
+    struct Stats {
+        std::uint64_t hits = 0;
+        std::uint64_t misses = 0;
+        std::uint64_t evictions = 0;
+        std::size_t bytes = 0;    // размер файла
+        std::size_t entries = 0;
+    };
+
+    static const std::size_t DEFAULT_MAX_BYTES = 64u * 1024u * 1024u;
+    // Записывается только то, что считалось не меньше этого времени: быстрее пересчитать, чем читать
+    static constexpr int MIN_COMPUTE_MS = 1;
+
+    // Открывает или создаёт файл кэша; для уже открытого в процессе пути возвращает
+    // тот же объект (с новым maxBytes). При ошибке ввода-вывода - std::runtime_error.
+    static std::shared_ptr<PersistentCache> open(const std::string& path, std::size_t maxBytes = DEFAULT_MAX_BYTES);
+    // Строка сборки движка в заголовке файла: CALCULATOR_ENGINE_BUILD или дата и время компиляции
+    static const char* engineBuild();
+
+    ~PersistentCache();
+    PersistentCache(const PersistentCache&) = delete;
+    PersistentCache& operator=(const PersistentCache&) = delete;
+
+    bool get(const std::string& key, int precision, BigNumber& value);
+    // Запись по ключу с наименьшей точностью не ниже minPrecision; в precision - её точность
+    bool getAtLeast(const std::string& key, int minPrecision, BigNumber& value, int& precision);
+    void put(const std::string& key, int precision, const BigNumber& value);
+    void clear();
+
+    void setMaxBytes(std::size_t newMaxBytes);
+    std::size_t getMaxBytes() const;
+    Stats getStats() const;
+    const std::string& getPath() const { return path; }
+
+private:
+    struct Mapping;  // отображение файла в память (зависит от платформы)
+
+    struct Slot {
+        std::size_t offset;   // начало записи в файле
+        std::size_t size;     // полный размер записи
+        std::uint64_t lastUse;
+    };
+
+    PersistentCache(const std::string& path, std::size_t maxBytes);
+    void load();
+    void remap();
+    void rewrite(std::size_t budget);  // переписать файл, оставив свежие записи в пределах budget
+    bool reset();                      // пустой файл с заголовком; false - не удалось записать
+    bool readSlot(const Slot& slot, BigNumber& value) const;
+
+    const std::string path;
+    mutable std::mutex mutex;
+    std::unique_ptr<Mapping> mapping;
+    std::unordered_map<std::string, std::map<int, Slot>> index;  // ключ -> точность -> запись
+    std::size_t fileBytes = 0;
+    std::size_t maxBytes;
+    std::uint64_t tick = 0;
+    std::uint64_t hits = 0;
+    std::uint64_t misses = 0;
+    std::uint64_t evictions = 0;
+};
+
+// Скомпилированное выражение: программа в обратной польской записи для стековой машины.
+// Не зависит от точности - она берётся у Calculator в момент вычисления.
+class CompiledExpression {
+public:
+    // Числовые значения кодов - часть C API (get_compiled_code), порядок не менять
+    enum OpCode {
+        PUSH_CONST,  // operand - индекс в constants
+        PUSH_VAR,    // operand - индекс в variables
+        PUSH_PI,
+        PUSH_E,
+        ADD, SUB, MUL, DIV, POW,
+        NEG, FACTORIAL,
+        SIN, COS, TAN, LN, LOG, EXP, SQRT
+    };
+
+    struct Instruction {
+        OpCode op;
+        int operand;
+    };
+
+    const std::string& getSource() const { return source; }
+    const std::vector<std::string>& getVariables() const { return variables; }
+    const std::vector<Instruction>& getCode() const { return code; }
+    const std::vector<BigNumber>& getConstants() const { return constants; }
+    int variableIndex(const std::string& name) const;  // -1, если переменной нет
+
+private:
+    friend class Calculator;
+
+    std::string source;
+    std::vector<Instruction> code;
+    std::vector<BigNumber> constants;
+    std::vector<std::string> variables;  // в порядке первого появления в выражении
+};
+
+// Потокобезопасен: точность читается один раз в начале вызова и дальше передаётся
+// явно, кэш результатов сегментирован. Один Calculator можно использовать из многих потоков.
+class Calculator {
+private:
+    class Logger* logger;
+    std::atomic<int> precision;
+
+    // Профиль всех вычислений калькулятора; вычисление сливает сюда свой профиль потока
+    mutable std::mutex statsMutex;
+    OperationProfile stats;
+
+    // Кэш для хранения результатов вычислений
+    typedef ResultCache::Key CacheKey;
+    ResultCache cache;
+
+    // Необязательный постоянный кэш на диске (за mutex: включается во время вычислений)
+    mutable std::mutex persistentMutex;
+    std::shared_ptr<PersistentCache> persistent;
 
 public:
     Calculator(Logger* logger = nullptr, int precision = 50);
@@ -142,21 +478,48 @@ public:
     int getPrecision() const { return precision; }
 
     BigNumber evaluate(const std::string& expression);
+    BigNumber evaluate(const std::string& expression, int precision);  // точность только для этого вызова
+
+    // Разбор один раз, затем многократное вычисление с разными значениями переменных.
+    // bindings - значения в порядке CompiledExpression::getVariables().
+    CompiledExpression compile(const std::string& expression);
+    BigNumber evaluate(const CompiledExpression& compiled, const std::vector<BigNumber>& bindings);
+    BigNumber evaluate(const CompiledExpression& compiled, const std::vector<BigNumber>& bindings, int precision);
     void clearCache() { cache.clear(); } // Новый метод для очистки кэша
+    void setCacheLimit(std::size_t maxBytes) { cache.setMaxBytes(maxBytes); }
+    std::size_t getCacheLimit() const { return cache.getMaxBytes(); }
+    ResultCache::Stats getCacheStats() const { return cache.getStats(); }
+    OperationProfile getStats() const;
+    void resetStats();
+
+    // Постоянный кэш: результаты (в том числе выражений в скобках) и константы, которые
+    // считались дольше PersistentCache::MIN_COMPUTE_MS, сохраняются в файл path и
+    // переживают перезапуск процесса. Бросает std::runtime_error.
+    void enablePersistentCache(const std::string& path, std::size_t maxBytes = PersistentCache::DEFAULT_MAX_BYTES);
+    void disablePersistentCache();
+    std::shared_ptr<PersistentCache> getPersistentCache() const;
 
 private:
     std::vector<std::string> tokenize(const std::string& expression);
-    BigNumber parseExpression(const std::vector<std::string>& tokens, size_t& index);
-    BigNumber parseTerm(const std::vector<std::string>& tokens, size_t& index);
-    BigNumber parseFactor(const std::vector<std::string>& tokens, size_t& index);
-    BigNumber parseNumber(const std::vector<std::string>& tokens, size_t& index);
-    BigNumber parseFunction(const std::string& funcName, const std::vector<std::string>& tokens, size_t& index);
+    BigNumber parseExpression(const std::vector<std::string>& tokens, size_t& index, int precision);
+    BigNumber parseTerm(const std::vector<std::string>& tokens, size_t& index, int precision);
+    BigNumber parseFactor(const std::vector<std::string>& tokens, size_t& index, int precision);
+    BigNumber parseNumber(const std::vector<std::string>& tokens, size_t& index, int precision);
+    BigNumber parseFunction(const std::string& funcName, const std::vector<std::string>& tokens, size_t& index, int precision);
+
+    // Компиляция в CompiledExpression (та же грамматика, что и у parse*)
+    void compileExpression(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out);
+    void compileTerm(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out);
+    void compileFactor(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out);
+    void compilePrimary(const std::vector<std::string>& tokens, size_t& index, CompiledExpression& out);
 
     // Вспомогательные методы для кэширования
-    BigNumber evaluateWithCache(const std::string& expression, const std::vector<std::string>& tokens, size_t start, size_t end);
+    BigNumber evaluateWithCache(const std::vector<std::string>& tokens, size_t start, size_t end, int precision);
     std::string getSubExpression(const std::vector<std::string>& tokens, size_t start, size_t end);
 
     void log(const std::string& level, const std::string& message);
+    // Есть ли смысл собирать сообщение: логгер задан и уровень не отфильтрован
+    bool logEnabled(int level) const { return logger && logger->isEnabled(level); }
 };
 
 // C interface
@@ -164,10 +527,80 @@ extern "C" {
     __declspec(dllexport) Calculator* create_calculator_with_precision(int precision);
     __declspec(dllexport) Calculator* create_calculator();
     __declspec(dllexport) char* calculate_expression(Calculator* calc, const char* expression);
+    // То же с точностью только для этого вызова (настройка калькулятора не меняется)
+    __declspec(dllexport) char* calculate_expression_with_precision(Calculator* calc, const char* expression, int precision);
+
+    // Коды результата calculate_expression_ex
+    enum CalculationStatus { CALC_OK = 0, CALC_ERROR = 1, CALC_TIMEOUT = 2, CALC_CANCELLED = 3, CALC_BUFFER_TOO_SMALL = 4 };
+
+    // Вычисление со сроком и отменой. precision < 0 - точность калькулятора, timeout_ms <= 0 - без срока,
+    // token может быть nullptr. В *result - текст результата или ошибки (освобождать free_result).
+    __declspec(dllexport) int calculate_expression_ex(Calculator* calc, const char* expression, int precision,
+        int timeout_ms, CancellationToken* token, char** result);
+    // Результат без выделения памяти на стороне вызывающего:
+    // _into пишет текст (с '\0') в буфер вызывающего; *length - длина текста без '\0'.
+    // Если буфер мал - CALC_BUFFER_TOO_SMALL, в *length нужная длина, а результат остаётся
+    // в буфере потока, и повторный вызов с тем же выражением его не пересчитывает.
+    __declspec(dllexport) int calculate_expression_into(Calculator* calc, const char* expression, int precision,
+        char* buffer, size_t capacity, size_t* length);
+    // _view отдаёт указатель на буфер текущего потока: данные действительны до следующего
+    // вызова calculate_expression_view/_into в этом потоке. Освобождать не нужно.
+    __declspec(dllexport) int calculate_expression_view(Calculator* calc, const char* expression, int precision,
+        const char** data, size_t* length);
+    __declspec(dllexport) CancellationToken* create_cancellation_token();
+    __declspec(dllexport) void cancel_cancellation_token(CancellationToken* token);
+    __declspec(dllexport) void reset_cancellation_token(CancellationToken* token);
+    __declspec(dllexport) void delete_cancellation_token(CancellationToken* token);
+    // Пакетное вычисление: один буфер со всеми результатами (освобождать free_result).
+    // Результат i - строка с '\0' по смещению offsets[i]; offsets имеет count + 1 элементов,
+    // offsets[count] - полный размер буфера. statuses[i] - CalculationStatus (0 - успех, иначе в строке текст ошибки).
+    __declspec(dllexport) char* calculate_batch(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets);
+    // То же, выражения считаются параллельно в общем пуле потоков.
+    // threads - максимум потоков на этот вызов (0 - все ядра).
+    __declspec(dllexport) char* calculate_batch_parallel(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets, int threads);
+    // Пакет со сроком и отменой: threads как у calculate_batch_parallel (1 - в вызывающем потоке),
+    // timeout_ms <= 0 - без срока (общий на весь пакет), token может быть nullptr. После отмены или
+    // истечения срока оставшиеся выражения не считаются и получают CALC_CANCELLED/CALC_TIMEOUT.
+    __declspec(dllexport) char* calculate_batch_ex(Calculator* calc, const char** expressions, size_t count,
+        int* statuses, size_t* offsets, int threads, int timeout_ms, CancellationToken* token);
     __declspec(dllexport) void delete_calculator(Calculator* calc);
     __declspec(dllexport) void free_result(char* result);
+    // Скомпилированные выражения с переменными. При ошибке compile_expression возвращает nullptr,
+    // а в *error (если не nullptr) - текст ошибки, который нужно освободить free_result.
+    __declspec(dllexport) CompiledExpression* compile_expression(Calculator* calc, const char* expression, char** error);
+    __declspec(dllexport) int get_compiled_variable_count(CompiledExpression* compiled);
+    __declspec(dllexport) const char* get_compiled_variable_name(CompiledExpression* compiled, int index);
+    // values - значения переменных строками, в порядке get_compiled_variable_name; результат как у calculate_expression
+    __declspec(dllexport) char* eval_compiled(Calculator* calc, CompiledExpression* compiled, const char** values, size_t count);
+    // Программа для вычисления вне BigNumber (например, векторно в float64).
+    // Возвращают полное количество элементов; заполняют не более capacity.
+    __declspec(dllexport) int get_compiled_code(CompiledExpression* compiled, int* ops, int* operands, int capacity);
+    __declspec(dllexport) int get_compiled_constants(CompiledExpression* compiled, double* values, int capacity);
+    __declspec(dllexport) void delete_compiled_expression(CompiledExpression* compiled);
     __declspec(dllexport) void set_calculator_precision(Calculator* calc, int precision);
     __declspec(dllexport) int get_calculator_precision(Calculator* calc);
+    __declspec(dllexport) void set_calculator_cache_limit(Calculator* calc, size_t max_bytes);
+    __declspec(dllexport) size_t get_calculator_cache_limit(Calculator* calc);
+    __declspec(dllexport) void clear_calculator_cache(Calculator* calc);
+    // Сброс общего для всех калькуляторов кэша констант π, e, ln2, ln10
+    __declspec(dllexport) void clear_constants_cache();
+    __declspec(dllexport) void get_calculator_cache_stats(Calculator* calc, unsigned long long* hits, unsigned long long* misses,
+        unsigned long long* evictions, unsigned long long* bytes, unsigned long long* entries);
+    // Профиль вычислений: в buf пишется не более capacity значений, возвращается их полное число.
+    // Раскладка: для каждой OperationProfile::Operation по порядку - calls, nanoseconds, limbs;
+    // затем peak_limbs, peak_heap_bytes. Новые значения добавляются только в конец.
+    __declspec(dllexport) int get_calculator_stats(Calculator* calc, unsigned long long* buf, int capacity);
+    __declspec(dllexport) void reset_calculator_stats(Calculator* calc);
+    // Постоянный кэш на диске (результаты и константы). enable возвращает CALC_OK или CALC_ERROR,
+    // текст ошибки - в *error (если не nullptr), освобождать free_result.
+    __declspec(dllexport) int enable_persistent_cache(Calculator* calc, const char* path, size_t max_bytes, char** error);
+    __declspec(dllexport) void disable_persistent_cache(Calculator* calc);
+    __declspec(dllexport) void clear_persistent_cache(Calculator* calc);
+    __declspec(dllexport) void get_persistent_cache_stats(Calculator* calc, unsigned long long* hits, unsigned long long* misses,
+        unsigned long long* evictions, unsigned long long* bytes, unsigned long long* entries);
+    __declspec(dllexport) void set_multiply_thresholds(int karatsuba, int toom3, int ntt);
 }
 
 #endif
\ No newline at end of file
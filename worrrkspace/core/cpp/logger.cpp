@@ -3,43 +3,605 @@
 #include <chrono>
 #include <sstream>
 #include <iomanip>
+#include <cstring>
+#include <algorithm>
+#include <cctype>
+#include <tuple>
+#include <filesystem>
+#include <vector>
+#include <sys/stat.h>
+#ifndef NOMINMAX
+#define NOMINMAX  // иначе макросы min/max из windows.h ломают std::max
+#endif
 #include <windows.h>  // Добавляем для работы с кодировкой
 
+#ifdef LOGGER_WITH_ZLIB
+#include <zlib.h>
+#endif
+#ifdef LOGGER_WITH_ZSTD
+#include <zstd.h>
+#endif
+
+namespace {
+
+std::tm localTime(std::time_t time) {
+    std::tm local{};
+#ifdef _WIN32
+    localtime_s(&local, &time);
+#else
+    localtime_r(&time, &local);
+#endif
+    return local;
+}
+
+// Первая полночь (по местному времени) после time
+std::time_t nextMidnight(std::time_t time) {
+    std::tm local = localTime(time);
+    local.tm_hour = 0;
+    local.tm_min = 0;
+    local.tm_sec = 0;
+    local.tm_mday += 1;
+    local.tm_isdst = -1;
+    return std::mktime(&local);
+}
+
+// Разбирает имя ротированного файла <prefix><ГГГГ-ММ-ДД>.<N>[.gz|.zst]; false - чужой файл
+bool parseArchiveName(const std::string& name, const std::string& prefix, std::string& date, long long& index) {
+    std::size_t dot = prefix.size() + 10;
+    if (name.size() < dot + 2 || name.compare(0, prefix.size(), prefix) != 0 || name[dot] != '.') return false;
+    date = name.substr(prefix.size(), 10);
+    if (date[4] != '-' || date[7] != '-') return false;
+
+    std::size_t end = dot + 1;
+    while (end < name.size() && std::isdigit((unsigned char)name[end])) end++;
+    if (end == dot + 1 || end - dot > 10) return false;
+    std::string extension = name.substr(end);
+    if (!extension.empty() && extension != ".gz" && extension != ".zst") return false;
+    index = std::stoll(name.substr(dot + 1, end - dot - 1));
+    return true;
+}
+
+#ifdef LOGGER_WITH_ZLIB
+bool gzipFile(const std::string& source, const std::string& target) {
+    std::ifstream in(source, std::ios::binary);
+    if (!in) return false;
+    gzFile out = gzopen(target.c_str(), "wb6");
+    if (!out) return false;
+
+    std::vector<char> buffer(1 << 16);
+    bool ok = true;
+    while (ok && in) {
+        in.read(buffer.data(), (std::streamsize)buffer.size());
+        int count = (int)in.gcount();
+        if (count > 0 && gzwrite(out, buffer.data(), (unsigned)count) != count) ok = false;
+    }
+    return gzclose(out) == Z_OK && ok;
+}
+#endif
+
+#ifdef LOGGER_WITH_ZSTD
+bool zstdFile(const std::string& source, const std::string& target) {
+    std::ifstream in(source, std::ios::binary);
+    std::ofstream out(target, std::ios::binary);
+    if (!in || !out) return false;
+
+    ZSTD_CCtx* context = ZSTD_createCCtx();
+    if (!context) return false;
+    ZSTD_CCtx_setParameter(context, ZSTD_c_compressionLevel, 3);
+
+    std::vector<char> input(ZSTD_CStreamInSize());
+    std::vector<char> output(ZSTD_CStreamOutSize());
+    bool ok = true;
+    for (bool last = false; ok && !last;) {
+        in.read(input.data(), (std::streamsize)input.size());
+        std::size_t count = (std::size_t)in.gcount();
+        last = count < input.size();
+        ZSTD_inBuffer chunk = { input.data(), count, 0 };
+        ZSTD_EndDirective mode = last ? ZSTD_e_end : ZSTD_e_continue;
+        for (bool finished = false; !finished;) {
+            ZSTD_outBuffer compressed = { output.data(), output.size(), 0 };
+            std::size_t remaining = ZSTD_compressStream2(context, &compressed, &chunk, mode);
+            if (ZSTD_isError(remaining)) {
+                ok = false;
+                break;
+            }
+            out.write(output.data(), (std::streamsize)compressed.pos);
+            finished = last ? remaining == 0 : chunk.pos == chunk.size;
+        }
+    }
+    ZSTD_freeCCtx(context);
+    out.close();
+    return ok && !out.fail();
+}
+#endif
+
+}  // namespace
+
 Logger::Logger(const std::string& filename) : filename(filename) {
+    openFile();
+}
+
+Logger::Logger(const std::string& filename, const AsyncOptions& options)
+    : filename(filename), async(true), options(options) {
+    openFile();
+
+    std::size_t capacity = 2;
+    while (capacity < options.capacity) capacity <<= 1;
+    slots.reset(new Slot[capacity]);
+    for (std::size_t i = 0; i < capacity; i++) {
+        slots[i].sequence.store(i, std::memory_order_relaxed);
+    }
+    mask = capacity - 1;
+    if (this->options.flushIntervalMs <= 0) this->options.flushIntervalMs = AsyncOptions().flushIntervalMs;
+    if (this->options.flushBytes == 0) this->options.flushBytes = AsyncOptions().flushBytes;
+
+    writer = std::thread(&Logger::writerLoop, this);
+}
+
+void Logger::openFile() {
     // Создаем папку logs
-    system("mkdir logs 2>nul");
+    std::error_code error;
+    std::filesystem::create_directories("logs", error);
 
     // Устанавливаем кодировку консоли для Windows
     SetConsoleOutputCP(CP_UTF8);
 
-    logfile.open("logs/" + filename, std::ios::app);
+    std::string path = "logs/" + filename;
+    logfile.open(path, std::ios::app);
     if (!logfile.is_open()) {
-        throw std::runtime_error("Cannot open log file: logs/" + filename);
+        throw std::runtime_error("Cannot open log file: " + path);
+    }
+
+    // Дописываем в существующий файл: его размер и дата последней записи - начало периода ротации
+    std::uintmax_t size = std::filesystem::file_size(path, error);
+    fileBytes = error ? 0 : (std::uint64_t)size;
+    struct stat info;
+    periodStart = fileBytes > 0 && stat(path.c_str(), &info) == 0 ? info.st_mtime : std::time(nullptr);
+    nextDayStart = nextMidnight(periodStart);
+}
+
+// Пишет в текущий файл, предварительно ротируя его при необходимости; вызывается под mutex
+void Logger::writeFile(const char* data, std::size_t size) {
+    if (rotation.maxBytes > 0 || rotation.daily) {
+        std::time_t now = std::time(nullptr);
+        if (fileBytes == 0) {
+            // Пустой файл начинается с первой записи в него
+            periodStart = now;
+            nextDayStart = nextMidnight(now);
+        }
+        else if (rotation.daily && now >= nextDayStart) {
+            rotate(now);
+        }
+
+        // Пачка (поток записи, logBatch) делится по строкам: файл ротируется перед строкой,
+        // с которой он превысил бы maxBytes. Строка длиннее maxBytes пишется целиком в новый файл.
+        while (rotation.maxBytes > 0 && fileBytes + size > rotation.maxBytes) {
+            std::size_t fits = 0;
+            if (fileBytes < rotation.maxBytes) {
+                for (std::size_t i = (std::size_t)(rotation.maxBytes - fileBytes); i > 0; i--) {
+                    if (data[i - 1] == '\n') {
+                        fits = i;
+                        break;
+                    }
+                }
+            }
+            if (fits == 0 && fileBytes == 0) {
+                const char* end = (const char*)std::memchr(data, '\n', size);
+                fits = end ? (std::size_t)(end - data) + 1 : size;
+            }
+            logfile.write(data, (std::streamsize)fits);
+            fileBytes += fits;
+            data += fits;
+            size -= fits;
+            if (size == 0) return;
+            rotate(now);
+        }
+    }
+    logfile.write(data, (std::streamsize)size);
+    fileBytes += size;
+}
+
+// Ротация - только переименование и повторное открытие файла; сжатие и удаление старых
+// файлов уходят в фоновый поток, запись в лог на них не ждёт
+void Logger::rotate(std::time_t now) {
+    std::string path = "logs/" + filename;
+    std::string target = archivePath();
+    logfile.close();
+    std::error_code error;
+    std::filesystem::rename(path, target, error);
+    logfile.clear();
+    logfile.open(path, std::ios::app);
+
+    // Не удалось переименовать (файл занят) - продолжаем писать в тот же файл
+    // и пробуем снова через maxBytes или на следующий день
+    fileBytes = 0;
+    periodStart = now;
+    nextDayStart = nextMidnight(now);
+    if (error) return;
+
+    if (rotation.compression == COMPRESSION_NONE && rotation.retention <= 0) return;
+    {
+        std::lock_guard<std::mutex> lock(archiveMutex);
+        archiveQueue.push_back({ target, rotation.compression, rotation.retention });
+        if (!archiver.joinable()) archiver = std::thread(&Logger::archiverLoop, this);
     }
+    archiveWake.notify_one();
+}
+
+// logs/<filename>.<дата начала файла>.<N>; N растёт в пределах даты и не переиспользуется
+// после удаления старых файлов, поэтому (дата, N) упорядочивает архивы по времени
+std::string Logger::archivePath() {
+    std::tm local = localTime(periodStart);
+    char date[16];
+    std::strftime(date, sizeof(date), "%Y-%m-%d", &local);
+    std::string prefix = filename + ".";
+    if (archiveDate != date) {
+        // Первая ротация за дату: продолжаем нумерацию уже лежащих в logs файлов
+        archiveDate = date;
+        archiveIndex = 0;
+        std::error_code error;
+        std::string entryDate;
+        long long index;
+        for (const auto& entry : std::filesystem::directory_iterator("logs", error)) {
+            if (parseArchiveName(entry.path().filename().string(), prefix, entryDate, index) && entryDate == archiveDate) {
+                archiveIndex = std::max(archiveIndex, index);
+            }
+        }
+    }
+    return "logs/" + prefix + archiveDate + "." + std::to_string(++archiveIndex);
+}
+
+void Logger::archiverLoop() {
+    for (;;) {
+        ArchiveJob job;
+        {
+            std::unique_lock<std::mutex> lock(archiveMutex);
+            archiveWake.wait(lock, [this] { return archiveStopping || !archiveQueue.empty(); });
+            // При остановке очередь дорабатывается: несжатые файлы не остаются
+            if (archiveQueue.empty()) return;
+            job = archiveQueue.front();
+            archiveQueue.pop_front();
+        }
+        archive(job, "logs", filename + ".");
+    }
+}
+
+// Сжимает ротированный файл и удаляет самые старые файлы сверх retention
+void Logger::archive(const ArchiveJob& job, const std::string& directory, const std::string& prefix) {
+    std::string extension = job.compression == COMPRESSION_GZIP ? ".gz" : job.compression == COMPRESSION_ZSTD ? ".zst" : "";
+    if (!extension.empty()) {
+        std::string temporary = job.path + extension + ".tmp";
+        bool compressed = false;
+#ifdef LOGGER_WITH_ZLIB
+        if (job.compression == COMPRESSION_GZIP) compressed = gzipFile(job.path, temporary);
+#endif
+#ifdef LOGGER_WITH_ZSTD
+        if (job.compression == COMPRESSION_ZSTD) compressed = zstdFile(job.path, temporary);
+#endif
+        std::error_code error;
+        if (compressed) {
+            std::filesystem::rename(temporary, job.path + extension, error);
+            if (!error) std::filesystem::remove(job.path, error);
+        }
+        else {
+            std::filesystem::remove(temporary, error);  // остаётся несжатый файл
+        }
+    }
+
+    if (job.retention <= 0) return;
+    std::vector<std::tuple<std::string, long long, std::filesystem::path>> archives;
+    std::error_code error;
+    std::string date;
+    long long index;
+    for (const auto& entry : std::filesystem::directory_iterator(directory, error)) {
+        if (parseArchiveName(entry.path().filename().string(), prefix, date, index)) {
+            archives.emplace_back(date, index, entry.path());
+        }
+    }
+    if ((int)archives.size() <= job.retention) return;
+    std::sort(archives.begin(), archives.end());
+    for (std::size_t i = 0; i + job.retention < archives.size(); i++) {
+        std::filesystem::remove(std::get<2>(archives[i]), error);
+    }
+}
+
+bool Logger::compressionSupported(int compression) {
+    switch (compression) {
+    case COMPRESSION_NONE:
+        return true;
+#ifdef LOGGER_WITH_ZLIB
+    case COMPRESSION_GZIP:
+        return true;
+#endif
+#ifdef LOGGER_WITH_ZSTD
+    case COMPRESSION_ZSTD:
+        return true;
+#endif
+    default:
+        return false;
+    }
+}
+
+bool Logger::setRotation(const RotationOptions& settings) {
+    if (!compressionSupported(settings.compression)) return false;
+    std::lock_guard<std::mutex> lock(mutex);
+    rotation = settings;
+    return true;
+}
+
+int Logger::levelFromName(const char* name) {
+    if (std::strcmp(name, "DEBUG") == 0) return LEVEL_DEBUG;
+    if (std::strcmp(name, "INFO") == 0) return LEVEL_INFO;
+    if (std::strcmp(name, "WARNING") == 0) return LEVEL_WARNING;
+    if (std::strcmp(name, "ERROR") == 0) return LEVEL_ERROR;
+    return LEVEL_CRITICAL;
 }
 
 void Logger::log(const std::string& level, const std::string& message) {
-    std::string timestamp = getCurrentTime();
-    logfile << "[" << timestamp << "] [" << level << "] " << message << std::endl;
+    if (!isEnabled(levelFromName(level.c_str()))) return;
+
+    if (!async) {
+        std::string line = "[" + getCurrentTime() + "] [" + level + "] " + message + "\n";
+        std::lock_guard<std::mutex> lock(mutex);
+        writeFile(line.data(), line.size());
+        logfile.flush();
 
-    // Вывод в консоль с правильной кодировкой
-    std::cout << "[" << timestamp << "] [" << level << "] " << message << std::endl;
+        // Вывод в консоль с правильной кодировкой
+        std::cout << line << std::flush;
+        written.fetch_add(1, std::memory_order_relaxed);
+        return;
+    }
+
+    // Время фиксируется при вызове, форматируется потоком записи
+    enqueue(level.data(), level.size(), message.data(), message.size(), std::chrono::system_clock::now());
 }
 
-// ЗАМЕНИТЕ функцию getCurrentTime на:
-std::string Logger::getCurrentTime() {
+void Logger::logBatch(std::size_t count, const char* const* levels, const char* const* messages) {
+    if (!async) {
+        std::string timestamp = getCurrentTime();
+        std::string batch;
+        std::size_t accepted = 0;
+        for (std::size_t i = 0; i < count; i++) {
+            if (!levels[i] || !messages[i] || !isEnabled(levelFromName(levels[i]))) continue;
+            batch += "[" + timestamp + "] [";
+            batch += levels[i];
+            batch += "] ";
+            batch += messages[i];
+            batch += '\n';
+            accepted++;
+        }
+        if (batch.empty()) return;
+
+        std::lock_guard<std::mutex> lock(mutex);
+        writeFile(batch.data(), batch.size());
+        logfile.flush();
+        std::cout.write(batch.data(), (std::streamsize)batch.size());
+        std::cout.flush();
+        written.fetch_add(accepted, std::memory_order_relaxed);
+        return;
+    }
+
     auto now = std::chrono::system_clock::now();
-    auto time_t = std::chrono::system_clock::to_time_t(now);
+    for (std::size_t i = 0; i < count; i++) {
+        if (!levels[i] || !messages[i] || !isEnabled(levelFromName(levels[i]))) continue;
+        enqueue(levels[i], std::strlen(levels[i]), messages[i], std::strlen(messages[i]), now);
+    }
+}
+
+void Logger::enqueue(const char* level, std::size_t levelLength, const char* message, std::size_t messageLength,
+    std::chrono::system_clock::time_point time) {
+    if (tryEnqueue(level, levelLength, message, messageLength, time)) return;
 
+    if (options.overflow != OVERFLOW_BLOCK) {
+        dropped.fetch_add(1, std::memory_order_relaxed);
+        return;
+    }
+
+    blocked.fetch_add(1, std::memory_order_relaxed);
+    wakeWriter();
+    for (int spins = 0; !tryEnqueue(level, levelLength, message, messageLength, time); spins++) {
+        if (spins < 64) std::this_thread::yield();
+        else std::this_thread::sleep_for(std::chrono::microseconds(100));
+    }
+}
+
+// Ограниченная MPSC очередь Вьюкова: производители занимают позицию одним CAS,
+// заполняют слот и публикуют его через sequence; блокировок на пути log() нет
+bool Logger::tryEnqueue(const char* level, std::size_t levelLength, const char* message, std::size_t messageLength,
+    std::chrono::system_clock::time_point time) {
+    std::size_t pos = enqueuePos.load(std::memory_order_relaxed);
+    Slot* slot;
+    for (;;) {
+        slot = &slots[pos & mask];
+        std::size_t sequence = slot->sequence.load(std::memory_order_acquire);
+        std::ptrdiff_t diff = (std::ptrdiff_t)sequence - (std::ptrdiff_t)pos;
+        if (diff == 0) {
+            if (enqueuePos.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) break;
+        }
+        else if (diff < 0) {
+            return false;  // очередь заполнена
+        }
+        else {
+            pos = enqueuePos.load(std::memory_order_relaxed);
+        }
+    }
+
+    slot->time = time;
+    try {
+        slot->level.assign(level, levelLength);
+        slot->message.assign(message, messageLength);
+    }
+    catch (...) {
+        // Занятый слот нужно опубликовать в любом случае, иначе поток записи встанет на нём
+        slot->message.clear();
+    }
+    slot->sequence.store(pos + 1, std::memory_order_release);
+
+    // Будим поток записи, только когда очередь заполнилась наполовину, - в обычном
+    // режиме он просыпается сам раз в flushIntervalMs, и log() обходится без системных вызовов
+    if (pos + 1 - dequeuePos.load(std::memory_order_relaxed) == (mask + 1) / 2) {
+        wakeWriter();
+    }
+    return true;
+}
+
+void Logger::wakeWriter() {
+    {
+        std::lock_guard<std::mutex> lock(writerMutex);
+        wakeRequested = true;
+    }
+    writerWake.notify_one();
+}
+
+// Переносит опубликованные сообщения из очереди в batch; возвращает их количество
+std::size_t Logger::drain(std::string& batch, std::time_t& cachedSecond, std::string& cachedTime) {
+    std::size_t count = 0;
+    std::size_t pos = dequeuePos.load(std::memory_order_relaxed);
+    while (batch.size() < options.flushBytes) {
+        Slot& slot = slots[pos & mask];
+        if (slot.sequence.load(std::memory_order_acquire) != pos + 1) break;
+
+        std::time_t second = std::chrono::system_clock::to_time_t(slot.time);
+        if (second != cachedSecond) {
+            cachedSecond = second;
+            cachedTime = formatTime(second);
+        }
+        batch += '[';
+        batch += cachedTime;
+        batch += "] [";
+        batch += slot.level;
+        batch += "] ";
+        batch += slot.message;
+        batch += '\n';
+
+        slot.sequence.store(pos + mask + 1, std::memory_order_release);
+        pos++;
+        count++;
+    }
+    dequeuePos.store(pos, std::memory_order_release);
+
+    if (options.overflow == OVERFLOW_COUNT) {
+        std::uint64_t lost = dropped.load(std::memory_order_relaxed);
+        if (lost > reportedDrops) {
+            batch += "[" + getCurrentTime() + "] [WARNING] Logger: " + std::to_string(lost - reportedDrops) +
+                " message(s) dropped, queue is full\n";
+            reportedDrops = lost;
+        }
+    }
+    return count;
+}
+
+void Logger::writerLoop() {
+    const std::chrono::steady_clock::duration interval = std::chrono::milliseconds(options.flushIntervalMs);
+    std::string batch;
+    batch.reserve(options.flushBytes + 1024);
+    std::size_t batchCount = 0;
+    std::time_t cachedSecond = -1;
+    std::string cachedTime;
+    auto lastFlush = std::chrono::steady_clock::now();
+
+    for (;;) {
+        std::size_t drained = drain(batch, cachedSecond, cachedTime);
+        batchCount += drained;
+
+        bool urgent;
+        {
+            std::lock_guard<std::mutex> lock(writerMutex);
+            urgent = flushRequested || stopping;
+        }
+        auto now = std::chrono::steady_clock::now();
+        if (!batch.empty() && (urgent || batch.size() >= options.flushBytes || now - lastFlush >= interval)) {
+            {
+                std::lock_guard<std::mutex> fileLock(mutex);
+                writeFile(batch.data(), batch.size());
+                logfile.flush();
+            }
+            if (options.console) {
+                std::cout.write(batch.data(), (std::streamsize)batch.size());
+                std::cout.flush();
+            }
+            written.fetch_add(batchCount, std::memory_order_relaxed);
+            batch.clear();
+            batchCount = 0;
+            lastFlush = now;
+        }
+
+        std::unique_lock<std::mutex> lock(writerMutex);
+        bool caughtUp = dequeuePos.load(std::memory_order_relaxed) == enqueuePos.load(std::memory_order_acquire);
+        if (batch.empty()) {
+            writtenPos = dequeuePos.load(std::memory_order_relaxed);
+            if (caughtUp) flushRequested = false;
+            flushed.notify_all();
+            if (stopping && caughtUp) break;
+        }
+        if (drained > 0) continue;
+        if (flushRequested || stopping) {
+            // Позиция занята производителем, но ещё не опубликована - ждём её
+            lock.unlock();
+            std::this_thread::yield();
+            continue;
+        }
+
+        std::chrono::steady_clock::duration timeout = interval;
+        if (!batch.empty() && now - lastFlush < interval) timeout = interval - (now - lastFlush);
+        writerWake.wait_for(lock, timeout, [this] { return wakeRequested || flushRequested || stopping; });
+        wakeRequested = false;
+    }
+}
+
+void Logger::flush() {
+    if (!async) {
+        std::lock_guard<std::mutex> lock(mutex);
+        logfile.flush();
+        return;
+    }
+
+    std::size_t target = enqueuePos.load(std::memory_order_acquire);
+    std::unique_lock<std::mutex> lock(writerMutex);
+    flushRequested = true;
+    writerWake.notify_one();
+    flushed.wait(lock, [&] { return writtenPos >= target; });
+}
+
+Logger::Stats Logger::getStats() const {
+    Stats stats;
+    stats.written = written.load(std::memory_order_relaxed);
+    stats.dropped = dropped.load(std::memory_order_relaxed);
+    stats.blocked = blocked.load(std::memory_order_relaxed);
+    return stats;
+}
+
+std::string Logger::formatTime(std::time_t time) {
+    std::tm local = localTime(time);
     std::stringstream ss;
-    ss << std::put_time(std::localtime(&time_t), "%Y-%m-%d %H:%M:%S");
+    ss << std::put_time(&local, "%Y-%m-%d %H:%M:%S");
     return ss.str();
 }
 
+std::string Logger::getCurrentTime() {
+    return formatTime(std::chrono::system_clock::to_time_t(std::chrono::system_clock::now()));
+}
+
 Logger::~Logger() {
+    if (writer.joinable()) {
+        {
+            std::lock_guard<std::mutex> lock(writerMutex);
+            stopping = true;
+        }
+        writerWake.notify_one();
+        writer.join();  // поток записи дописывает очередь перед выходом
+    }
     if (logfile.is_open()) {
         logfile.close();
     }
+    if (archiver.joinable()) {
+        {
+            std::lock_guard<std::mutex> lock(archiveMutex);
+            archiveStopping = true;
+        }
+        archiveWake.notify_one();
+        archiver.join();  // дожимаем уже ротированные файлы
+    }
 }
 
 // C интерфейс
@@ -53,15 +615,83 @@ extern "C" {
         }
     }
 
+    __declspec(dllexport) Logger* create_async_logger(const char* filename, int capacity, int flush_bytes,
+        int flush_interval_ms, int overflow, int console) {
+        Logger::AsyncOptions options;
+        if (capacity > 0) options.capacity = (std::size_t)capacity;
+        if (flush_bytes > 0) options.flushBytes = (std::size_t)flush_bytes;
+        if (flush_interval_ms > 0) options.flushIntervalMs = flush_interval_ms;
+        if (overflow >= Logger::OVERFLOW_BLOCK && overflow <= Logger::OVERFLOW_COUNT) {
+            options.overflow = (Logger::OverflowPolicy)overflow;
+        }
+        options.console = console != 0;
+        try {
+            return new Logger(filename, options);
+        }
+        catch (...) {
+            return nullptr;
+        }
+    }
+
     __declspec(dllexport) void logger_log(Logger* logger, const char* level, const char* message) {
         if (logger) {
             logger->log(level, message);
         }
     }
 
+    __declspec(dllexport) void logger_log_batch(Logger* logger, int count, const char** levels, const char** messages) {
+        if (logger && count > 0 && levels && messages) {
+            logger->logBatch((std::size_t)count, levels, messages);
+        }
+    }
+
+    __declspec(dllexport) void logger_set_level(Logger* logger, int level) {
+        if (logger) {
+            logger->setLevel(level);
+        }
+    }
+
+    __declspec(dllexport) int logger_get_level(Logger* logger) {
+        return logger ? logger->getLevel() : Logger::LEVEL_DEBUG;
+    }
+
+    __declspec(dllexport) int logger_is_enabled(Logger* logger, int level) {
+        return logger && logger->isEnabled(level) ? 1 : 0;
+    }
+
+    __declspec(dllexport) void logger_flush(Logger* logger) {
+        if (logger) {
+            logger->flush();
+        }
+    }
+
+    __declspec(dllexport) int logger_set_rotation(Logger* logger, unsigned long long max_bytes, int daily,
+        int retention, int compression) {
+        if (!logger) return 0;
+        Logger::RotationOptions rotation;
+        rotation.maxBytes = max_bytes;
+        rotation.daily = daily != 0;
+        rotation.retention = retention > 0 ? retention : 0;
+        rotation.compression = (Logger::Compression)compression;
+        return logger->setRotation(rotation) ? 1 : 0;
+    }
+
+    __declspec(dllexport) int logger_compression_supported(int compression) {
+        return Logger::compressionSupported(compression) ? 1 : 0;
+    }
+
+    __declspec(dllexport) void get_logger_stats(Logger* logger, unsigned long long* written,
+        unsigned long long* dropped, unsigned long long* blocked) {
+        if (!logger) return;
+        Logger::Stats stats = logger->getStats();
+        if (written) *written = stats.written;
+        if (dropped) *dropped = stats.dropped;
+        if (blocked) *blocked = stats.blocked;
+    }
+
     __declspec(dllexport) void delete_logger(Logger* logger) {
         if (logger) {
             delete logger;
         }
     }
-}
\ No newline at end of file
+}
@@ -2,22 +2,183 @@
 #include <string>
 #include <fstream>
 #include <ctime>
+#include <mutex>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <thread>
 
 class Logger {
 public:
+    // Уровни совпадают с числовыми уровнями модуля logging в Python
+    enum Level {
+        LEVEL_DEBUG = 10,
+        LEVEL_INFO = 20,
+        LEVEL_WARNING = 30,
+        LEVEL_ERROR = 40,
+        LEVEL_CRITICAL = 50
+    };
+
+    // Что делать в асинхронном режиме, если очередь заполнена
+    enum OverflowPolicy {
+        OVERFLOW_BLOCK = 0,  // ждать, пока поток записи освободит место
+        OVERFLOW_DROP = 1,   // отбросить сообщение (только счётчик dropped)
+        OVERFLOW_COUNT = 2   // отбросить и записать в лог, сколько сообщений потеряно
+    };
+
+    struct AsyncOptions {
+        std::size_t capacity = 8192;         // слотов очереди (округляется вверх до степени двойки)
+        std::size_t flushBytes = 64 * 1024;  // сбрасывать файл, когда накопилось столько байт...
+        int flushIntervalMs = 100;           // ...или прошло столько миллисекунд
+        OverflowPolicy overflow = OVERFLOW_BLOCK;
+        bool console = true;                 // дублировать в stdout, как синхронный режим
+    };
+
+    // Сжатие ротированных файлов (порядок - часть C API, только добавлять в конец)
+    enum Compression {
+        COMPRESSION_NONE = 0,
+        COMPRESSION_GZIP = 1,  // нужна сборка с zlib (LOGGER_WITH_ZLIB)
+        COMPRESSION_ZSTD = 2   // нужна сборка с zstd (LOGGER_WITH_ZSTD)
+    };
+
+    // Ротация logs/<filename>: текущий файл переименовывается в <filename>.<дата>.<N>
+    // и открывается заново; сжатие и удаление старых файлов - в фоновом потоке
+    struct RotationOptions {
+        std::uint64_t maxBytes = 0;  // ротировать, когда файл дорастёт до maxBytes; 0 - без ограничения
+        bool daily = false;          // ротировать при смене календарного дня
+        int retention = 0;           // сколько ротированных файлов хранить; 0 - все
+        Compression compression = COMPRESSION_NONE;
+    };
+
+    struct Stats {
+        std::uint64_t written = 0;  // записано в файл
+        std::uint64_t dropped = 0;  // отброшено при заполненной очереди
+        std::uint64_t blocked = 0;  // сколько раз log() ждал места в очереди
+    };
+
+    // Синхронный режим: каждое сообщение пишется в файл и stdout в вызывающем потоке
     Logger(const std::string& filename);
+    // Асинхронный режим: log() кладёт сообщение в lock-free очередь (MPSC), форматирование,
+    // запись пачками и сброс на диск - в отдельном потоке
+    Logger(const std::string& filename, const AsyncOptions& options);
+    // Сообщения ниже минимального уровня отбрасываются сразу, без форматирования и записи
     void log(const std::string& level, const std::string& message);
+    // Пачка сообщений за один вызов (logger_log_batch): в синхронном режиме - одна
+    // блокировка и один сброс файла на всю пачку
+    void logBatch(std::size_t count, const char* const* levels, const char* const* messages);
+    void setLevel(int level) { minLevel.store(level, std::memory_order_relaxed); }
+    int getLevel() const { return minLevel.load(std::memory_order_relaxed); }
+    // Проверка перед сборкой сообщения: одно атомарное чтение
+    bool isEnabled(int level) const { return level >= minLevel.load(std::memory_order_relaxed); }
+    // Числовой уровень по имени; неизвестные имена не отфильтровываются (LEVEL_CRITICAL)
+    static int levelFromName(const char* name);
+    void flush();  // дождаться записи на диск всех уже принятых сообщений
+    // false - выбранное сжатие не собрано в библиотеку, настройки не изменены
+    bool setRotation(const RotationOptions& rotation);
+    static bool compressionSupported(int compression);
+    bool isAsync() const { return async; }
+    Stats getStats() const;
     ~Logger();
 
 private:
+    // Слот очереди: sequence по схеме Вьюкова (равен позиции - слот свободен для записи,
+    // позиции + 1 - заполнен). Строки не освобождаются при чтении, повторная запись в
+    // слот обычно обходится без выделения памяти.
+    struct Slot {
+        std::atomic<std::size_t> sequence{ 0 };
+        std::chrono::system_clock::time_point time;
+        std::string level;
+        std::string message;
+    };
+
+    // Ротированный файл, ожидающий сжатия и чистки старых файлов
+    struct ArchiveJob {
+        std::string path;
+        Compression compression;
+        int retention;
+    };
+
+    void openFile();
+    void writeFile(const char* data, std::size_t size);
+    void rotate(std::time_t now);
+    std::string archivePath();
+    void archiverLoop();
+    static void archive(const ArchiveJob& job, const std::string& directory, const std::string& prefix);
+    static std::string formatTime(std::time_t time);
     std::string getCurrentTime();
+    void enqueue(const char* level, std::size_t levelLength, const char* message, std::size_t messageLength,
+        std::chrono::system_clock::time_point time);
+    bool tryEnqueue(const char* level, std::size_t levelLength, const char* message, std::size_t messageLength,
+        std::chrono::system_clock::time_point time);
+    void writerLoop();
+    std::size_t drain(std::string& batch, std::time_t& cachedSecond, std::string& cachedTime);
+    void wakeWriter();
+
     std::ofstream logfile;
     std::string filename;
+    mutable std::mutex mutex;  // log() вызывается из нескольких потоков (Calculator); защищает и файл
+    std::atomic<int> minLevel{ LEVEL_DEBUG };
+
+    // Ротация (под mutex)
+    RotationOptions rotation;
+    std::uint64_t fileBytes = 0;     // размер текущего файла
+    std::time_t periodStart = 0;     // когда начат текущий файл (дата в имени архива)
+    std::time_t nextDayStart = 0;    // полночь после periodStart - граница ежедневной ротации
+    std::string archiveDate;         // дата и номер последнего ротированного файла
+    long long archiveIndex = 0;
+
+    // Фоновое сжатие ротированных файлов; поток запускается при первой ротации
+    std::mutex archiveMutex;
+    std::condition_variable archiveWake;
+    std::deque<ArchiveJob> archiveQueue;  // под archiveMutex
+    bool archiveStopping = false;         // под archiveMutex
+    std::thread archiver;
+
+    // Асинхронный режим
+    bool async = false;
+    AsyncOptions options;
+    std::unique_ptr<Slot[]> slots;
+    std::size_t mask = 0;
+    alignas(64) std::atomic<std::size_t> enqueuePos{ 0 };
+    alignas(64) std::atomic<std::size_t> dequeuePos{ 0 };  // пишет только поток записи
+    std::atomic<std::uint64_t> written{ 0 };
+    std::atomic<std::uint64_t> dropped{ 0 };
+    std::atomic<std::uint64_t> blocked{ 0 };
+    std::uint64_t reportedDrops = 0;  // для OVERFLOW_COUNT, только поток записи
+
+    std::mutex writerMutex;
+    std::condition_variable writerWake;  // поток записи: есть работа
+    std::condition_variable flushed;     // flush(): записано до writtenPos
+    std::size_t writtenPos = 0;          // под writerMutex
+    bool flushRequested = false;         // под writerMutex
+    bool wakeRequested = false;          // под writerMutex
+    bool stopping = false;               // под writerMutex
+    std::thread writer;
 };
 
 // C интерфейс
 extern "C" {
     __declspec(dllexport) Logger* create_logger(const char* filename);
+    // Асинхронный логгер; capacity/flush_bytes/flush_interval_ms <= 0 - значения по умолчанию,
+    // overflow - Logger::OverflowPolicy, console != 0 - дублировать в stdout
+    __declspec(dllexport) Logger* create_async_logger(const char* filename, int capacity, int flush_bytes,
+        int flush_interval_ms, int overflow, int console);
     __declspec(dllexport) void logger_log(Logger* logger, const char* level, const char* message);
+    // levels[i], messages[i] - i-е сообщение пачки из count сообщений
+    __declspec(dllexport) void logger_log_batch(Logger* logger, int count, const char** levels, const char** messages);
+    __declspec(dllexport) void logger_set_level(Logger* logger, int level);
+    __declspec(dllexport) int logger_get_level(Logger* logger);
+    __declspec(dllexport) int logger_is_enabled(Logger* logger, int level);
+    __declspec(dllexport) void logger_flush(Logger* logger);
+    // Ротация: max_bytes = 0 - без ограничения по размеру, daily != 0 - раз в сутки, retention = 0 -
+    // хранить все файлы, compression - Logger::Compression. 0 - сжатие не поддерживается этой сборкой
+    __declspec(dllexport) int logger_set_rotation(Logger* logger, unsigned long long max_bytes, int daily,
+        int retention, int compression);
+    __declspec(dllexport) int logger_compression_supported(int compression);
+    __declspec(dllexport) void get_logger_stats(Logger* logger, unsigned long long* written,
+        unsigned long long* dropped, unsigned long long* blocked);
     __declspec(dllexport) void delete_logger(Logger* logger);
-}
\ No newline at end of file
+}
@@ -0,0 +1,263 @@
+#ifndef SMALL_VECTOR_H
+#define SMALL_VECTOR_H
+
+// Вектор с встроенным буфером на InlineCapacity элементов (small-buffer optimization).
+// Пока элементы помещаются в буфер, память из кучи не выделяется: короткие мантиссы
+// BigNumber (до InlineCapacity лимбов) копируются и создаются без malloc.
+// Интерфейс - подмножество std::vector, которое использует BigNumber; только для
+// тривиально копируемых T (копирование через memcpy, без вызова конструкторов).
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdlib>
+#include <cstring>
+#include <initializer_list>
+#include <iterator>
+#include <new>
+#include <type_traits>
+
+// Учёт памяти, выделенной SmallVector в куче текущего потока (для профилирования).
+// Пока current() не nullptr, выделения и освобождения меняют bytes и обновляют peak.
+// Память, освобождённая в другом потоке или выделенная до включения учёта, может
+// увести bytes ниже нуля - peak при этом считается от начального значения.
+struct SmallVectorHeapUsage {
+    long long bytes = 0;
+    long long peak = 0;
+
+    static SmallVectorHeapUsage*& current() {
+        static thread_local SmallVectorHeapUsage* usage = nullptr;
+        return usage;
+    }
+
+    static void add(long long delta) {
+        SmallVectorHeapUsage* usage = current();
+        if (!usage) return;
+        usage->bytes += delta;
+        if (usage->bytes > usage->peak) usage->peak = usage->bytes;
+    }
+};
+
+template <typename T, std::size_t InlineCapacity>
+class SmallVector {
+    static_assert(std::is_trivially_copyable<T>::value, "SmallVector requires trivially copyable T");
+    static_assert(InlineCapacity > 0, "SmallVector requires a non-empty inline buffer");
+
+public:
+    typedef T value_type;
+    typedef std::size_t size_type;
+    typedef T* iterator;
+    typedef const T* const_iterator;
+    typedef T& reference;
+    typedef const T& const_reference;
+
+    SmallVector() : ptr(inlineBuffer), count(0), cap(InlineCapacity) {}
+
+    explicit SmallVector(size_type n, const T& value = T()) : SmallVector() {
+        assign(n, value);
+    }
+
+    template <typename It, typename = typename std::enable_if<!std::is_integral<It>::value>::type>
+    SmallVector(It first, It last) : SmallVector() {
+        assign(first, last);
+    }
+
+    SmallVector(std::initializer_list<T> init) : SmallVector() {
+        assign(init.begin(), init.end());
+    }
+
+    SmallVector(const SmallVector& other) : SmallVector() {
+        assign(other.begin(), other.end());
+    }
+
+    SmallVector(SmallVector&& other) noexcept : SmallVector() {
+        steal(other);
+    }
+
+    ~SmallVector() { release(); }
+
+    SmallVector& operator=(const SmallVector& other) {
+        if (this != &other) assign(other.begin(), other.end());
+        return *this;
+    }
+
+    SmallVector& operator=(SmallVector&& other) noexcept {
+        if (this != &other) {
+            release();
+            ptr = inlineBuffer;
+            count = 0;
+            cap = InlineCapacity;
+            steal(other);
+        }
+        return *this;
+    }
+
+    SmallVector& operator=(std::initializer_list<T> init) {
+        assign(init.begin(), init.end());
+        return *this;
+    }
+
+    size_type size() const { return count; }
+    size_type capacity() const { return cap; }
+    bool empty() const { return count == 0; }
+    // true, пока элементы лежат во встроенном буфере
+    bool isInline() const { return ptr == inlineBuffer; }
+
+    T* data() { return ptr; }
+    const T* data() const { return ptr; }
+    T& operator[](size_type i) { return ptr[i]; }
+    const T& operator[](size_type i) const { return ptr[i]; }
+    T& front() { return ptr[0]; }
+    const T& front() const { return ptr[0]; }
+    T& back() { return ptr[count - 1]; }
+    const T& back() const { return ptr[count - 1]; }
+
+    iterator begin() { return ptr; }
+    iterator end() { return ptr + count; }
+    const_iterator begin() const { return ptr; }
+    const_iterator end() const { return ptr + count; }
+
+    void reserve(size_type n) {
+        if (n > cap) grow(n);
+    }
+
+    void clear() { count = 0; }
+
+    void push_back(const T& value) {
+        if (count == cap) {
+            T copy = value;  // value может указывать внутрь буфера
+            grow(cap * 2);
+            ptr[count++] = copy;
+            return;
+        }
+        ptr[count++] = value;
+    }
+
+    void pop_back() { --count; }
+
+    void resize(size_type n, const T& value = T()) {
+        if (n > count) {
+            reserve(n);
+            std::fill(ptr + count, ptr + n, value);
+        }
+        count = n;
+    }
+
+    void assign(size_type n, const T& value) {
+        T copy = value;
+        count = 0;
+        reserve(n);
+        std::fill(ptr, ptr + n, copy);
+        count = n;
+    }
+
+    template <typename It, typename = typename std::enable_if<!std::is_integral<It>::value>::type>
+    void assign(It first, It last) {
+        size_type n = (size_type)std::distance(first, last);
+        if (n > cap) {
+            SmallVector tmp;  // источник может лежать в нашем же буфере
+            tmp.grow(n);
+            std::copy(first, last, tmp.ptr);
+            tmp.count = n;
+            *this = std::move(tmp);
+            return;
+        }
+        T* out = ptr;
+        for (; first != last; ++first) *out++ = *first;
+        count = n;
+    }
+
+    iterator insert(const_iterator pos, size_type n, const T& value) {
+        size_type at = (size_type)(pos - ptr);
+        if (n == 0) return ptr + at;
+        T copy = value;
+        reserve(count + n);
+        std::memmove(ptr + at + n, ptr + at, (count - at) * sizeof(T));
+        std::fill(ptr + at, ptr + at + n, copy);
+        count += n;
+        return ptr + at;
+    }
+
+    iterator insert(const_iterator pos, const T& value) {
+        return insert(pos, 1, value);
+    }
+
+    template <typename It, typename = typename std::enable_if<!std::is_integral<It>::value>::type>
+    iterator insert(const_iterator pos, It first, It last) {
+        size_type at = (size_type)(pos - ptr);
+        size_type n = (size_type)std::distance(first, last);
+        if (n == 0) return ptr + at;
+        SmallVector source(first, last);  // источник может лежать в нашем же буфере
+        reserve(count + n);
+        std::memmove(ptr + at + n, ptr + at, (count - at) * sizeof(T));
+        std::memcpy(ptr + at, source.ptr, n * sizeof(T));
+        count += n;
+        return ptr + at;
+    }
+
+    iterator erase(const_iterator first, const_iterator last) {
+        size_type from = (size_type)(first - ptr);
+        size_type to = (size_type)(last - ptr);
+        std::memmove(ptr + from, ptr + to, (count - to) * sizeof(T));
+        count -= to - from;
+        return ptr + from;
+    }
+
+    iterator erase(const_iterator pos) {
+        return erase(pos, pos + 1);
+    }
+
+    void swap(SmallVector& other) noexcept {
+        SmallVector tmp(std::move(other));
+        other = std::move(*this);
+        *this = std::move(tmp);
+    }
+
+    friend bool operator==(const SmallVector& a, const SmallVector& b) {
+        return a.count == b.count && std::equal(a.begin(), a.end(), b.begin());
+    }
+
+    friend bool operator!=(const SmallVector& a, const SmallVector& b) {
+        return !(a == b);
+    }
+
+private:
+    void grow(size_type minCapacity) {
+        size_type newCap = std::max(minCapacity, cap + cap / 2);
+        T* memory = static_cast<T*>(isInline() ? std::malloc(newCap * sizeof(T))
+                                               : std::realloc(ptr, newCap * sizeof(T)));
+        if (!memory) throw std::bad_alloc();
+        SmallVectorHeapUsage::add((long long)((newCap - (isInline() ? 0 : cap)) * sizeof(T)));
+        if (isInline() && count > 0) std::memcpy(memory, inlineBuffer, count * sizeof(T));
+        ptr = memory;
+        cap = newCap;
+    }
+
+    void release() {
+        if (isInline()) return;
+        SmallVectorHeapUsage::add(-(long long)(cap * sizeof(T)));
+        std::free(ptr);
+    }
+
+    // Забирает содержимое other (наш буфер уже пуст и встроенный)
+    void steal(SmallVector& other) {
+        if (other.isInline()) {
+            std::memcpy(inlineBuffer, other.inlineBuffer, other.count * sizeof(T));
+            count = other.count;
+        }
+        else {
+            ptr = other.ptr;
+            count = other.count;
+            cap = other.cap;
+            other.ptr = other.inlineBuffer;
+            other.cap = InlineCapacity;
+        }
+        other.count = 0;
+    }
+
+    T* ptr;
+    size_type count;
+    size_type cap;
+    T inlineBuffer[InlineCapacity];
+};
+
+#endif
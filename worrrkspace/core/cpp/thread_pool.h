@@ -0,0 +1,112 @@
+#ifndef THREAD_POOL_H
+#define THREAD_POOL_H
+
+// Пул рабочих потоков для пакетных вычислений.
+// Задачи - std::function<void()>; parallelFor раздаёт индексы через атомарный
+// счётчик, вызывающий поток тоже работает, поэтому вложенный вызов из задачи
+// пула не блокируется, даже если все рабочие потоки заняты.
+
+#include <atomic>
+#include <condition_variable>
+#include <cstddef>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+class ThreadPool {
+public:
+    explicit ThreadPool(size_t threadCount = 0) {
+        if (threadCount == 0) threadCount = defaultThreadCount();
+        workers.reserve(threadCount);
+        for (size_t i = 0; i < threadCount; ++i) {
+            workers.emplace_back([this] { workerLoop(); });
+        }
+    }
+
+    ~ThreadPool() {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            stopping = true;
+        }
+        wakeup.notify_all();
+        for (auto& worker : workers) worker.join();
+    }
+
+    ThreadPool(const ThreadPool&) = delete;
+    ThreadPool& operator=(const ThreadPool&) = delete;
+
+    size_t size() const { return workers.size(); }
+
+    void submit(std::function<void()> task) {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            tasks.push_back(std::move(task));
+        }
+        wakeup.notify_one();
+    }
+
+    // body(i) для i в [0, count), не более maxParallel потоков (0 - все потоки пула + вызывающий).
+    // body не должна бросать исключения.
+    template <typename Body>
+    void parallelFor(size_t count, Body body, size_t maxParallel = 0) {
+        if (count == 0) return;
+        size_t helpers = maxParallel == 0 ? workers.size() : maxParallel - 1;
+        if (helpers > workers.size()) helpers = workers.size();
+        if (helpers > count - 1) helpers = count - 1;
+
+        struct Shared {
+            std::atomic<size_t> next{ 0 };
+            std::atomic<size_t> done{ 0 };
+            std::mutex mutex;
+            std::condition_variable finished;
+        };
+        auto shared = std::make_shared<Shared>();
+
+        auto run = [shared, count, &body] {
+            size_t completed = 0;
+            for (size_t i; (i = shared->next.fetch_add(1)) < count; ++completed) body(i);
+            if (completed > 0 && shared->done.fetch_add(completed) + completed == count) {
+                std::lock_guard<std::mutex> lock(shared->mutex);
+                shared->finished.notify_all();
+            }
+        };
+
+        for (size_t i = 0; i < helpers; ++i) submit(run);
+        run();
+
+        // Помощники, взявшие задачу после окончания работы, уже ничего не делают с body
+        std::unique_lock<std::mutex> lock(shared->mutex);
+        shared->finished.wait(lock, [&] { return shared->done.load() == count; });
+    }
+
+    static size_t defaultThreadCount() {
+        unsigned n = std::thread::hardware_concurrency();
+        return n > 0 ? n : 4;
+    }
+
+private:
+    void workerLoop() {
+        for (;;) {
+            std::function<void()> task;
+            {
+                std::unique_lock<std::mutex> lock(mutex);
+                wakeup.wait(lock, [this] { return stopping || !tasks.empty(); });
+                if (tasks.empty()) return;  // stopping
+                task = std::move(tasks.front());
+                tasks.pop_front();
+            }
+            task();
+        }
+    }
+
+    std::vector<std::thread> workers;
+    std::deque<std::function<void()>> tasks;
+    std::mutex mutex;
+    std::condition_variable wakeup;
+    bool stopping = false;
+};
+
+#endif
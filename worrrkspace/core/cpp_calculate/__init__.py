@@ -2,7 +2,8 @@
 C++ Calculator package
 """
 
-from .calculate import CppCalculator
+from .calculate import CppCalculator, CompiledExpression, CancellationToken, CalculationCancelled
+from .async_calculate import AsyncCppCalculator
 
 # Создаем глобальный экземпляр калькулятора по умолчанию
 try:
@@ -11,5 +12,6 @@ except Exception as e:
     calculator = None
     print(f"Failed to create calculator: {e}")
 
-__all__ = ['CppCalculator', 'calculator']
+__all__ = ['CppCalculator', 'AsyncCppCalculator', 'CompiledExpression', 'CancellationToken',
+           'CalculationCancelled', 'calculator']
 __version__ = '0.1.0'
\ No newline at end of file
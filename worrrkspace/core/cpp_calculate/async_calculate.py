@@ -0,0 +1,153 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .calculate import CppCalculator, CalculationCancelled
+
+
+class AsyncCppCalculator:
+    """asyncio-обёртка над CppCalculator для event loop (backend, Qt UI).
+
+    Вычисления выполняются в собственном ограниченном пуле потоков: вызовы DLL
+    отпускают GIL, а один CppCalculator потокобезопасен. Одновременно выполняется
+    не больше max_in_flight вычислений, остальные ждут в очереди; stats() показывает
+    глубину очереди. Отмена ожидающей задачи отменяет и вычисление в C++.
+
+        async with AsyncCppCalculator(precision=50) as calc:
+            result = await calc.evaluate("sin(1) + 1", timeout=2.0)
+    """
+
+    def __init__(self, precision=50, max_workers=None, max_in_flight=None, calculator=None):
+        self._calculator = calculator if calculator is not None else CppCalculator(precision)
+        self._max_workers = max_workers or os.cpu_count() or 4
+        self._max_in_flight = max_in_flight or self._max_workers
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="cpp-calc")
+        self._slots = asyncio.Semaphore(self._max_in_flight)
+        self._running = set()  # future пула для ожидания при закрытии
+        self._tokens = set()   # токены отмены выполняющихся вычислений
+        self._closed = False
+
+        self._waiting = 0
+        self._peak_waiting = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._cancelled = 0
+
+    @property
+    def calculator(self):
+        """Синхронный CppCalculator, на котором выполняются вычисления"""
+        return self._calculator
+
+    async def evaluate(self, expression, precision=None, timeout=None):
+        """Вычисляет выражение, не блокируя event loop.
+
+        precision - точность только для этого вызова; timeout - срок в секундах
+        (TimeoutError). Время ожидания в очереди в срок не входит.
+        """
+        return await self._submit(
+            lambda token: self._calculator.evaluate(expression, precision, timeout, token)
+        )
+
+    async def evaluate_many(self, expressions, threads=1, timeout=None):
+        """Пакетное вычисление (CppCalculator.evaluate_many) как одна задача очереди.
+
+        timeout - срок на весь пакет (TimeoutError); отмена задачи прерывает пакет в C++.
+        """
+        expressions = list(expressions)
+        return await self._submit(
+            lambda token: self._calculator.evaluate_many(expressions, threads, timeout, token)
+        )
+
+    def stats(self):
+        """Метрики очереди: ожидающие, выполняющиеся и завершённые вычисления"""
+        return {
+            'waiting': self._waiting,
+            'peak_waiting': self._peak_waiting,
+            'in_flight': self._in_flight,
+            'max_in_flight': self._max_in_flight,
+            'max_workers': self._max_workers,
+            'completed': self._completed,
+            'failed': self._failed,
+            'timed_out': self._timed_out,
+            'cancelled': self._cancelled,
+        }
+
+    async def aclose(self, cancel_running=False):
+        """Закрывает калькулятор: новые вызовы отклоняются, выполняющиеся дожидаются.
+
+        cancel_running=True - прервать выполняющиеся вычисления через токены отмены.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if cancel_running:
+            for token in list(self._tokens):
+                token.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose(cancel_running=exc_type is not None)
+
+    async def _submit(self, call):
+        if self._closed:
+            raise RuntimeError("AsyncCppCalculator is closed")
+
+        self._waiting += 1
+        self._peak_waiting = max(self._peak_waiting, self._waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        if self._closed:
+            self._slots.release()
+            raise RuntimeError("AsyncCppCalculator is closed")
+
+        token = self._calculator.create_cancellation_token()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._executor, call, token)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # Место освобождается, когда поток действительно закончил, а не когда
+        # ожидающая задача отменена - иначе отменённые вычисления переполнят пул
+        self._in_flight += 1
+        self._running.add(future)
+        self._tokens.add(token)
+
+        def finished(done):
+            if not done.cancelled():
+                done.exception()  # помечаем исключение как полученное, если задачу уже отменили
+            self._in_flight -= 1
+            self._running.discard(done)
+            self._tokens.discard(token)
+            self._slots.release()
+
+        future.add_done_callback(finished)
+
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            token.cancel()
+            self._cancelled += 1
+            raise
+        except TimeoutError:
+            self._timed_out += 1
+            raise
+        except CalculationCancelled:
+            self._cancelled += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        self._completed += 1
+        return result
@@ -0,0 +1,189 @@
+"""Бенчмарк движка калькулятора через CppCalculator.
+
+Замеряет add/mul/div/pi/exp/sin/factorial на точностях 10..100000, сохраняет
+результаты в JSON и сравнивает с эталоном: операция считается регрессией, если
+стала медленнее эталона больше чем на threshold (по умолчанию 25%).
+
+    python -m core.cpp_calculate.benchmark --output bench.json
+    python -m core.cpp_calculate.benchmark --baseline baseline.json
+    python -m core.cpp_calculate.benchmark --save-baseline baseline.json
+    python -m core.cpp_calculate.benchmark --compare native.json --baseline baseline.json
+
+Файл --compare может быть и результатом нативного bench_calculate --suite --json
+(тот же формат). Код возврата 1 - найдены регрессии.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_PRECISIONS = (10, 100, 1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.25
+
+
+def _fraction(rng, digits):
+    """Число в [1, 2) с digits знаками после точки"""
+    return "1." + "".join(rng.choice("0123456789") for _ in range(digits))
+
+
+# Выражение для операции на точности precision; операнды имеют precision знаков
+OPERATIONS = {
+    'add': lambda rng, p: f"{_fraction(rng, p)} + {_fraction(rng, p)}",
+    'mul': lambda rng, p: f"{_fraction(rng, p)} * {_fraction(rng, p)}",
+    'div': lambda rng, p: f"{_fraction(rng, p)} / {_fraction(rng, p)}",
+    'pi': lambda rng, p: "pi",
+    'exp': lambda rng, p: f"exp({_fraction(rng, p)})",
+    'sin': lambda rng, p: f"sin({_fraction(rng, p)})",
+    'factorial': lambda rng, p: f"{p}!",
+}
+
+
+def run_benchmark(calculator=None, precisions=DEFAULT_PRECISIONS, operations=None,
+                  min_time=0.2, seed=20240601, progress=None):
+    """Замеряет операции и возвращает отчёт {'engine', 'created', 'platform', 'results'}.
+
+    Кэш результатов сбрасывается перед каждым вызовом, иначе замер покажет время
+    поиска в кэше. Кэш констант прогрет (как в рабочем режиме), кроме операции pi.
+    """
+    if calculator is None:
+        from .calculate import CppCalculator
+        calculator = CppCalculator()
+
+    rng = random.Random(seed)
+    results = []
+    for precision in precisions:
+        for op in operations or OPERATIONS:
+            expression = OPERATIONS[op](rng, precision)
+            cold = op == 'pi'
+
+            calculator.clear_cache()
+            check = calculator.evaluate(expression, precision)  # прогрев и проверка
+            entry = {'op': op, 'precision': precision}
+            if check.startswith("Error"):
+                entry['error'] = check
+                results.append(entry)
+                continue
+
+            iterations = 0
+            elapsed = 0.0
+            while elapsed < min_time:
+                calculator.clear_cache()
+                if cold:
+                    calculator.clear_constants_cache()
+                start = time.perf_counter()
+                calculator.evaluate(expression, precision)
+                elapsed += time.perf_counter() - start
+                iterations += 1
+
+            entry['seconds'] = elapsed / iterations
+            entry['iterations'] = iterations
+            results.append(entry)
+            if progress:
+                progress(entry)
+
+    return {
+        'engine': 'CppCalculator',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Сравнивает отчёт с эталоном по парам (op, precision).
+
+    Возвращает список словарей op, precision, baseline, current, ratio, status, где
+    status - 'regression' (медленнее больше чем на threshold), 'improvement'
+    (быстрее больше чем на threshold) или 'ok'. Пары без замера в одном из отчётов пропускаются.
+    """
+    reference = {(r['op'], r['precision']): r['seconds'] for r in baseline['results'] if 'seconds' in r}
+    rows = []
+    for r in report['results']:
+        key = (r['op'], r['precision'])
+        if 'seconds' not in r or key not in reference or reference[key] <= 0:
+            continue
+        ratio = r['seconds'] / reference[key]
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'op': r['op'], 'precision': r['precision'], 'baseline': reference[key],
+                     'current': r['seconds'], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def _print_entry(entry):
+    if 'error' in entry:
+        print(f"{entry['op']:<10} {entry['precision']:>8}  {entry['error']}")
+    else:
+        print(f"{entry['op']:<10} {entry['precision']:>8}  {entry['seconds'] * 1e3:12.4f} ms  x{entry['iterations']}")
+
+
+def _print_comparison(rows):
+    print(f"\n{'op':<10} {'precision':>9} {'baseline, ms':>14} {'current, ms':>14} {'ratio':>7}")
+    for row in rows:
+        mark = {'regression': '  <-- REGRESSION', 'improvement': '  (faster)'}.get(row['status'], '')
+        print(f"{row['op']:<10} {row['precision']:>9} {row['baseline'] * 1e3:14.4f} "
+              f"{row['current'] * 1e3:14.4f} {row['ratio']:7.2f}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк CppCalculator: время операций по точностям")
+    parser.add_argument('--precisions', default=",".join(map(str, DEFAULT_PRECISIONS)),
+                        help="точности через запятую (по умолчанию 10..100000)")
+    parser.add_argument('--max-precision', type=int, help="пропустить точности выше этой")
+    parser.add_argument('--ops', default=",".join(OPERATIONS), help="операции через запятую")
+    parser.add_argument('--min-time', type=float, default=0.2, help="минимальное время замера одной операции, с")
+    parser.add_argument('--output', help="сохранить отчёт в JSON")
+    parser.add_argument('--baseline', help="эталонный JSON для сравнения")
+    parser.add_argument('--save-baseline', metavar='FILE', help="сохранить отчёт как новый эталон")
+    parser.add_argument('--compare', metavar='FILE', help="не замерять, а сравнить готовый отчёт с --baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое замедление относительно эталона (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare requires --baseline")
+        with open(args.compare, encoding='utf-8') as f:
+            report = json.load(f)
+    else:
+        precisions = [int(p) for p in args.precisions.split(',') if p.strip()]
+        if args.max_precision:
+            precisions = [p for p in precisions if p <= args.max_precision]
+        operations = [op.strip() for op in args.ops.split(',') if op.strip()]
+        unknown = [op for op in operations if op not in OPERATIONS]
+        if unknown:
+            parser.error(f"unknown operations: {', '.join(unknown)}")
+
+        report = run_benchmark(precisions=precisions, operations=operations,
+                               min_time=args.min_time, progress=_print_entry)
+        for path in (args.output, args.save_baseline):
+            if path:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+                print(f"Saved: {path}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if report.get('engine') != baseline.get('engine'):
+        print(f"\nNote: comparing {report.get('engine')} against {baseline.get('engine')} baseline")
+    rows = compare(report, baseline, args.threshold)
+    _print_comparison(rows)
+    regressions = [row for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} threshold")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
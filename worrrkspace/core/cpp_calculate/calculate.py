@@ -1,18 +1,167 @@
 import os
+import asyncio
 import ctypes
 import sys
 from pathlib import Path
 import subprocess
 
 
+# Коды операций CompiledExpression::OpCode (порядок совпадает с enum в calculate.h)
+_OPCODES = (
+    'PUSH_CONST', 'PUSH_VAR', 'PUSH_PI', 'PUSH_E',
+    'ADD', 'SUB', 'MUL', 'DIV', 'POW',
+    'NEG', 'FACTORIAL',
+    'SIN', 'COS', 'TAN', 'LN', 'LOG', 'EXP', 'SQRT',
+)
+
+# Операции профиля OperationProfile::Operation (порядок совпадает с enum в calculate.h)
+_PROFILE_OPERATIONS = (
+    'evaluate', 'multiply', 'divide', 'power', 'factorial', 'exp', 'ln', 'sin_cos', 'constant',
+    'series_term', 'cache_hit', 'cache_miss',
+)
+
+# Постоянный кэш на диске по умолчанию (рядом с logs/ логгера) и его лимит
+DEFAULT_PERSISTENT_CACHE_PATH = os.path.join("cache", "calculate.cache")
+DEFAULT_PERSISTENT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Точность (знаков после точки), до которой evaluate_array считает в float64
+FLOAT64_MAX_PRECISION = 15
+
+
+def _evaluate_float64(program, constants, arrays):
+    """Выполняет программу CompiledExpression над массивами float64 (векторно)"""
+    import math
+    import numpy as np
+
+    stack = []
+    for op, operand in program:
+        if op == 'PUSH_CONST':
+            stack.append(constants[operand])
+        elif op == 'PUSH_VAR':
+            stack.append(arrays[operand])
+        elif op == 'PUSH_PI':
+            stack.append(math.pi)
+        elif op == 'PUSH_E':
+            stack.append(math.e)
+        elif op in ('ADD', 'SUB', 'MUL', 'DIV', 'POW'):
+            right = stack.pop()
+            left = stack.pop()
+            if op == 'ADD':
+                stack.append(np.add(left, right))
+            elif op == 'SUB':
+                stack.append(np.subtract(left, right))
+            elif op == 'MUL':
+                stack.append(np.multiply(left, right))
+            elif op == 'DIV':
+                stack.append(np.divide(left, right))
+            else:
+                stack.append(np.power(left, right))
+        elif op == 'NEG':
+            stack.append(np.negative(stack.pop()))
+        elif op == 'FACTORIAL':
+            # Только целые 0..170 (дальше float64 переполняется); остальное - NaN и BigNumber
+            x = np.asarray(stack.pop(), dtype=np.float64)
+            table = np.array([float(math.factorial(k)) for k in range(171)])
+            valid = (x >= 0) & (x <= 170) & (x == np.floor(x))
+            stack.append(np.where(valid, table[np.where(valid, x, 0).astype(np.int64)], np.nan))
+        else:
+            function = {
+                'SIN': np.sin, 'COS': np.cos, 'TAN': np.tan,
+                'LN': np.log, 'LOG': np.log10, 'EXP': np.exp, 'SQRT': np.sqrt,
+            }[op]
+            stack.append(function(stack.pop()))
+    return stack.pop()
+
+
+# Коды результата calculate_expression_ex (CalculationStatus в calculate.h)
+CALC_OK = 0
+CALC_ERROR = 1
+CALC_TIMEOUT = 2
+CALC_CANCELLED = 3
+CALC_BUFFER_TOO_SMALL = 4
+
+
+class CalculationCancelled(RuntimeError):
+    """Вычисление прервано через CancellationToken"""
+
+
+class CancellationToken:
+    """Флаг отмены вычисления (создаётся через CppCalculator.create_cancellation_token).
+
+    cancel() можно вызывать из любого потока: вычисление, которому передан токен,
+    остановится на ближайшей проверке в цикле ряда и выбросит CalculationCancelled.
+    """
+
+    def __init__(self, dll):
+        self._dll = dll
+        self._handle = dll.create_cancellation_token()
+        if not self._handle:
+            raise RuntimeError("Failed to create cancellation token")
+
+    def cancel(self):
+        self._dll.cancel_cancellation_token(self._handle)
+
+    def reset(self):
+        self._dll.reset_cancellation_token(self._handle)
+
+    def __del__(self):
+        if getattr(self, '_handle', None):
+            try:
+                self._dll.delete_cancellation_token(self._handle)
+            except Exception:
+                pass
+            self._handle = None
+
+
+class CompiledExpression:
+    """Скомпилированное выражение C++ (создаётся через CppCalculator.compile)"""
+
+    def __init__(self, dll, handle, source, variables):
+        self._dll = dll
+        self._handle = handle
+        self.source = source
+        self.variables = tuple(variables)
+        self._program = None  # (код, константы) для float64 - загружается при первом evaluate_array
+
+    def _float64_program(self):
+        """Программа в обратной польской записи и константы как float"""
+        if self._program is None:
+            size = self._dll.get_compiled_code(self._handle, None, None, 0)
+            ops = (ctypes.c_int * size)()
+            operands = (ctypes.c_int * size)()
+            self._dll.get_compiled_code(self._handle, ops, operands, size)
+
+            count = self._dll.get_compiled_constants(self._handle, None, 0)
+            constants = (ctypes.c_double * count)()
+            self._dll.get_compiled_constants(self._handle, constants, count)
+
+            program = [(_OPCODES[op], operand) for op, operand in zip(ops, operands)]
+            self._program = (program, list(constants))
+        return self._program
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r}, variables={self.variables})"
+
+    def __del__(self):
+        if getattr(self, '_handle', None):
+            try:
+                self._dll.delete_compiled_expression(self._handle)
+            except Exception:
+                pass
+            self._handle = None
+
+
 class CppCalculator:
-    def __init__(self, precision=50):
+    def __init__(self, precision=50, persistent_cache=None):
+        """persistent_cache - путь к файлу постоянного кэша (True - путь по умолчанию)"""
         self._dll = None
         self._calc_ptr = None
         self._precision = precision
         self._load_dll()
         self._setup_functions()
         self._create_calculator()
+        if persistent_cache:
+            self.enable_persistent_cache(None if persistent_cache is True else persistent_cache)
 
     def _load_dll(self):
         """Загружает DLL калькулятора с обработкой ошибок"""
@@ -95,6 +244,101 @@ class CppCalculator:
             self._dll.calculate_expression.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
             self._dll.calculate_expression.restype = ctypes.c_void_p
 
+            # calculate_batch (в старых сборках DLL отсутствует)
+            if hasattr(self._dll, 'calculate_batch'):
+                self._dll.calculate_batch.argtypes = [
+                    ctypes.c_void_p,
+                    ctypes.POINTER(ctypes.c_char_p),
+                    ctypes.c_size_t,
+                    ctypes.POINTER(ctypes.c_int),
+                    ctypes.POINTER(ctypes.c_size_t),
+                ]
+                self._dll.calculate_batch.restype = ctypes.c_void_p
+
+            if hasattr(self._dll, 'calculate_batch_parallel'):
+                self._dll.calculate_batch_parallel.argtypes = [
+                    ctypes.c_void_p,
+                    ctypes.POINTER(ctypes.c_char_p),
+                    ctypes.c_size_t,
+                    ctypes.POINTER(ctypes.c_int),
+                    ctypes.POINTER(ctypes.c_size_t),
+                    ctypes.c_int,
+                ]
+                self._dll.calculate_batch_parallel.restype = ctypes.c_void_p
+
+            if hasattr(self._dll, 'calculate_batch_ex'):
+                self._dll.calculate_batch_ex.argtypes = [
+                    ctypes.c_void_p,
+                    ctypes.POINTER(ctypes.c_char_p),
+                    ctypes.c_size_t,
+                    ctypes.POINTER(ctypes.c_int),
+                    ctypes.POINTER(ctypes.c_size_t),
+                    ctypes.c_int,
+                    ctypes.c_int,
+                    ctypes.c_void_p,
+                ]
+                self._dll.calculate_batch_ex.restype = ctypes.c_void_p
+
+            # Срок и отмена (в старых сборках DLL отсутствуют)
+            if hasattr(self._dll, 'calculate_expression_ex'):
+                self._dll.calculate_expression_ex.argtypes = [
+                    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_int,
+                    ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p),
+                ]
+                self._dll.calculate_expression_ex.restype = ctypes.c_int
+
+                self._dll.create_cancellation_token.argtypes = []
+                self._dll.create_cancellation_token.restype = ctypes.c_void_p
+
+                for name in ('cancel_cancellation_token', 'reset_cancellation_token', 'delete_cancellation_token'):
+                    getattr(self._dll, name).argtypes = [ctypes.c_void_p]
+                    getattr(self._dll, name).restype = None
+
+            # Результат без лишних копий (в старых сборках DLL отсутствует)
+            if hasattr(self._dll, 'calculate_expression_view'):
+                self._dll.calculate_expression_into.argtypes = [
+                    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int,
+                    ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t),
+                ]
+                self._dll.calculate_expression_into.restype = ctypes.c_int
+
+                self._dll.calculate_expression_view.argtypes = [
+                    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int,
+                    ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t),
+                ]
+                self._dll.calculate_expression_view.restype = ctypes.c_int
+
+            if hasattr(self._dll, 'calculate_expression_with_precision'):
+                self._dll.calculate_expression_with_precision.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+                self._dll.calculate_expression_with_precision.restype = ctypes.c_void_p
+
+            # Скомпилированные выражения (в старых сборках DLL отсутствуют)
+            if hasattr(self._dll, 'compile_expression'):
+                self._dll.compile_expression.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_void_p)]
+                self._dll.compile_expression.restype = ctypes.c_void_p
+
+                self._dll.get_compiled_variable_count.argtypes = [ctypes.c_void_p]
+                self._dll.get_compiled_variable_count.restype = ctypes.c_int
+
+                self._dll.get_compiled_variable_name.argtypes = [ctypes.c_void_p, ctypes.c_int]
+                self._dll.get_compiled_variable_name.restype = ctypes.c_char_p
+
+                self._dll.eval_compiled.argtypes = [
+                    ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t
+                ]
+                self._dll.eval_compiled.restype = ctypes.c_void_p
+
+                self._dll.delete_compiled_expression.argtypes = [ctypes.c_void_p]
+                self._dll.delete_compiled_expression.restype = None
+
+                self._dll.get_compiled_code.argtypes = [
+                    ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.c_int
+                ]
+                self._dll.get_compiled_code.restype = ctypes.c_int
+
+                self._dll.get_compiled_constants.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_double), ctypes.c_int]
+                self._dll.get_compiled_constants.restype = ctypes.c_int
+
             # delete_calculator
             self._dll.delete_calculator.argtypes = [ctypes.c_void_p]
             self._dll.delete_calculator.restype = None
@@ -111,6 +355,47 @@ class CppCalculator:
             self._dll.get_calculator_precision.argtypes = [ctypes.c_void_p]
             self._dll.get_calculator_precision.restype = ctypes.c_int
 
+            # Кэш результатов (в старых сборках DLL отсутствует)
+            if hasattr(self._dll, 'set_calculator_cache_limit'):
+                self._dll.set_calculator_cache_limit.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+                self._dll.set_calculator_cache_limit.restype = None
+
+                self._dll.get_calculator_cache_limit.argtypes = [ctypes.c_void_p]
+                self._dll.get_calculator_cache_limit.restype = ctypes.c_size_t
+
+                self._dll.clear_calculator_cache.argtypes = [ctypes.c_void_p]
+                self._dll.clear_calculator_cache.restype = None
+
+                self._dll.get_calculator_cache_stats.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ulonglong)] * 5
+                self._dll.get_calculator_cache_stats.restype = None
+
+            if hasattr(self._dll, 'clear_constants_cache'):
+                self._dll.clear_constants_cache.argtypes = []
+                self._dll.clear_constants_cache.restype = None
+
+            # Профиль вычислений
+            if hasattr(self._dll, 'get_calculator_stats'):
+                self._dll.get_calculator_stats.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulonglong), ctypes.c_int]
+                self._dll.get_calculator_stats.restype = ctypes.c_int
+
+                self._dll.reset_calculator_stats.argtypes = [ctypes.c_void_p]
+                self._dll.reset_calculator_stats.restype = None
+
+            # Постоянный кэш на диске
+            if hasattr(self._dll, 'enable_persistent_cache'):
+                self._dll.enable_persistent_cache.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t,
+                                                              ctypes.POINTER(ctypes.c_void_p)]
+                self._dll.enable_persistent_cache.restype = ctypes.c_int
+
+                self._dll.disable_persistent_cache.argtypes = [ctypes.c_void_p]
+                self._dll.disable_persistent_cache.restype = None
+
+                self._dll.clear_persistent_cache.argtypes = [ctypes.c_void_p]
+                self._dll.clear_persistent_cache.restype = None
+
+                self._dll.get_persistent_cache_stats.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ulonglong)] * 5
+                self._dll.get_persistent_cache_stats.restype = None
+
         except Exception as e:
             raise RuntimeError(f"Failed to setup function prototypes: {e}")
 
@@ -125,19 +410,29 @@ class CppCalculator:
             raise RuntimeError("Failed to create C++ calculator")
         print("✅ Калькулятор создан успешно")
 
-    def evaluate(self, expression):
-        """Вычисляет математическое выражение"""
+    def evaluate(self, expression, precision=None, timeout=None, cancel_token=None):
+        """Вычисляет математическое выражение.
+
+        precision - точность только для этого вызова; общая точность калькулятора
+        не меняется, поэтому один экземпляр можно использовать из нескольких потоков.
+        timeout - срок в секундах: по его истечении выбрасывается TimeoutError.
+        cancel_token - CancellationToken: после cancel() выбрасывается CalculationCancelled.
+        """
         if not self._calc_ptr:
             raise RuntimeError("Calculator not initialized")
 
-        try:
-            print(f"🔧 Вычисление выражения: {expression}")
+        if timeout is not None or cancel_token is not None:
+            return self._evaluate_interruptible(expression, precision, timeout, cancel_token)
 
+        try:
             # Кодируем строку в bytes
             expr_bytes = expression.encode('utf-8')
 
-            # Вызываем C++ функцию
-            result_ptr = self._dll.calculate_expression(self._calc_ptr, expr_bytes)
+            # Вызываем C++ функцию (ctypes отпускает GIL на время вызова)
+            if precision is not None and hasattr(self._dll, 'calculate_expression_with_precision'):
+                result_ptr = self._dll.calculate_expression_with_precision(self._calc_ptr, expr_bytes, precision)
+            else:
+                result_ptr = self._dll.calculate_expression(self._calc_ptr, expr_bytes)
 
             if not result_ptr:
                 raise RuntimeError("Calculation returned null")
@@ -152,12 +447,293 @@ class CppCalculator:
             if hasattr(self._dll, 'free_result'):
                 self._dll.free_result(result_ptr)
 
-            print(f"✅ Результат: {result_str}")
             return result_str
 
         except Exception as e:
             raise RuntimeError(f"Calculation error: {e}")
 
+    def _evaluate_interruptible(self, expression, precision, timeout, cancel_token):
+        """evaluate() со сроком и/или отменой через calculate_expression_ex"""
+        if not hasattr(self._dll, 'calculate_expression_ex'):
+            raise RuntimeError("Timeouts and cancellation are not supported by the loaded DLL")
+
+        timeout_ms = 0
+        if timeout is not None:
+            timeout_ms = max(1, int(timeout * 1000))
+
+        result_ptr = ctypes.c_void_p()
+        status = self._dll.calculate_expression_ex(
+            self._calc_ptr,
+            expression.encode('utf-8'),
+            -1 if precision is None else precision,
+            timeout_ms,
+            cancel_token._handle if cancel_token is not None else None,
+            ctypes.byref(result_ptr),
+        )
+        if not result_ptr.value:
+            raise RuntimeError("Calculation returned null")
+        try:
+            text = ctypes.string_at(result_ptr.value).decode('utf-8')
+        finally:
+            self._dll.free_result(result_ptr.value)
+
+        if status == CALC_TIMEOUT:
+            raise TimeoutError(f"Calculation timed out after {timeout} s: {expression}")
+        if status == CALC_CANCELLED:
+            raise CalculationCancelled(f"Calculation cancelled: {expression}")
+        if status != CALC_OK:
+            return f"Error: {text}"  # как у evaluate() без срока
+        return text
+
+    def evaluate_view(self, expression, precision=None):
+        """Вычисляет выражение и возвращает результат как memoryview (ASCII) без копирования.
+
+        Память принадлежит DLL (буфер текущего потока) и действительна только до
+        следующего evaluate_view/evaluate_into в этом потоке - при необходимости
+        сохраните bytes(view). Ошибка вычисления - RuntimeError.
+        """
+        if not self._calc_ptr:
+            raise RuntimeError("Calculator not initialized")
+        if not hasattr(self._dll, 'calculate_expression_view'):
+            raise RuntimeError("Result views are not supported by the loaded DLL")
+
+        data = ctypes.c_void_p()
+        length = ctypes.c_size_t()
+        status = self._dll.calculate_expression_view(
+            self._calc_ptr, expression.encode('utf-8'), -1 if precision is None else precision,
+            ctypes.byref(data), ctypes.byref(length),
+        )
+        view = memoryview((ctypes.c_char * length.value).from_address(data.value)).cast('B').toreadonly()
+        if status != CALC_OK:
+            raise RuntimeError(f"Calculation error: {bytes(view).decode('utf-8')}")
+        return view
+
+    def evaluate_into(self, expression, buffer, precision=None):
+        """Вычисляет выражение и пишет результат (ASCII, с завершающим нулём) в buffer.
+
+        buffer - записываемый объект с буферным протоколом (bytearray, memoryview,
+        numpy-массив байт). Возвращает длину результата без нуля. bytearray при
+        нехватке места расширяется (без повторного вычисления); для остальных
+        буферов - ValueError с нужным размером. Ошибка вычисления - RuntimeError.
+        """
+        if not self._calc_ptr:
+            raise RuntimeError("Calculator not initialized")
+        if not hasattr(self._dll, 'calculate_expression_into'):
+            raise RuntimeError("Result buffers are not supported by the loaded DLL")
+
+        expr_bytes = expression.encode('utf-8')
+        precision = -1 if precision is None else precision
+        length = ctypes.c_size_t()
+        while True:
+            target = memoryview(buffer).cast('B')
+            address = ctypes.addressof((ctypes.c_char * len(target)).from_buffer(target)) if len(target) else None
+            status = self._dll.calculate_expression_into(
+                self._calc_ptr, expr_bytes, precision, address, len(target), ctypes.byref(length)
+            )
+            target.release()
+            if status != CALC_BUFFER_TOO_SMALL:
+                break
+            if not isinstance(buffer, bytearray):
+                raise ValueError(f"Buffer too small: need {length.value + 1} bytes, got {len(buffer)}")
+            buffer.extend(bytes(length.value + 1 - len(buffer)))
+
+        if status != CALC_OK:
+            raise RuntimeError(f"Calculation error: {bytes(buffer[:length.value]).decode('utf-8')}")
+        return length.value
+
+    def create_cancellation_token(self):
+        """Создаёт CancellationToken для evaluate(..., cancel_token=...)"""
+        if not hasattr(self._dll, 'create_cancellation_token'):
+            raise RuntimeError("Cancellation is not supported by the loaded DLL")
+        return CancellationToken(self._dll)
+
+    async def evaluate_async(self, expression, precision=None, timeout=None):
+        """Асинхронный evaluate(): вычисление идёт в пуле потоков event loop.
+
+        Отмена ожидающей задачи (task.cancel(), asyncio.wait_for) отменяет и
+        вычисление в C++, так что рабочий поток не остаётся занятым.
+        """
+        loop = asyncio.get_running_loop()
+        token = self.create_cancellation_token()
+        future = loop.run_in_executor(None, self.evaluate, expression, precision, timeout, token)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+    def evaluate_many(self, expressions, threads=1, timeout=None, cancel_token=None):
+        """Вычисляет набор выражений за один вызов C++.
+
+        threads - сколько потоков использовать: 1 - последовательно в вызывающем
+        потоке, 0 - все ядра (общий пул потоков DLL), n - не более n.
+        timeout - срок в секундах на весь пакет (TimeoutError), cancel_token -
+        CancellationToken (CalculationCancelled); прерывается весь пакет.
+
+        Возвращает (results, errors) - списки той же длины, что и входной набор:
+        для успешного выражения results[i] - строка результата, errors[i] - None;
+        для ошибочного results[i] - None, errors[i] - текст ошибки.
+        """
+        if not self._calc_ptr:
+            raise RuntimeError("Calculator not initialized")
+        interruptible = timeout is not None or cancel_token is not None
+        if interruptible and not hasattr(self._dll, 'calculate_batch_ex'):
+            raise RuntimeError("Timeouts and cancellation are not supported by the loaded DLL")
+
+        encoded = [str(expression).encode('utf-8') for expression in expressions]
+        count = len(encoded)
+        if count == 0:
+            return [], []
+
+        if not hasattr(self._dll, 'calculate_batch'):
+            # Старая DLL: по одному вызову на выражение
+            results, errors = [], []
+            for expression in encoded:
+                result = self.evaluate(expression.decode('utf-8'))
+                if result.startswith("Error: "):
+                    results.append(None)
+                    errors.append(result[len("Error: "):])
+                else:
+                    results.append(result)
+                    errors.append(None)
+            return results, errors
+
+        expr_array = (ctypes.c_char_p * count)(*encoded)
+        statuses = (ctypes.c_int * count)()
+        offsets = (ctypes.c_size_t * (count + 1))()
+
+        if interruptible:
+            timeout_ms = max(1, int(timeout * 1000)) if timeout is not None else 0
+            buffer_ptr = self._dll.calculate_batch_ex(
+                self._calc_ptr, expr_array, count, statuses, offsets, threads, timeout_ms,
+                cancel_token._handle if cancel_token is not None else None,
+            )
+        elif threads != 1 and hasattr(self._dll, 'calculate_batch_parallel'):
+            buffer_ptr = self._dll.calculate_batch_parallel(self._calc_ptr, expr_array, count, statuses, offsets, threads)
+        else:
+            buffer_ptr = self._dll.calculate_batch(self._calc_ptr, expr_array, count, statuses, offsets)
+        if not buffer_ptr:
+            raise RuntimeError("Batch calculation returned null")
+
+        try:
+            # Одно копирование всего буфера; строки разделены '\0'
+            raw = ctypes.string_at(buffer_ptr, offsets[count])
+        finally:
+            self._dll.free_result(buffer_ptr)
+
+        if CALC_CANCELLED in statuses:
+            raise CalculationCancelled(f"Batch calculation cancelled ({count} expressions)")
+        if CALC_TIMEOUT in statuses:
+            raise TimeoutError(f"Batch calculation timed out after {timeout} s ({count} expressions)")
+
+        texts = raw.decode('utf-8').split('\0')
+        ok = [status == 0 for status in statuses]
+        results = [text if good else None for text, good in zip(texts, ok)]
+        errors = [None if good else text for text, good in zip(texts, ok)]
+        return results, errors
+
+    def compile(self, expression):
+        """Компилирует выражение с переменными, например "sin(x)^2 + y".
+
+        Результат передаётся в eval() вместе со значениями переменных.
+        """
+        if not self._calc_ptr:
+            raise RuntimeError("Calculator not initialized")
+        if not hasattr(self._dll, 'compile_expression'):
+            raise RuntimeError("Compiled expressions are not supported by the loaded DLL")
+
+        error_ptr = ctypes.c_void_p()
+        handle = self._dll.compile_expression(self._calc_ptr, expression.encode('utf-8'), ctypes.byref(error_ptr))
+        if not handle:
+            message = "Compilation returned null"
+            if error_ptr.value:
+                message = ctypes.string_at(error_ptr.value).decode('utf-8')
+                self._dll.free_result(error_ptr.value)
+            raise ValueError(f"Compilation error: {message}")
+
+        count = self._dll.get_compiled_variable_count(handle)
+        variables = [self._dll.get_compiled_variable_name(handle, i).decode('utf-8') for i in range(count)]
+        return CompiledExpression(self._dll, handle, expression, variables)
+
+    def eval(self, compiled, bindings=None, **kwargs):
+        """Вычисляет скомпилированное выражение с текущей точностью.
+
+        Значения переменных передаются словарём bindings и/или именованными
+        аргументами; допускаются числа и строки (для точных десятичных значений).
+        """
+        if not self._calc_ptr:
+            raise RuntimeError("Calculator not initialized")
+
+        values = dict(bindings or {}, **kwargs)
+        missing = [name for name in compiled.variables if name not in values]
+        if missing:
+            raise KeyError(f"Missing values for variables: {', '.join(missing)}")
+
+        count = len(compiled.variables)
+        value_array = (ctypes.c_char_p * count)(*[str(values[name]).encode('utf-8') for name in compiled.variables])
+        result_ptr = self._dll.eval_compiled(self._calc_ptr, compiled._handle, value_array, count)
+        if not result_ptr:
+            raise RuntimeError("Calculation returned null")
+
+        try:
+            return ctypes.string_at(result_ptr).decode('utf-8')
+        finally:
+            self._dll.free_result(result_ptr)
+
+    def evaluate_array(self, compiled, bindings=None, **kwargs):
+        """Вычисляет выражение над массивами значений переменных, возвращает numpy.ndarray.
+
+        compiled - CompiledExpression или строка (будет скомпилирована). Значения
+        переменных - массивы или скаляры (приводятся к общей форме по правилам numpy).
+
+        При точности <= FLOAT64_MAX_PRECISION выражение считается векторно в float64;
+        элементы с переполнением, делением на ноль или вне области определения
+        пересчитываются через BigNumber (ошибка вычисления даёт NaN). Результат - float64.
+        При большей точности каждый элемент считается через BigNumber, результат -
+        массив строк (dtype=object), как у eval().
+        """
+        import numpy as np
+
+        if isinstance(compiled, str):
+            compiled = self.compile(compiled)
+
+        values = dict(bindings or {}, **kwargs)
+        missing = [name for name in compiled.variables if name not in values]
+        if missing:
+            raise KeyError(f"Missing values for variables: {', '.join(missing)}")
+
+        if self.get_precision() > FLOAT64_MAX_PRECISION:
+            columns = np.broadcast_arrays(*[np.asarray(values[name]) for name in compiled.variables]) \
+                if compiled.variables else []
+            shape = columns[0].shape if columns else ()
+            result = np.empty(shape, dtype=object)
+            for index in np.ndindex(shape):
+                row = {name: column[index] for name, column in zip(compiled.variables, columns)}
+                result[index] = self.eval(compiled, row)
+            return result
+
+        arrays = [np.asarray(values[name], dtype=np.float64) for name in compiled.variables]
+        arrays = np.broadcast_arrays(*arrays) if arrays else []
+        program, constants = compiled._float64_program()
+        with np.errstate(all='ignore'):
+            result = np.array(_evaluate_float64(program, constants, arrays), dtype=np.float64)
+        if arrays:
+            result = np.broadcast_to(result, arrays[0].shape).copy()
+
+        # Пересчёт через BigNumber только там, где float64 не справился
+        bad = ~np.isfinite(result)
+        for index in zip(*np.nonzero(bad)) if result.ndim else ([()] if bad else []):
+            row = {
+                name: np.format_float_positional(float(array[index]), unique=True, trim='-')
+                for name, array in zip(compiled.variables, arrays)
+            }
+            exact = self.eval(compiled, row)
+            try:
+                result[index] = float(exact)
+            except ValueError:
+                result[index] = np.nan  # "Error: ..." - значение не определено
+        return result
+
     def set_precision(self, precision):
         """Устанавливает точность вычислений"""
         if self._calc_ptr and hasattr(self._dll, 'set_calculator_precision'):
@@ -170,6 +746,110 @@ class CppCalculator:
             return self._dll.get_calculator_precision(self._calc_ptr)
         return self._precision
 
+    def set_cache_limit(self, max_bytes):
+        """Устанавливает лимит памяти кэша результатов в байтах (0 - отключить кэш)"""
+        if self._calc_ptr and hasattr(self._dll, 'set_calculator_cache_limit'):
+            self._dll.set_calculator_cache_limit(self._calc_ptr, max_bytes)
+
+    def get_cache_limit(self):
+        """Возвращает лимит памяти кэша результатов в байтах"""
+        if self._calc_ptr and hasattr(self._dll, 'get_calculator_cache_limit'):
+            return self._dll.get_calculator_cache_limit(self._calc_ptr)
+        return 0
+
+    def clear_cache(self):
+        """Очищает кэш результатов (счётчики сохраняются)"""
+        if self._calc_ptr and hasattr(self._dll, 'clear_calculator_cache'):
+            self._dll.clear_calculator_cache(self._calc_ptr)
+
+    def clear_constants_cache(self):
+        """Сбрасывает общий кэш констант π, e, ln2, ln10 (следующий вызов пересчитает их)"""
+        if hasattr(self._dll, 'clear_constants_cache'):
+            self._dll.clear_constants_cache()
+
+    def cache_stats(self):
+        """Возвращает статистику кэша: hits, misses, evictions, bytes, entries"""
+        names = ('hits', 'misses', 'evictions', 'bytes', 'entries')
+        if not (self._calc_ptr and hasattr(self._dll, 'get_calculator_cache_stats')):
+            return dict.fromkeys(names, 0)
+        values = [ctypes.c_ulonglong() for _ in names]
+        self._dll.get_calculator_cache_stats(self._calc_ptr, *[ctypes.byref(v) for v in values])
+        return {name: v.value for name, v in zip(names, values)}
+
+    def enable_persistent_cache(self, path=None, max_bytes=DEFAULT_PERSISTENT_CACHE_BYTES):
+        """Включает постоянный кэш на диске: долгие результаты и константы π, e, ln2, ln10
+        сохраняются в файл и после перезапуска читаются вместо пересчёта.
+
+        Файл другой сборки движка сбрасывается; при превышении max_bytes вытесняются
+        давно не использованные записи. Ошибка открытия файла - RuntimeError.
+        """
+        if not (self._calc_ptr and hasattr(self._dll, 'enable_persistent_cache')):
+            raise RuntimeError("Persistent cache is not supported by this calculate.dll")
+        path = os.path.abspath(path or DEFAULT_PERSISTENT_CACHE_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        error_ptr = ctypes.c_void_p()
+        status = self._dll.enable_persistent_cache(self._calc_ptr, path.encode('utf-8'), max_bytes,
+                                                   ctypes.byref(error_ptr))
+        if status != 0:
+            message = "Cannot open persistent cache"
+            if error_ptr.value:
+                message = ctypes.string_at(error_ptr.value).decode('utf-8')
+                self._dll.free_result(error_ptr.value)
+            raise RuntimeError(f"Persistent cache error: {message}")
+
+    def disable_persistent_cache(self):
+        """Отключает постоянный кэш (файл остаётся на диске)"""
+        if self._calc_ptr and hasattr(self._dll, 'disable_persistent_cache'):
+            self._dll.disable_persistent_cache(self._calc_ptr)
+
+    def clear_persistent_cache(self):
+        """Удаляет все записи постоянного кэша"""
+        if self._calc_ptr and hasattr(self._dll, 'clear_persistent_cache'):
+            self._dll.clear_persistent_cache(self._calc_ptr)
+
+    def persistent_cache_stats(self):
+        """Статистика постоянного кэша: hits, misses, evictions, bytes (размер файла), entries"""
+        names = ('hits', 'misses', 'evictions', 'bytes', 'entries')
+        if not (self._calc_ptr and hasattr(self._dll, 'get_persistent_cache_stats')):
+            return dict.fromkeys(names, 0)
+        values = [ctypes.c_ulonglong() for _ in names]
+        self._dll.get_persistent_cache_stats(self._calc_ptr, *[ctypes.byref(v) for v in values])
+        return {name: v.value for name, v in zip(names, values)}
+
+    def stats(self):
+        """Профиль вычислений с момента создания или reset_stats().
+
+        'operations' - по каждой операции calls, seconds (включая вложенные операции)
+        и limbs (сумма длин операндов в лимбах по 9 цифр); для series_term и cache_*
+        заполнено только calls. 'peak_limbs' - самый длинный операнд умножения или
+        деления, 'peak_memory_bytes' - пик памяти мантисс в куче за одно вычисление.
+        """
+        operations = {name: {'calls': 0, 'seconds': 0.0, 'limbs': 0} for name in _PROFILE_OPERATIONS}
+        result = {'operations': operations, 'peak_limbs': 0, 'peak_memory_bytes': 0}
+        if not (self._calc_ptr and hasattr(self._dll, 'get_calculator_stats')):
+            return result
+
+        total = self._dll.get_calculator_stats(self._calc_ptr, None, 0)
+        values = (ctypes.c_ulonglong * total)()
+        self._dll.get_calculator_stats(self._calc_ptr, values, total)
+        # Операции, которых нет в этой версии модуля (DLL новее), пропускаются
+        for i, name in enumerate(_PROFILE_OPERATIONS):
+            if 3 * i + 2 >= total:
+                break
+            operations[name] = {'calls': values[3 * i], 'seconds': values[3 * i + 1] / 1e9,
+                                'limbs': values[3 * i + 2]}
+        tail = 3 * len(_PROFILE_OPERATIONS)
+        if tail + 1 < total:
+            result['peak_limbs'] = values[tail]
+            result['peak_memory_bytes'] = values[tail + 1]
+        return result
+
+    def reset_stats(self):
+        """Обнуляет профиль вычислений (кэш результатов и его счётчики не меняются)"""
+        if self._calc_ptr and hasattr(self._dll, 'reset_calculator_stats'):
+            self._dll.reset_calculator_stats(self._calc_ptr)
+
     def __del__(self):
         """Деструктор - освобождает ресурсы C++"""
         if hasattr(self, '_calc_ptr') and self._calc_ptr and hasattr(self, '_dll'):
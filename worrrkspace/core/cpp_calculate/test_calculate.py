@@ -0,0 +1,116 @@
+"""Тесты точности CppCalculator на собранной calculate.dll (без неё тесты пропускаются).
+Ожидаемые значения - известные цифры, округлённые до запрошенной точности"""
+import pytest
+
+from .calculate import CppCalculator
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    try:
+        return CppCalculator(precision=50)
+    except RuntimeError as error:
+        pytest.skip(f"calculate.dll is not available: {error}")
+
+
+@pytest.mark.parametrize('expression, precision, expected', [
+    ("2^200", 50, "1606938044258990275541962092341162602522202993782792835301376"),
+    ("1.5^-7", 30, "0.058527663465935070873342478281"),
+    ("2^0.5", 50, "1.41421356237309504880168872420969807856967187537695"),
+    ("7^2.25", 40, "79.7022515231915014173503849291942484778953"),
+    ("0.5^0.125", 30, "0.917004043204671231743541594794"),
+    ("8^(1/3)", 50, "2"),
+    ("8^(2/6)", 30, "2"),
+    ("(-8)^(1/3)", 30, "-2"),
+    ("27^(-2/3)", 30, "0.111111111111111111111111111111"),
+    ("2^(1/3)", 30, "1.259921049894873164767210607278"),
+])
+def test_power(calculator, expression, precision, expected):
+    assert calculator.evaluate(expression, precision=precision) == expected
+
+
+@pytest.mark.parametrize('expression, precision, expected', [
+    ("10^12.00001", 5, "1000023026116.02688"),
+    ("8^0.33", 2, "1.99"),
+    ("1000000^0.00001", 5, "1.00014"),
+    ("123456^7.00000000000000000001", 20, "437104634676747795503480470680299940.32751206272928161937"),
+    ("10^60." + "0" * 49 + "1", 50,
+     "1000000000000000000000000000000000000000000000000023025850929.9404568401799145468436420760110148862879948552388"),
+])
+def test_power_exponent_close_to_fraction(calculator, expression, precision, expected):
+    # Показатель с precision и больше дробных цифр не подменяется близкой дробью m/q
+    assert calculator.evaluate(expression, precision=precision) == expected
+
+
+def test_compiled_fraction_exponent(calculator):
+    calculator.set_precision(30)
+    try:
+        assert calculator.eval(calculator.compile("x^(1/3)"), x=8) == "2"
+        assert calculator.eval(calculator.compile("x^(-1/3)"), x=8) == "0.5"
+        assert calculator.eval(calculator.compile("x^0.33"), x=8) == "1.986184990874071803066420433776"
+    finally:
+        calculator.set_precision(50)
+
+
+def _assert_digits(result, head, tail, fractional):
+    """Длинный результат: первые и последние цифры и число дробных цифр"""
+    assert result.startswith(head)
+    assert result.endswith(tail)
+    assert len(result.partition('.')[2]) == fractional
+
+
+@pytest.mark.parametrize('expression, precision, expected', [
+    ("exp(1)", 50, "2.71828182845904523536028747135266249775724709369996"),
+    ("exp(100)", 30, "26881171418161354484126255515800135873611118.773741922415191608615280287035"),
+    ("exp(-2.5)", 40, "0.0820849986238987951695286744671598078378"),
+    ("exp(-6.806574)", 30, "0.001106477204645372695358030880"),
+    ("sin(1)", 50, "0.84147098480789650665250232163029899962256306079837"),
+    ("cos(1)", 50, "0.54030230586813971740093660744297660373231042061792"),
+    ("cos(-0.5)", 40, "0.8775825618903727161162815826038296519916"),
+    ("sin(1000)", 40, "0.8268795405320025602558874291092181412127"),
+    ("tan(1)", 40, "1.5574077246549022305069748074583601730873"),
+    ("tan(-6.59636767)", 30, "-0.323840001716861106860530694139"),
+])
+def test_exp_sin_cos(calculator, expression, precision, expected):
+    assert calculator.evaluate(expression, precision=precision) == expected
+
+
+@pytest.mark.parametrize('expression, precision, head, tail', [
+    ("exp(1.5)", 1000, "4.48168907033806482260205546011927581900574986836", "627363796474637838014857529904"),
+    ("sin(2)", 1000, "0.90929742682568169539601986591174484270225497144", "648063984074487667109626953327"),
+    ("cos(3)", 1000, "-0.9899924966004454572715727947312613023936790966", "831931909015149547606490708696"),
+    ("exp(0.7)", 3000, "2.01375270747047652162454938858306527001754239414", "580220600019130850747000803273"),
+    ("sin(0.7)", 3000, "0.64421768723769105367261435139872018306581384457", "963610816651003785882369743223"),
+])
+def test_exp_sin_cos_high_precision(calculator, expression, precision, head, tail):
+    _assert_digits(calculator.evaluate(expression, precision=precision), head, tail, precision)
+
+
+@pytest.mark.parametrize('expression, precision, expected', [
+    ("ln(2)", 50, "0.69314718055994530941723212145817656807550013436026"),
+    ("ln(3.7)", 40, "1.3083328196501787603501042163470829562990"),
+    ("ln(0.001)", 30, "-6.907755278982137052053974364053"),
+    ("ln(123456789)", 30, "18.631401766168018033193933347963"),
+    ("log(2)", 40, "0.3010299956639811952137388947244930267682"),
+])
+def test_ln(calculator, expression, precision, expected):
+    assert calculator.evaluate(expression, precision=precision) == expected
+
+
+@pytest.mark.parametrize('expression, precision, head, tail', [
+    ("ln(2)", 1300, "0.69314718055994530941723212145817656807550013436", "906530584602586683829400228330"),
+    ("ln(3.7)", 2000, "1.30833281965017876035010421634708295629897609853", "185518316945983417828887137498"),
+    ("ln(0.00017)", 1500, "-8.6797121209140123398404226555486945024173044305", "839959673192167908968743295615"),
+    ("log(7)", 2000, "0.84509804001425683071221625859263619348357239632", "374011855578726393145736493748"),
+])
+def test_ln_agm(calculator, expression, precision, head, tail):
+    # Выше порога AGM (1200 цифр) ln считается через AGM, π и ln(2)
+    _assert_digits(calculator.evaluate(expression, precision=precision), head, tail, precision)
+
+
+def test_ln_cold_constants(calculator):
+    # ln(10) = ln(2) + ln(5): ln(2) считается заново бинарным разбиением
+    calculator.clear_constants_cache()
+    calculator.clear_cache()
+    _assert_digits(calculator.evaluate("ln(10)", precision=5000),
+                   "2.30258509299404568401799145468436420760110148862", "801289505063856871496797027824", 5000)
@@ -2,7 +2,7 @@
 C++ Logger package
 """
 
-from .logger import CppLogger
+from .logger import CppLogger, BufferedLogger
 
 # Создаем глобальный экземпляр логгера по умолчанию
 try:
@@ -13,5 +13,5 @@ except Exception as e:
     logger = logging.getLogger("FallbackLogger")
     logger.warning(f"Using Python fallback logger: {e}")
 
-__all__ = ['CppLogger', 'logger']
+__all__ = ['CppLogger', 'BufferedLogger', 'logger']
 __version__ = '0.1.0'
\ No newline at end of file
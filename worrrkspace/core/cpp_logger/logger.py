@@ -1,15 +1,104 @@
 import os
 import ctypes
+from array import array
+from itertools import accumulate
 from pathlib import Path
 
+# Logger::Level - числовые уровни совпадают с модулем logging
+LEVELS = {
+    'DEBUG': 10,
+    'INFO': 20,
+    'WARNING': 30,
+    'ERROR': 40,
+    'CRITICAL': 50,
+}
+
+
+def _level_value(level):
+    """Числовой уровень по имени или числу; неизвестные имена не отфильтровываются"""
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(level.upper(), LEVELS['CRITICAL'])
+
+
+def _level_name(level):
+    """Имя уровня для записи в лог: числа - как в logging (20 -> 'INFO', 25 -> 'Level 25'),
+    имена - в верхнем регистре, как их понимает Logger::levelFromName"""
+    if isinstance(level, int):
+        for name, value in LEVELS.items():
+            if value == level:
+                return name
+        return f"Level {level}"
+    return level.upper()
+
+
+# Массив указателей для logger_log_batch
+_POINTER_TYPECODE = 'Q' if ctypes.sizeof(ctypes.c_void_p) == 8 else 'I'
+
+
+def _pack_strings(strings):
+    """Склеивает строки через NUL в один буфер и возвращает (буфер, массив указателей на строки).
+
+    Во много раз быстрее, чем (ctypes.c_char_p * n)(*strings); буфер должен жить до конца вызова.
+    """
+    buffer = b"\0".join(strings) + b"\0"
+    base = ctypes.cast(ctypes.c_char_p(buffer), ctypes.c_void_p).value
+    pointers = array(_POINTER_TYPECODE, accumulate(map(len, strings), lambda offset, n: offset + n + 1, initial=base))
+    pointers.pop()
+    return buffer, pointers
+
+
+# Logger::OverflowPolicy: что делать асинхронному логгеру, если очередь заполнена
+OVERFLOW_POLICIES = {
+    'block': 0,  # ждать, пока поток записи освободит место
+    'drop': 1,   # отбросить сообщение (счётчик dropped в stats())
+    'count': 2,  # отбросить и записать в лог, сколько сообщений потеряно
+}
+
+# Logger::Compression: сжатие ротированных файлов
+COMPRESSIONS = {
+    None: 0,
+    'gzip': 1,  # нужна сборка logger.dll с zlib
+    'zstd': 2,  # нужна сборка logger.dll с zstd
+}
+
 
 class CppLogger:
-    def __init__(self, filename="app.log"):
+    """Логгер на C++ (logger.dll).
+
+    По умолчанию пишет синхронно: каждое сообщение сразу попадает в файл и консоль.
+    async_mode=True - сообщения складываются в очередь на capacity записей, а файл
+    пишет фоновый поток пачками, сбрасывая его на диск каждые flush_interval секунд
+    или при накоплении flush_bytes байт. overflow - поведение при заполненной
+    очереди: 'block', 'drop' или 'count'; console=False - не дублировать сообщения
+    в консоль (асинхронный режим).
+
+    level - минимальный уровень ('DEBUG', 'INFO', ... или число, как в logging).
+    Сообщения ниже него не собираются и не передаются в C++: аргументы форматируются
+    лениво, как в logging - logger.debug("Cache hit for %s", key).
+
+    Ротация (set_rotation): max_bytes - новый файл, когда текущий дорастёт до этого
+    размера; daily - новый файл каждые сутки; retention - сколько старых файлов
+    хранить; compression - 'gzip' или 'zstd'. Старые файлы сжимаются в фоне.
+    """
+
+    def __init__(self, filename="app.log", async_mode=False, capacity=8192, flush_bytes=64 * 1024,
+                 flush_interval=0.1, overflow='block', console=True, level='DEBUG',
+                 max_bytes=0, daily=False, retention=0, compression=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
         self._dll = None
         self._logger_ptr = None
+        self._level = LEVELS['DEBUG']
         self._load_dll()
         self._setup_functions()
-        self._create_logger(filename)
+        if async_mode:
+            self._create_async_logger(filename, capacity, flush_bytes, flush_interval, overflow, console)
+        else:
+            self._create_logger(filename)
+        self.set_level(level)
+        if max_bytes or daily:
+            self.set_rotation(max_bytes, daily, retention, compression)
 
     def _load_dll(self):
         """Загружает DLL"""
@@ -30,6 +119,44 @@ class CppLogger:
         self._dll.logger_log.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
         self._dll.logger_log.restype = None
 
+        # Асинхронный режим (новые версии DLL)
+        if hasattr(self._dll, 'create_async_logger'):
+            self._dll.create_async_logger.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int,
+                                                      ctypes.c_int, ctypes.c_int, ctypes.c_int]
+            self._dll.create_async_logger.restype = ctypes.c_void_p
+
+        # Минимальный уровень (новые версии DLL)
+        if hasattr(self._dll, 'logger_set_level'):
+            self._dll.logger_set_level.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            self._dll.logger_set_level.restype = None
+
+        if hasattr(self._dll, 'logger_is_enabled'):
+            self._dll.logger_is_enabled.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            self._dll.logger_is_enabled.restype = ctypes.c_int
+
+        # Пакетная запись (новые версии DLL)
+        if hasattr(self._dll, 'logger_log_batch'):
+            self._dll.logger_log_batch.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p]
+            self._dll.logger_log_batch.restype = None
+
+        # Ротация (новые версии DLL)
+        if hasattr(self._dll, 'logger_set_rotation'):
+            self._dll.logger_set_rotation.argtypes = [ctypes.c_void_p, ctypes.c_ulonglong, ctypes.c_int,
+                                                      ctypes.c_int, ctypes.c_int]
+            self._dll.logger_set_rotation.restype = ctypes.c_int
+
+        if hasattr(self._dll, 'logger_compression_supported'):
+            self._dll.logger_compression_supported.argtypes = [ctypes.c_int]
+            self._dll.logger_compression_supported.restype = ctypes.c_int
+
+        if hasattr(self._dll, 'logger_flush'):
+            self._dll.logger_flush.argtypes = [ctypes.c_void_p]
+            self._dll.logger_flush.restype = None
+
+        if hasattr(self._dll, 'get_logger_stats'):
+            self._dll.get_logger_stats.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ulonglong)] * 3
+            self._dll.get_logger_stats.restype = None
+
         # delete_logger
         self._dll.delete_logger.argtypes = [ctypes.c_void_p]
         self._dll.delete_logger.restype = None
@@ -40,31 +167,187 @@ class CppLogger:
         if not self._logger_ptr:
             raise RuntimeError("Failed to create C++ logger")
 
-    def log(self, level, message):
-        """Логирует сообщение"""
+    def _create_async_logger(self, filename, capacity, flush_bytes, flush_interval, overflow, console):
+        """Создает асинхронный логгер в C++"""
+        if not hasattr(self._dll, 'create_async_logger'):
+            raise RuntimeError("Async mode is not supported by this logger.dll")
+        self._logger_ptr = self._dll.create_async_logger(
+            filename.encode('utf-8'), int(capacity), int(flush_bytes),
+            max(1, int(flush_interval * 1000)), OVERFLOW_POLICIES[overflow], 1 if console else 0
+        )
+        if not self._logger_ptr:
+            raise RuntimeError("Failed to create C++ logger")
+
+    def set_level(self, level):
+        """Задаёт минимальный уровень - и для Python, и для сообщений самого C++ (Calculator)"""
+        self._level = _level_value(level)
+        if self._logger_ptr and hasattr(self._dll, 'logger_set_level'):
+            self._dll.logger_set_level(self._logger_ptr, self._level)
+
+    def get_level(self):
+        return self._level
+
+    def is_enabled(self, level):
+        """Будет ли записано сообщение уровня level"""
+        if not self._logger_ptr:
+            return False
+        if hasattr(self._dll, 'logger_is_enabled'):
+            return bool(self._dll.logger_is_enabled(self._logger_ptr, _level_value(level)))
+        return _level_value(level) >= self._level
+
+    def log(self, level, message, *args):
+        """Логирует сообщение; args подставляются в message через %, только если уровень включён"""
+        # Уровень проверяется по копии в Python, без вызова DLL: отключённое сообщение
+        # не форматируется и не кодируется
+        if not self._logger_ptr or _level_value(level) < self._level:
+            return
+        if args:
+            message = message % args
+        self._dll.logger_log(
+            self._logger_ptr,
+            _level_name(level).encode('utf-8'),
+            str(message).encode('utf-8')
+        )
+
+    def log_many(self, records):
+        """Логирует пачку записей (level, message, *args) одним вызовом DLL"""
+        levels = []
+        messages = []
+        for level, message, *args in records:
+            if _level_value(level) < self._level:
+                continue
+            if args:
+                message = message % tuple(args)
+            levels.append(_level_name(level).encode('utf-8'))
+            messages.append(str(message).encode('utf-8'))
+        self._log_batch(levels, messages)
+
+    def buffered(self, size=1024):
+        """Буфер для частых сообщений: копит их в Python и отправляет пачками по size.
+
+            with logger.buffered() as log:
+                for row in rows:
+                    log.info("Imported %s", row)
+        """
+        return BufferedLogger(self, size)
+
+    def _log_batch(self, levels, messages):
+        """Передаёт в C++ уже отфильтрованные и закодированные сообщения"""
+        if not self._logger_ptr or not levels:
+            return
+        if not hasattr(self._dll, 'logger_log_batch'):
+            for level, message in zip(levels, messages):
+                self._dll.logger_log(self._logger_ptr, level, message)
+            return
+        level_buffer, level_pointers = _pack_strings(levels)
+        message_buffer, message_pointers = _pack_strings(messages)
+        self._dll.logger_log_batch(self._logger_ptr, len(levels), level_pointers.buffer_info()[0],
+                                   message_pointers.buffer_info()[0])
+
+    def set_rotation(self, max_bytes=0, daily=False, retention=0, compression=None):
+        """Включает ротацию файла лога; max_bytes=0 и daily=False - выключает"""
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if not hasattr(self._dll, 'logger_set_rotation'):
+            raise RuntimeError("Log rotation is not supported by this logger.dll")
+        if not self.compression_supported(compression):
+            raise ValueError(f"Compression '{compression}' is not available in this logger.dll build")
         if self._logger_ptr:
-            self._dll.logger_log(
-                self._logger_ptr,
-                level.encode('utf-8'),
-                message.encode('utf-8')
-            )
+            self._dll.logger_set_rotation(self._logger_ptr, int(max_bytes), 1 if daily else 0,
+                                          int(retention), COMPRESSIONS[compression])
+
+    def compression_supported(self, compression):
+        """Собрана ли logger.dll с этим видом сжатия ('gzip', 'zstd')"""
+        if compression not in COMPRESSIONS or not hasattr(self._dll, 'logger_compression_supported'):
+            return compression is None
+        return bool(self._dll.logger_compression_supported(COMPRESSIONS[compression]))
+
+    def flush(self):
+        """Дожидается записи на диск всех уже отправленных сообщений"""
+        if self._logger_ptr and hasattr(self._dll, 'logger_flush'):
+            self._dll.logger_flush(self._logger_ptr)
+
+    def stats(self):
+        """Счётчики логгера: written, dropped (очередь была заполнена), blocked (log() ждал места)"""
+        if not self._logger_ptr or not hasattr(self._dll, 'get_logger_stats'):
+            return {'written': 0, 'dropped': 0, 'blocked': 0}
+        written = ctypes.c_ulonglong()
+        dropped = ctypes.c_ulonglong()
+        blocked = ctypes.c_ulonglong()
+        self._dll.get_logger_stats(self._logger_ptr, ctypes.byref(written), ctypes.byref(dropped),
+                                   ctypes.byref(blocked))
+        return {'written': written.value, 'dropped': dropped.value, 'blocked': blocked.value}
 
-    def debug(self, message):
-        self.log("DEBUG", message)
+    def debug(self, message, *args):
+        self.log("DEBUG", message, *args)
 
-    def info(self, message):
-        self.log("INFO", message)
+    def info(self, message, *args):
+        self.log("INFO", message, *args)
 
-    def warning(self, message):
-        self.log("WARNING", message)
+    def warning(self, message, *args):
+        self.log("WARNING", message, *args)
 
-    def error(self, message):
-        self.log("ERROR", message)
+    def error(self, message, *args):
+        self.log("ERROR", message, *args)
 
-    def critical(self, message):
-        self.log("CRITICAL", message)
+    def critical(self, message, *args):
+        self.log("CRITICAL", message, *args)
 
     def __del__(self):
         """Деструктор - освобождает ресурсы C++"""
         if hasattr(self, '_logger_ptr') and self._logger_ptr:
-            self._dll.delete_logger(self._logger_ptr)
\ No newline at end of file
+            self._dll.delete_logger(self._logger_ptr)
+
+
+class BufferedLogger:
+    """Накопитель сообщений для CppLogger (CppLogger.buffered).
+
+    Интерфейс как у CppLogger: log/debug/info/warning/error/critical. Сообщения
+    отключённых уровней отбрасываются сразу; остальные уходят в C++ одним вызовом,
+    когда их набирается size, по flush() и при выходе из with. Не потокобезопасен:
+    один буфер - на один поток.
+    """
+
+    def __init__(self, logger, size=1024):
+        self._logger = logger
+        self._size = max(1, int(size))
+        self._levels = []
+        self._messages = []
+
+    def log(self, level, message, *args):
+        if _level_value(level) < self._logger._level:
+            return
+        if args:
+            message = message % args
+        self._levels.append(_level_name(level).encode('utf-8'))
+        self._messages.append(str(message).encode('utf-8'))
+        if len(self._levels) >= self._size:
+            self.flush()
+
+    def debug(self, message, *args):
+        self.log("DEBUG", message, *args)
+
+    def info(self, message, *args):
+        self.log("INFO", message, *args)
+
+    def warning(self, message, *args):
+        self.log("WARNING", message, *args)
+
+    def error(self, message, *args):
+        self.log("ERROR", message, *args)
+
+    def critical(self, message, *args):
+        self.log("CRITICAL", message, *args)
+
+    def flush(self):
+        """Отправляет накопленные сообщения в C++ (запись на диск - по правилам логгера)"""
+        if self._levels:
+            levels, messages = self._levels, self._messages
+            self._levels, self._messages = [], []
+            self._logger._log_batch(levels, messages)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
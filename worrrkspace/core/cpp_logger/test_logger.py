@@ -0,0 +1,80 @@
+"""Тесты Python-обёртки CppLogger на поддельной DLL (без сборки logger.dll)"""
+import ctypes
+import types
+
+import pytest
+
+from .logger import CppLogger
+
+
+def _fake_dll(records):
+    """Минимальная замена logger.dll: записывает (level, message) в records"""
+    state = {'level': 10}
+
+    def create_logger(filename):
+        return 1
+
+    def delete_logger(ptr):
+        pass
+
+    def logger_log(ptr, level, message):
+        records.append((level, message))
+
+    def logger_log_batch(ptr, count, levels, messages):
+        level_pointers = (ctypes.c_void_p * count).from_address(levels)
+        message_pointers = (ctypes.c_void_p * count).from_address(messages)
+        for i in range(count):
+            records.append((ctypes.string_at(level_pointers[i]), ctypes.string_at(message_pointers[i])))
+
+    def logger_set_level(ptr, level):
+        state['level'] = level
+
+    def logger_is_enabled(ptr, level):
+        return int(level >= state['level'])
+
+    dll = types.SimpleNamespace()
+    for function in (create_logger, delete_logger, logger_log, logger_log_batch, logger_set_level, logger_is_enabled):
+        setattr(dll, function.__name__, function)
+    return dll
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    records = []
+    monkeypatch.setattr(CppLogger, '_load_dll', lambda self: setattr(self, '_dll', _fake_dll(records)))
+    instance = CppLogger("test.log", level='INFO')
+    instance.records = records
+    return instance
+
+
+def test_numeric_levels_are_written_by_name(logger):
+    logger.log(20, "value %d", 42)
+    logger.log(25, "custom")
+    logger.log(10, "filtered")
+    assert logger.records == [(b"INFO", b"value 42"), (b"Level 25", b"custom")]
+
+
+def test_numeric_levels_in_batches(logger):
+    logger.log_many([(40, "error %s", "x"), (10, "filtered"), ('WARNING', "warn")])
+    with logger.buffered() as log:
+        log.log(50, "critical")
+        log.log(10, "filtered")
+    assert logger.records == [(b"ERROR", b"error x"), (b"WARNING", b"warn"), (b"CRITICAL", b"critical")]
+
+
+def test_numeric_level_setting(logger):
+    logger.set_level(30)
+    assert not logger.is_enabled(20)
+    assert logger.is_enabled('ERROR')
+    logger.info("filtered")
+    logger.log(30, "kept")
+    assert logger.records == [(b"WARNING", b"kept")]
+
+
+def test_level_names_are_case_insensitive(logger):
+    logger.log('info', "single")
+    logger.log('debug', "filtered")
+    logger.log_many([('warning', "batch")])
+    with logger.buffered() as log:
+        log.log('Error', "buffered")
+    assert logger.records == [(b"INFO", b"single"), (b"WARNING", b"batch"), (b"ERROR", b"buffered")]